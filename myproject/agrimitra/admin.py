@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FarmerProfile, Post, Comment, PostVote, Conversation, ConversationMessage
+from .models import FarmerProfile, Post, Comment, PostVote, Conversation, ConversationMessage, ChatJob, LLMUsage, ConversationArchive, AdvisoryBulletin, ContentTranslation, GeocodeEntry, ForecastCell, WeatherAlert, Scheme, LearningItem, LearningVariant, LearningLabel
 
 
 @admin.register(FarmerProfile)
@@ -40,3 +40,86 @@ class ConversationMessageAdmin(admin.ModelAdmin):
 	list_display = ("id", "conversation", "role", "created_at")
 	list_filter = ("role", "created_at")
 	search_fields = ("text",)
+
+
+@admin.register(ChatJob)
+class ChatJobAdmin(admin.ModelAdmin):
+	list_display = ("id", "user", "conversation", "status", "attempts", "run_after", "created_at", "finished_at")
+	list_filter = ("status", "created_at")
+	search_fields = ("user__username", "message", "error")
+	raw_id_fields = ("conversation", "user_message", "reply")
+
+
+@admin.register(LLMUsage)
+class LLMUsageAdmin(admin.ModelAdmin):
+	list_display = ("day", "user", "requests", "prompt_tokens", "output_tokens", "total_tokens")
+	list_filter = ("day",)
+	search_fields = ("user__username",)
+	date_hierarchy = "day"
+
+
+@admin.register(ConversationArchive)
+class ConversationArchiveAdmin(admin.ModelAdmin):
+	list_display = ("conversation", "codec", "message_count", "raw_bytes", "archived_at")
+	list_filter = ("codec", "archived_at")
+	exclude = ("data",)
+	raw_id_fields = ("conversation",)
+
+
+@admin.register(AdvisoryBulletin)
+class AdvisoryBulletinAdmin(admin.ModelAdmin):
+	list_display = ("crop", "state", "language", "season", "generated_at")
+	list_filter = ("season", "language", "state")
+	search_fields = ("crop", "text")
+
+
+@admin.register(ContentTranslation)
+class ContentTranslationAdmin(admin.ModelAdmin):
+	list_display = ("kind", "object_id", "language", "created_at")
+	list_filter = ("kind", "language")
+	search_fields = ("text",)
+
+
+@admin.register(GeocodeEntry)
+class GeocodeEntryAdmin(admin.ModelAdmin):
+	list_display = ("key", "result", "fetched_at")
+	search_fields = ("key",)
+
+
+@admin.register(ForecastCell)
+class ForecastCellAdmin(admin.ModelAdmin):
+	list_display = ("key", "fetched_at", "fresh_until")
+	search_fields = ("key",)
+
+
+@admin.register(WeatherAlert)
+class WeatherAlertAdmin(admin.ModelAdmin):
+	list_display = ("user", "kind", "severity", "date", "value", "cell")
+	list_filter = ("kind", "severity", "date")
+	search_fields = ("user__username", "cell")
+
+
+@admin.register(Scheme)
+class SchemeAdmin(admin.ModelAdmin):
+	list_display = ("title", "category", "priority", "active", "updated_at")
+	list_filter = ("category", "active")
+	search_fields = ("title", "description", "slug")
+	prepopulated_fields = {"slug": ("title",)}
+
+
+class LearningVariantInline(admin.StackedInline):
+	model = LearningVariant
+	extra = 0
+
+
+class LearningLabelInline(admin.TabularInline):
+	model = LearningLabel
+	extra = 0
+
+
+@admin.register(LearningItem)
+class LearningItemAdmin(admin.ModelAdmin):
+	list_display = ("slug", "kind", "priority", "published", "updated_at")
+	list_filter = ("kind", "published")
+	search_fields = ("slug", "variants__title")
+	inlines = [LearningVariantInline, LearningLabelInline]
@@ -0,0 +1,178 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Lazy import holder; numpy is optional and without it compute() returns None
+np = None
+
+HOURLY_VARS = [
+	"temperature_2m",
+	"relative_humidity_2m",
+	"dew_point_2m",
+	"precipitation",
+	"precipitation_probability",
+	"wind_speed_10m",
+	"shortwave_radiation",
+	"terrestrial_radiation",
+	"is_day",
+]
+
+
+def load_numpy():
+	global np
+	if np is None:
+		try:
+			import numpy as _np
+			np = _np
+		except Exception:  # pragma: no cover
+			logger.warning("numpy is not installed; agro-weather indices are disabled")
+			np = False
+	return np or None
+
+
+def columns(hourly: Dict[str, List[Any]]) -> Dict[str, Any]:
+	"""Hourly payload -> {'time': datetime64[m] array, var: float array (NaN for gaps)}."""
+	times = np.array(hourly.get("time") or [], dtype="datetime64[m]")
+	cols = {"time": times}
+	for var in HOURLY_VARS:
+		values = hourly.get(var)
+		if values is None or len(values) != len(times):
+			cols[var] = np.full(len(times), np.nan)
+		else:
+			cols[var] = np.array([np.nan if v is None else v for v in values], dtype=float)
+	return cols
+
+
+def growing_degree_hours(temp, base: float, cap: float):
+	"""Degree-days contributed by each hour (hourly degree method, capped at `cap`)."""
+	return np.clip(np.minimum(temp, cap) - base, 0, None) / 24.0
+
+
+def et0_hourly(temp, rh, wind_kmh, rs_wm2, ra_wm2, elevation: float):
+	"""
+	FAO-56 Penman-Monteith reference evapotranspiration per hour (mm).
+
+	Radiation is the hourly mean in W/m²; net longwave uses the Rs/Rso
+	cloudiness ratio, with a fixed ratio at night when Rso is zero.
+	"""
+	rs = rs_wm2 * 0.0036  # MJ/m²/h
+	ra = ra_wm2 * 0.0036
+	u2 = wind_kmh / 3.6 * 0.748  # 10 m -> 2 m wind, m/s
+	es = 0.6108 * np.exp(17.27 * temp / (temp + 237.3))
+	ea = es * rh / 100.0
+	delta = 4098 * es / (temp + 237.3) ** 2
+	pressure = 101.3 * ((293 - 0.0065 * elevation) / 293) ** 5.26
+	gamma = 0.000665 * pressure
+
+	rso = (0.75 + 2e-5 * elevation) * ra
+	with np.errstate(divide="ignore", invalid="ignore"):
+		ratio = np.where(rso > 0, np.clip(rs / rso, 0.3, 1.0), 0.8)
+	rnl = 2.043e-10 * (temp + 273.16) ** 4 * (0.34 - 0.14 * np.sqrt(np.clip(ea, 0, None))) * (1.35 * ratio - 0.35)
+	rn = 0.77 * rs - rnl
+	soil = np.where(rs > 0, 0.1, 0.5) * rn
+	et0 = (0.408 * delta * (rn - soil) + gamma * 37 / (temp + 273) * u2 * (es - ea)) / (delta + gamma * (1 + 0.34 * u2))
+	return np.clip(et0, 0, None)
+
+
+def leaf_wet(temp, rh, dew_point, precip):
+	"""Hours with wet foliage: rain, RH ≥ 90 %, or air within 2 °C of the dew point."""
+	return (precip > 0) | (rh >= 90) | ((temp - dew_point) <= 2)
+
+
+def spray_ok(cols: Dict[str, Any], rainfast_hours: int):
+	"""Hours suitable for spraying: daylight, light wind, mild and not too dry, and no rain soon after."""
+	rain = (cols["precipitation"] > 0.1) | (cols["precipitation_probability"] >= 50)
+	# rain in this hour or any of the next `rainfast_hours` hours
+	padded = np.concatenate([rain, np.zeros(rainfast_hours, dtype=bool)])
+	rain_soon = np.lib.stride_tricks.sliding_window_view(padded, rainfast_hours + 1).any(axis=1)
+	wind = cols["wind_speed_10m"]
+	return (
+		(cols["is_day"] == 1)
+		& (wind >= 3) & (wind <= 15)
+		& (cols["temperature_2m"] <= 30)
+		& (cols["relative_humidity_2m"] >= 40)
+		& ~rain_soon
+	)
+
+
+def runs(mask, min_length: int):
+	"""(start, end) index pairs of True runs at least min_length long; end is exclusive."""
+	edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+	starts = np.flatnonzero(edges == 1)
+	ends = np.flatnonzero(edges == -1)
+	keep = (ends - starts) >= min_length
+	return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def _daily_sum(values, day_idx, n_days):
+	"""Per-day sums ignoring NaN; None for days with no valid hours."""
+	valid = ~np.isnan(values)
+	sums = np.bincount(day_idx, weights=np.where(valid, values, 0), minlength=n_days)
+	counts = np.bincount(day_idx, weights=valid, minlength=n_days)
+	return [round(float(s), 2) if c else None for s, c in zip(sums, counts)]
+
+
+def compute(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+	"""
+	Daily GDD, ET0 and leaf-wetness hours plus upcoming spray windows, JSON-ready.
+
+	Hourly variables are held as NumPy columns and each index is one
+	whole-array expression; per-day figures are grouped with bincount.
+	"""
+	hourly = payload.get("hourly")
+	if not hourly or not load_numpy():
+		return None
+	cols = columns(hourly)
+	times = cols["time"]
+	if not len(times):
+		return None
+
+	base = getattr(settings, 'AGRO_GDD_BASE', 10.0)
+	cap = getattr(settings, 'AGRO_GDD_CAP', 30.0)
+	days, day_idx = np.unique(times.astype("datetime64[D]"), return_inverse=True)
+	n_days = len(days)
+
+	temp = cols["temperature_2m"]
+	gdd = _daily_sum(growing_degree_hours(temp, base, cap), day_idx, n_days)
+	et0 = _daily_sum(
+		et0_hourly(temp, cols["relative_humidity_2m"], cols["wind_speed_10m"],
+				   cols["shortwave_radiation"], cols["terrestrial_radiation"], float(payload.get("elevation") or 0)),
+		day_idx, n_days,
+	)
+	wet = leaf_wet(temp, cols["relative_humidity_2m"], cols["dew_point_2m"], cols["precipitation"])
+	wet_hours = np.bincount(day_idx, weights=wet, minlength=n_days)
+	# Long wet spells in mild temperatures favour fungal diseases
+	risky = np.bincount(day_idx, weights=wet & (temp >= 15) & (temp <= 30), minlength=n_days)
+
+	ok = spray_ok(cols, getattr(settings, 'AGRO_SPRAY_RAINFAST_HOURS', 2))
+	now = (payload.get("current") or {}).get("time")
+	if now:
+		ok &= times >= np.datetime64(now, "h")
+	windows = [
+		{
+			"start": str(times[s]),
+			"end": str(times[e - 1] + np.timedelta64(1, "h")),
+			"hours": int(e - s),
+		}
+		for s, e in runs(ok, getattr(settings, 'AGRO_SPRAY_MIN_HOURS', 2))
+	][:getattr(settings, 'AGRO_SPRAY_MAX_WINDOWS', 6)]
+
+	gdd_total = sum(g for g in gdd if g is not None)
+	return {
+		"gdd_base": base,
+		"gdd_total": round(gdd_total, 1),
+		"days": [
+			{
+				"date": str(day),
+				"gdd": gdd[i],
+				"et0": et0[i],
+				"leaf_wet_hours": int(wet_hours[i]),
+				"disease_risk": bool(risky[i] >= 10),
+			}
+			for i, day in enumerate(days)
+		],
+		"spray_windows": windows,
+	}
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AgrimitraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agrimitra'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,144 @@
+import json
+import zlib
+from datetime import timedelta
+from typing import Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Conversation, ConversationArchive, ConversationMessage
+
+# Lazy import holder; zstandard is optional, zlib is always available
+zstd = None
+
+
+def _zstd():
+	global zstd
+	if zstd is None:
+		try:
+			import zstandard as _zstd
+			zstd = _zstd
+		except Exception:  # pragma: no cover
+			zstd = False
+	return zstd or None
+
+
+def compress(raw: bytes) -> Tuple[str, bytes]:
+	"""Compress with settings.CHAT_ARCHIVE_CODEC ('zstd' or 'zlib'); zstd falls back to zlib if missing."""
+	codec = getattr(settings, 'CHAT_ARCHIVE_CODEC', 'zstd')
+	if codec == 'zstd' and _zstd():
+		return 'zstd', zstd.ZstdCompressor(level=10).compress(raw)
+	return 'zlib', zlib.compress(raw, 9)
+
+
+def decompress(codec: str, blob: bytes) -> bytes:
+	if codec == 'zstd':
+		if not _zstd():
+			raise RuntimeError("This archive is zstd-compressed; install 'zstandard' to read it.")
+		return zstd.ZstdDecompressor().decompress(bytes(blob))
+	return zlib.decompress(bytes(blob))
+
+
+def archive_conversation(conversation: Conversation) -> int:
+	"""Move a conversation's messages into its compressed archive; returns the number moved."""
+	with transaction.atomic():
+		rows = list(
+			ConversationMessage.objects.filter(conversation=conversation)
+			.order_by('id').values('id', 'role', 'text', 'created_at')
+		)
+		if not rows:
+			return 0
+		existing = ConversationArchive.objects.filter(conversation=conversation).first()
+		if existing:
+			# Messages added since the last archive run: merge them into the same blob
+			rows = json.loads(decompress(existing.codec, existing.data)) + [
+				{**r, 'created_at': r['created_at'].isoformat()} for r in rows
+			]
+		else:
+			rows = [{**r, 'created_at': r['created_at'].isoformat()} for r in rows]
+		raw = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+		codec, blob = compress(raw)
+		ConversationArchive.objects.update_or_create(
+			conversation=conversation,
+			defaults={'codec': codec, 'data': blob, 'message_count': len(rows), 'raw_bytes': len(raw)},
+		)
+		ConversationMessage.objects.filter(conversation=conversation).delete()
+		# update() keeps updated_at, so archiving does not reorder the sidebar
+		Conversation.objects.filter(id=conversation.id).update(archived=True)
+	conversation.archived = True
+	return len(rows)
+
+
+def ensure_hydrated(conversation: Conversation) -> bool:
+	"""Restore archived messages (original ids and timestamps) before a read or write. Cheap no-op otherwise."""
+	if not conversation.archived:
+		return False
+	with transaction.atomic():
+		archive = ConversationArchive.objects.select_for_update().filter(conversation=conversation).first()
+		if archive is not None:
+			rows = json.loads(decompress(archive.codec, archive.data))
+			msgs = [
+				ConversationMessage(id=r['id'], conversation=conversation, role=r['role'], text=r['text'])
+				for r in rows
+			]
+			ConversationMessage.objects.bulk_create(msgs, batch_size=500)
+			# auto_now_add overwrote created_at on insert; bulk_update writes the originals back
+			for m, r in zip(msgs, rows):
+				m.created_at = parse_datetime(r['created_at'])
+			ConversationMessage.objects.bulk_update(msgs, ['created_at'], batch_size=500)
+			archive.delete()
+		Conversation.objects.filter(id=conversation.id).update(archived=False)
+	conversation.archived = False
+	return True
+
+
+def archive_idle(idle_days: int, limit: int = 500) -> Tuple[int, int]:
+	"""
+	Archive up to `limit` conversations idle for idle_days; returns (conversations, messages).
+
+	Idleness is the time of the newest message: adding a message does not
+	touch Conversation.updated_at, so that column says nothing about use.
+	"""
+	cutoff = timezone.now() - timedelta(days=idle_days)
+	candidates = (
+		Conversation.objects.annotate(last_message_at=Max('messages__created_at'))
+		.filter(last_message_at__lt=cutoff).order_by('last_message_at')[:limit]
+	)
+	convs = msgs = 0
+	for conversation in candidates:
+		moved = archive_conversation(conversation)
+		if moved:
+			convs += 1
+			msgs += moved
+	return convs, msgs
+
+
+def incremental_vacuum(pages: int = 0, enable: bool = False) -> str:
+	"""
+	Give free SQLite pages back to the filesystem.
+
+	Incremental vacuum needs auto_vacuum=INCREMENTAL, which an existing
+	database only picks up after one full VACUUM; pass enable=True to do that
+	switch (it rewrites the whole file once).
+	"""
+	if connection.vendor != 'sqlite':
+		return f"Skipped: {connection.vendor} reclaims space on its own (VACUUM is SQLite-only)."
+	with connection.cursor() as cur:
+		cur.execute("PRAGMA auto_vacuum")
+		mode = cur.fetchone()[0]
+		if mode != 2:
+			if not enable:
+				return "Skipped: auto_vacuum is not INCREMENTAL; rerun with --enable-incremental-vacuum once."
+			cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+			cur.execute("VACUUM")
+			return "Switched database to auto_vacuum=INCREMENTAL (full VACUUM done)."
+		cur.execute("PRAGMA freelist_count")
+		free_before = cur.fetchone()[0]
+		cur.execute(f"PRAGMA incremental_vacuum({int(pages)})" if pages else "PRAGMA incremental_vacuum")
+		cur.fetchall()
+		cur.execute("PRAGMA freelist_count")
+		free_after = cur.fetchone()[0]
+	return f"Reclaimed {free_before - free_after} free pages."
@@ -0,0 +1,144 @@
+import gzip
+import mimetypes
+import os
+import re
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Lazy import holder; brotli is optional, gzip is always available
+brotli = None
+
+# Text assets worth precompressing (images and fonts are compressed already)
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html')
+
+# Inline <style>/<script> blocks; <script src> (empty) and JSON data blocks are not code
+_inline_re = re.compile(r'<(style|script)\b([^>]*)>(.*?)</\1\s*>', re.I | re.S)
+_data_type_re = re.compile(r'''\btype\s*=\s*["']?application/(?:ld\+)?json''', re.I)
+
+
+def _brotli():
+	global brotli
+	if brotli is None:
+		try:
+			import brotli as _brotli_mod
+			brotli = _brotli_mod
+		except Exception:  # pragma: no cover
+			brotli = False
+	return brotli or None
+
+
+def inline_assets(text: str) -> Dict[str, int]:
+	"""Bytes of inline CSS and JS in a template: {'style': n, 'script': n}."""
+	sizes = {'style': 0, 'script': 0}
+	for tag, attrs, body in _inline_re.findall(text):
+		if tag.lower() == 'script' and _data_type_re.search(attrs):
+			continue
+		sizes[tag.lower()] += len(body.strip().encode('utf-8'))
+	return sizes
+
+
+def precompress(path: str) -> Tuple[int, int, int]:
+	"""
+	Write `path`.gz and, with brotli installed, `path`.br next to a file.
+	A twin that would not be smaller is not written (and any old one is
+	removed). Returns (raw, gzip, brotli) sizes, 0 for twins not written.
+	"""
+	with open(path, 'rb') as f:
+		raw = f.read()
+	# mtime=0 keeps the output identical across builds
+	gz = gzip.compress(raw, compresslevel=9, mtime=0)
+	br = _brotli().compress(raw, quality=11) if _brotli() else None
+	sizes = [len(raw), 0, 0]
+	for i, (suffix, blob) in enumerate((('.gz', gz), ('.br', br)), start=1):
+		if blob is not None and len(blob) < len(raw):
+			with open(path + suffix, 'wb') as f:
+				f.write(blob)
+			sizes[i] = len(blob)
+		elif os.path.exists(path + suffix):
+			os.remove(path + suffix)
+	return tuple(sizes)
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+	"""
+	Content-hashed static files (safe to cache forever), each text asset
+	also stored precompressed as .gz and, with brotli installed, .br.
+
+	Before build_static has run (fresh checkout, tests) there is no manifest;
+	files are then referenced by their plain names instead of failing the
+	page render.
+	"""
+
+	manifest_strict = False
+
+	def stored_name(self, name):
+		try:
+			return super().stored_name(name)
+		except ValueError:
+			# Neither in the manifest nor collected to STATIC_ROOT
+			return name
+
+	def post_process(self, paths, dry_run=False, **options):
+		yield from super().post_process(paths, dry_run=dry_run, **options)
+		if dry_run:
+			return
+		for name in sorted(set(self.hashed_files.values())):
+			if name.endswith(COMPRESSIBLE) and self.exists(name):
+				precompress(self.path(name))
+
+
+def _accepted_encodings(request) -> set:
+	return {part.split(';')[0].strip().lower() for part in request.headers.get('Accept-Encoding', '').split(',')}
+
+
+def serve(request, path):
+	"""
+	Files from STATIC_ROOT, for deployments without a web server in front.
+	Content-hashed names are cached for a year as immutable, anything else
+	is revalidated; the .br/.gz twin is sent to clients that accept it.
+	"""
+	if path.endswith(('.gz', '.br')):
+		raise Http404
+	try:
+		full = safe_join(settings.STATIC_ROOT, path)
+	except (SuspiciousFileOperation, ValueError):
+		raise Http404
+	if not os.path.isfile(full):
+		raise Http404
+
+	hashed = path in getattr(staticfiles_storage, 'hashed_files', {}).values()
+	mtime = os.stat(full).st_mtime
+	if not hashed and not was_modified_since(request.headers.get('If-Modified-Since'), mtime):
+		return HttpResponseNotModified()
+
+	served, encoding = full, None
+	accepted = _accepted_encodings(request)
+	twins = [(enc, full + suffix) for enc, suffix in (('br', '.br'), ('gzip', '.gz')) if os.path.exists(full + suffix)]
+	for enc, twin in twins:
+		if enc in accepted:
+			served, encoding = twin, enc
+			break
+
+	# Typed by the original name: FileResponse would call a .br/.gz twin an archive
+	content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+	if content_type.startswith('text/') or content_type.endswith(('javascript', 'json', '+xml')):
+		content_type += '; charset=utf-8'
+	response = FileResponse(open(served, 'rb'), content_type=content_type)
+	if encoding:
+		response.headers['Content-Encoding'] = encoding
+	if twins:
+		patch_vary_headers(response, ('Accept-Encoding',))
+	response.headers['Last-Modified'] = http_date(mtime)
+	if hashed:
+		patch_cache_control(response, public=True, max_age=getattr(settings, 'STATIC_MAX_AGE', 365 * 24 * 3600), immutable=True)
+	else:
+		patch_cache_control(response, public=True, no_cache=True)
+	return response
@@ -0,0 +1,132 @@
+import re
+from datetime import date
+from typing import List, Optional
+
+from django.utils import timezone
+
+from .llm_backends import get_backend
+from .models import AdvisoryBulletin, FarmerProfile
+
+# Crops bulletins are generated for, with common English/Hindi/regional spellings
+COMMON_CROPS = {
+	'rice': ['rice', 'paddy', 'dhan', 'chawal', 'धान', 'चावल'],
+	'wheat': ['wheat', 'gehu', 'gehun', 'gahu', 'गेहूं', 'गेहूँ', 'गहू'],
+	'maize': ['maize', 'corn', 'makka', 'makai', 'मक्का'],
+	'cotton': ['cotton', 'kapas', 'kapus', 'कपास', 'कापूस'],
+	'sugarcane': ['sugarcane', 'ganna', 'गन्ना', 'ऊस'],
+	'soybean': ['soybean', 'soyabean', 'soya', 'सोयाबीन'],
+	'groundnut': ['groundnut', 'peanut', 'moongphali', 'mungfali', 'shengdana', 'मूंगफली', 'भुईमूग'],
+	'mustard': ['mustard', 'sarson', 'सरसों'],
+	'chickpea': ['chickpea', 'gram', 'chana', 'harbhara', 'चना', 'हरभरा'],
+	'pigeon pea': ['pigeon pea', 'arhar', 'tur', 'toor', 'अरहर', 'तूर'],
+	'tomato': ['tomato', 'tamatar', 'टमाटर'],
+	'onion': ['onion', 'pyaz', 'kanda', 'प्याज', 'कांदा'],
+	'potato': ['potato', 'aloo', 'alu', 'आलू', 'बटाटा'],
+}
+
+# Phrases that mark a generic "what should I do with this crop now" question
+ADVISORY_WORDS = [
+	'advisory', 'advice', 'tips', 'this season', 'this month', 'guidance', 'bulletin',
+	'सलाह', 'सुझाव', 'सल्ला',
+]
+
+# Words that mark a specific problem (symptom, pest, disease, photo): those go to the LLM
+SPECIFIC_WORDS = [
+	'yellow', 'yellowing', 'spot', 'spots', 'wilt', 'wilting', 'curl', 'curling', 'rot', 'rotting', 'dry', 'drying',
+	'dying', 'dead', 'hole', 'holes', 'damage', 'damaged', 'pest', 'pests', 'insect', 'insects', 'worm', 'worms',
+	'caterpillar', 'aphid', 'aphids', 'borer', 'mite', 'mites', 'disease', 'diseases', 'fungus', 'fungal', 'blight',
+	'virus', 'infection', 'infected', 'photo', 'picture', 'image', 'attached', 'symptom', 'symptoms', 'problem',
+	'कीड़ा', 'कीड़े', 'कीट', 'इल्ली', 'रोग', 'बीमारी', 'पीला', 'पीली', 'पीले', 'दाग', 'सड़', 'फोटो',
+]
+
+MAX_GENERIC_WORDS = 12
+
+
+def _word_re(words: List[str]) -> re.Pattern:
+	return re.compile(r'(?<!\w)(' + '|'.join(sorted((re.escape(w) for w in set(words)), key=len, reverse=True)) + r')(?!\w)')
+
+
+_advisory_re = _word_re(ADVISORY_WORDS)
+_specific_re = _word_re(SPECIFIC_WORDS)
+
+_alias_to_crop = {alias.casefold(): crop for crop, aliases in COMMON_CROPS.items() for alias in aliases}
+_alias_re = _word_re(list(_alias_to_crop))
+
+BULLETIN_PROMPT = (
+	"Write a short seasonal crop advisory bulletin for {crop} farmers in {state}, India, for the {season} season. "
+	"Cover sowing/transplanting timing, recommended practices for this stage of the season, irrigation, "
+	"nutrient management, the main pests and diseases to watch for with safe control measures, and "
+	"one or two government scheme reminders if relevant. Use simple language, at most 200 words, as bullet points."
+)
+
+
+def current_season(day: Optional[date] = None) -> str:
+	"""Kharif June–October, Rabi November–March, Zaid April–May."""
+	month = (day or timezone.localdate()).month
+	if 6 <= month <= 10:
+		return 'kharif'
+	if month >= 11 or month <= 3:
+		return 'rabi'
+	return 'zaid'
+
+
+def crops_in(text: str) -> List[str]:
+	"""Canonical crop names mentioned in free text, in order of appearance."""
+	found = []
+	for m in _alias_re.finditer((text or '').casefold()):
+		crop = _alias_to_crop[m.group(1)]
+		if crop not in found:
+			found.append(crop)
+	return found
+
+
+def generate_bulletin(state: str, crop: str, language: str, season: str) -> AdvisoryBulletin:
+	"""Ask the LLM backend for one bulletin and store it."""
+	lang_name = dict(FarmerProfile.LANGUAGE_CHOICES).get(language, language)
+	state_name = dict(FarmerProfile.STATE_CHOICES).get(state, state)
+	prompt = BULLETIN_PROMPT.format(crop=crop, state=state_name, season=season.title())
+	text, _raw = get_backend().ask(prompt, language=lang_name)
+	bulletin, _ = AdvisoryBulletin.objects.update_or_create(
+		state=state, crop=crop, language=language, season=season,
+		defaults={'text': (text or '').strip()},
+	)
+	return bulletin
+
+
+def bulletins_for_profile(profile: Optional[FarmerProfile], limit: int = 3) -> List[AdvisoryBulletin]:
+	"""Current-season bulletins for the farmer's state, main crops and language."""
+	if not profile or not profile.state:
+		return []
+	crops = crops_in(profile.main_crops or '')
+	if not crops:
+		return []
+	rows = AdvisoryBulletin.objects.filter(
+		state=profile.state, crop__in=crops, language=profile.preferred_language or 'en', season=current_season(),
+	)
+	by_crop = {b.crop: b for b in rows}
+	return [by_crop[c] for c in crops if c in by_crop][:limit]
+
+
+def is_generic_ask(message: str) -> bool:
+	"""A short, whole-word advisory request ("today's wheat advisory") that names no specific problem."""
+	text = (message or '').casefold()
+	if not text or len(text.split()) > MAX_GENERIC_WORDS:
+		return False
+	return bool(_advisory_re.search(text)) and not _specific_re.search(text)
+
+
+def instant_answer(profile: Optional[FarmerProfile], message: str, lang_code: str) -> Optional[AdvisoryBulletin]:
+	"""
+	A stored bulletin that answers a generic seasonal question about one
+	crop, if there is one. The crop comes from the message, or from the
+	profile when the farmer grows a single listed crop.
+	"""
+	if not profile or not profile.state or not is_generic_ask(message):
+		return None
+	crops = crops_in(message) or crops_in(profile.main_crops or '')
+	if len(crops) != 1:
+		return None
+	return AdvisoryBulletin.objects.filter(
+		state=profile.state, crop=crops[0], language=lang_code or profile.preferred_language or 'en',
+		season=current_season(),
+	).first()
@@ -0,0 +1,142 @@
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .archive import ensure_hydrated
+from .conversation_memory import build_history, maybe_refresh_summary
+from .llm_backends import get_backend
+from .models import ChatJob, Conversation, ConversationMessage
+from .quotas import record_usage
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+	return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def reply_to(conversation: Conversation, message: str, image=None, language: Optional[str] = None,
+			 before_id: Optional[int] = None) -> Tuple[str, dict, ConversationMessage]:
+	"""Ask the LLM backend for the next assistant turn and persist it."""
+	ensure_hydrated(conversation)
+	summary, history = build_history(conversation, before_id=before_id)
+	text, raw = get_backend().ask(message, image, language=language, history=history, summary=summary)
+	record_usage(conversation.user_id, raw)
+	reply = ConversationMessage.objects.create(conversation=conversation, role='assistant', text=text)
+	maybe_refresh_summary(conversation)
+	return text, raw, reply
+
+
+def submit(user, conversation: Conversation, message: str, image=None, language: Optional[str] = None,
+		   user_message: Optional[ConversationMessage] = None) -> ChatJob:
+	"""Queue a chat request; the caller has already persisted the user's turn."""
+	return ChatJob.objects.create(
+		user=user,
+		conversation=conversation,
+		user_message=user_message,
+		message=message or '',
+		image=image,
+		language=language or '',
+		max_attempts=getattr(settings, 'CHAT_JOB_MAX_ATTEMPTS', 3),
+	)
+
+
+def claim(worker: str, limit: int) -> List[ChatJob]:
+	"""
+	Atomically take up to `limit` due jobs for this worker.
+
+	Each job is flipped from queued to running with a conditional UPDATE, so
+	two workers racing for the same row cannot both win it. Running jobs
+	whose lease has expired (worker died) are put back in the queue first,
+	or failed once they have used all their attempts: a job that crashes
+	its worker must not be retried forever.
+	"""
+	now = timezone.now()
+	lease = timedelta(seconds=getattr(settings, 'CHAT_JOB_LEASE', 300))
+	expired = ChatJob.objects.filter(status=ChatJob.RUNNING, locked_at__lt=now - lease)
+	for job in expired.filter(attempts__gte=F('max_attempts')):
+		won = ChatJob.objects.filter(id=job.id, status=ChatJob.RUNNING).update(
+			status=ChatJob.FAILED, locked_by='', finished_at=now,
+			error=job.error or 'The worker stopped while answering this request.',
+		)
+		if won:
+			_discard_image(job)
+			ChatJob.objects.filter(id=job.id).update(image=None)
+	expired.filter(attempts__lt=F('max_attempts')).update(status=ChatJob.QUEUED, locked_by='')
+
+	claimed = []
+	candidates = ChatJob.objects.filter(status=ChatJob.QUEUED, run_after__lte=now).values_list('id', flat=True)[:limit * 2]
+	for job_id in candidates:
+		won = ChatJob.objects.filter(id=job_id, status=ChatJob.QUEUED).update(
+			status=ChatJob.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+		)
+		if won:
+			claimed.append(ChatJob.objects.select_related('conversation').get(id=job_id))
+			if len(claimed) >= limit:
+				break
+	return claimed
+
+
+def run(job: ChatJob) -> ChatJob:
+	"""Answer a claimed job, retrying with exponential backoff on failure."""
+	try:
+		image = job.image.open('rb') if job.image else None
+		try:
+			_text, _raw, reply = reply_to(
+				job.conversation, job.message, image,
+				language=job.language or None,
+				before_id=job.user_message_id,
+			)
+		finally:
+			if image is not None:
+				image.close()
+	except Exception as e:
+		logger.warning("Chat job %s attempt %s failed: %s", job.id, job.attempts, e)
+		job.error = str(e)
+		job.locked_by = ''
+		if job.attempts < job.max_attempts:
+			backoff = getattr(settings, 'CHAT_JOB_RETRY_BACKOFF', 5) * (2 ** (job.attempts - 1))
+			job.status = ChatJob.QUEUED
+			job.run_after = timezone.now() + timedelta(seconds=backoff)
+		else:
+			job.status = ChatJob.FAILED
+			job.finished_at = timezone.now()
+			_discard_image(job)
+		job.save(update_fields=['status', 'error', 'locked_by', 'run_after', 'finished_at', 'image'])
+		return job
+
+	job.status = ChatJob.DONE
+	job.reply = reply
+	job.error = ''
+	job.locked_by = ''
+	job.finished_at = timezone.now()
+	_discard_image(job)
+	job.save(update_fields=['status', 'reply', 'error', 'locked_by', 'finished_at', 'image'])
+	return job
+
+
+def _discard_image(job: ChatJob):
+	if job.image:
+		job.image.delete(save=False)
+
+
+def job_payload(job: ChatJob) -> dict:
+	"""JSON shape returned to the polling client."""
+	data = {
+		'ok': job.status != ChatJob.FAILED,
+		'job_id': job.id,
+		'status': job.status,
+		'conversation_id': job.conversation_id,
+		'title': job.conversation.title,
+	}
+	if job.status == ChatJob.DONE and job.reply_id:
+		data['reply'] = job.reply.text
+	elif job.status == ChatJob.FAILED:
+		data['error'] = job.error or 'Failed to get response'
+	return data
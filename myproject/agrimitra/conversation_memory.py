@@ -0,0 +1,117 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .llm_backends import get_backend
+from .models import Conversation, ConversationMessage
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+	"Summarize the following farming-assistant conversation for your own future reference. "
+	"Keep the farmer's crops, location, problems, numbers and any advice already given. "
+	"Write at most 120 words in the same language as the conversation. "
+	"Return only the summary."
+)
+
+
+def estimate_tokens(text: str) -> int:
+	"""Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+	return len(text or '') // 4 + 1
+
+
+def build_history(conversation: Conversation, budget: Optional[int] = None, before_id: Optional[int] = None) -> Tuple[str, List[Dict[str, str]]]:
+	"""
+	Assemble (summary, recent turns) for a prompt within a token budget.
+
+	Turns newer than the summary cutoff (and older than before_id, if given)
+	are taken newest-first until the budget, less whatever the summary
+	costs, is used up.
+	"""
+	if budget is None:
+		budget = getattr(settings, 'CHAT_PROMPT_TOKEN_BUDGET', 1500)
+	summary = conversation.summary or ''
+	remaining = budget - (estimate_tokens(summary) if summary else 0)
+
+	qs = conversation.messages.order_by('-id')
+	if conversation.summary_message_id:
+		qs = qs.filter(id__gt=conversation.summary_message_id)
+	if before_id:
+		qs = qs.filter(id__lt=before_id)
+	turns = []
+	for m in qs.values('role', 'text').iterator(chunk_size=16):
+		cost = estimate_tokens(m['text'])
+		if turns and cost > remaining:
+			break
+		turns.append(m)
+		remaining -= cost
+	turns.reverse()
+	return summary, turns
+
+
+def maybe_refresh_summary(conversation: Conversation) -> bool:
+	"""Schedule a summary refresh once enough turns have piled up past the cutoff."""
+	every = getattr(settings, 'CHAT_SUMMARY_EVERY', 6)
+	keep = getattr(settings, 'CHAT_SUMMARY_KEEP_RECENT', 4)
+	qs = conversation.messages.all()
+	if conversation.summary_message_id:
+		qs = qs.filter(id__gt=conversation.summary_message_id)
+	if qs.count() < every + keep:
+		return False
+	# One refresh per conversation at a time, across workers
+	lock_key = f"chat:summary-lock:{conversation.id}"
+	if not cache.add(lock_key, 1, timeout=300):
+		return False
+	if getattr(settings, 'CHAT_SUMMARY_ASYNC', True):
+		threading.Thread(target=_refresh_in_thread, args=(conversation.id, lock_key), daemon=True).start()
+	else:
+		try:
+			refresh_summary(conversation.id)
+		finally:
+			cache.delete(lock_key)
+	return True
+
+
+def _refresh_in_thread(conversation_id: int, lock_key: str):
+	try:
+		refresh_summary(conversation_id)
+	except Exception:
+		logger.exception("Summary refresh failed for conversation %s", conversation_id)
+	finally:
+		cache.delete(lock_key)
+		close_old_connections()
+
+
+def refresh_summary(conversation_id: int) -> Optional[str]:
+	"""Fold turns older than the most recent few into the conversation's rolling summary."""
+	keep = getattr(settings, 'CHAT_SUMMARY_KEEP_RECENT', 4)
+	conversation = Conversation.objects.get(id=conversation_id)
+	qs = ConversationMessage.objects.filter(conversation_id=conversation_id).order_by('id')
+	if conversation.summary_message_id:
+		qs = qs.filter(id__gt=conversation.summary_message_id)
+	pending = list(qs.values('id', 'role', 'text'))
+	to_fold = pending[:-keep] if keep else pending
+	if not to_fold:
+		return None
+
+	lines = []
+	if conversation.summary:
+		lines.append(f"Earlier summary: {conversation.summary}")
+	for m in to_fold:
+		lines.append(f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['text']}")
+	text, _raw = get_backend().ask(SUMMARY_PROMPT + "\n\n" + "\n".join(lines))
+	text = (text or '').strip()
+	if not text:
+		return None
+	# update() leaves updated_at alone so the sidebar order is not disturbed
+	Conversation.objects.filter(id=conversation_id).update(
+		summary=text,
+		summary_message_id=to_fold[-1]['id'],
+		summary_updated_at=timezone.now(),
+	)
+	return text
@@ -0,0 +1,146 @@
+import threading
+import time
+from decimal import Decimal
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .bulletins import COMMON_CROPS, crops_in
+from .models import FarmerProfile, Scheme
+
+# Upper bounds (acres, exclusive) of Scheme.FARM_SIZE_CHOICES; the last band is open-ended
+FARM_SIZE_LIMITS = [
+	('marginal', Decimal('2.5')),
+	('small', Decimal('5')),
+	('semi_medium', Decimal('10')),
+	('medium', Decimal('25')),
+	('large', None),
+]
+
+# Segment = (state, farm size band, farming type, crop); '' stands for "not given"
+Segment = Tuple[str, str, str, str]
+
+
+def farm_size_band(size) -> str:
+	if size is None:
+		return ''
+	size = Decimal(size)
+	for band, limit in FARM_SIZE_LIMITS:
+		if limit is None or size < limit:
+			return band
+	return ''
+
+
+def _choice_codes(choices) -> Dict[str, str]:
+	"""Code for each code and label of a choices list, case-folded."""
+	return {text.casefold(): code for code, label in choices for text in (code, label)}
+
+
+_state_codes = _choice_codes(FarmerProfile.STATE_CHOICES)
+_farming_codes = _choice_codes(FarmerProfile.FARMING_CHOICES)
+
+
+def profile_segments(profile: FarmerProfile) -> List[Segment]:
+	"""
+	Every segment a farmer belongs to: one per (farming type, crop) pair they listed.
+
+	Labels and odd casing ('Dairy', 'Crop Farming') are mapped to their codes;
+	values the index does not know (legacy or free text) count as not given,
+	so the farmer still matches schemes that do not restrict that dimension.
+	"""
+	types = [_farming_codes.get(t.strip().casefold(), '') for t in (profile.farming_types or '').split(',') if t.strip()]
+	crops = crops_in(profile.main_crops or '') or ['']
+	band = farm_size_band(profile.farm_size)
+	state = _state_codes.get((profile.state or '').strip().casefold(), '')
+	return [(state, band, t, c) for t, c in product(list(dict.fromkeys(types)) or [''], crops)]
+
+
+class SchemeIndex:
+	"""
+	Precomputed scheme match sets for every segment.
+
+	Each active scheme gets one bit. Per dimension, every value maps to the
+	mask of schemes that accept it (schemes with an empty list accept all
+	values and '' too); a segment's match set is the AND of its four masks,
+	computed once for all segments when the index is built. Looking up a
+	farmer is then a dict hit per segment they belong to.
+	"""
+
+	def __init__(self, schemes: Sequence[Scheme]):
+		self.schemes = list(schemes)
+		dimensions = [
+			('states', [code for code, _ in FarmerProfile.STATE_CHOICES]),
+			('farm_sizes', [code for code, _ in Scheme.FARM_SIZE_CHOICES]),
+			('farming_types', [code for code, _ in FarmerProfile.FARMING_CHOICES]),
+			('crops', list(COMMON_CROPS)),
+		]
+		masks = [self._masks(field, values) for field, values in dimensions]
+		self.segments: Dict[Segment, int] = {}
+		for combo in product(*(m.items() for m in masks)):
+			match = -1
+			for _value, mask in combo:
+				match &= mask
+			if match:
+				self.segments[tuple(value for value, _mask in combo)] = match
+
+	def _masks(self, field: str, values: List[str]) -> Dict[str, int]:
+		masks = dict.fromkeys(['', *values], 0)
+		for bit, scheme in enumerate(self.schemes):
+			accepted = getattr(scheme, field) or None
+			for value in masks:
+				if accepted is None or value in accepted:
+					masks[value] |= 1 << bit
+		return masks
+
+	def match(self, segments: Sequence[Segment]) -> List[Scheme]:
+		mask = 0
+		for segment in segments:
+			mask |= self.segments.get(segment, 0)
+		# Bits follow Scheme ordering (priority, then title)
+		return [scheme for bit, scheme in enumerate(self.schemes) if mask >> bit & 1]
+
+
+_index: Optional[SchemeIndex] = None
+_signature = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def invalidate():
+	"""Drop this process's index (other workers notice the change within SCHEME_INDEX_TTL)."""
+	global _index, _checked_at
+	with _lock:
+		_index = None
+		_checked_at = 0.0
+
+
+def get_index() -> SchemeIndex:
+	"""
+	The process-wide index, rebuilt when the Scheme table changes.
+
+	The table's row count and latest update time are compared at most every
+	SCHEME_INDEX_TTL seconds, so most calls touch no database at all.
+	"""
+	global _index, _signature, _checked_at
+	ttl = getattr(settings, 'SCHEME_INDEX_TTL', 60)
+	if _index is not None and time.monotonic() - _checked_at < ttl:
+		return _index
+	with _lock:
+		if _index is not None and time.monotonic() - _checked_at < ttl:
+			return _index
+		signature = Scheme.objects.aggregate(n=Count('id'), latest=Max('updated_at'))
+		if _index is None or signature != _signature:
+			_index = SchemeIndex(Scheme.objects.filter(active=True))
+			_signature = signature
+		_checked_at = time.monotonic()
+		return _index
+
+
+def recommended_schemes(profile: Optional[FarmerProfile], limit: Optional[int] = None) -> List[Scheme]:
+	"""Active schemes the farmer is eligible for, highest priority first."""
+	if not profile:
+		return []
+	schemes = get_index().match(profile_segments(profile))
+	return schemes[:limit] if limit else schemes
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import math
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import FarmerProfile, ForecastCell
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[float, float], Dict[str, Any]]
+
+_flight = SingleFlight('forecast-cell', lock_ttl=30, wait_timeout=25)
+
+# In-flight async misses, by (event loop, cell key): later requests await the first one's fetch
+_async_inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+
+def grid_size() -> float:
+	return getattr(settings, 'FORECAST_GRID_DEG', 0.1)
+
+
+def snap(lat: float, lon: float) -> Tuple[str, float, float]:
+	"""(cell key, cell-centre lat, cell-centre lon) for a point, on a FORECAST_GRID_DEG grid."""
+	step = grid_size()
+	lat_c = round(round(lat / step) * step, 6)
+	lon_c = round(round(lon / step) * step, 6)
+	return f"{lat_c:g},{lon_c:g}", lat_c, lon_c
+
+
+def next_model_update(now: Optional[datetime] = None) -> datetime:
+	"""
+	When upstream next publishes a new model run.
+
+	Open-Meteo refreshes its forecasts on a fixed schedule
+	(FORECAST_UPDATE_INTERVAL seconds, data available FORECAST_UPDATE_DELAY
+	seconds after each boundary); a cell fetched in between cannot change.
+	"""
+	now = now or timezone.now()
+	interval = getattr(settings, 'FORECAST_UPDATE_INTERVAL', 3600)
+	delay = getattr(settings, 'FORECAST_UPDATE_DELAY', 600)
+	epoch = now.timestamp() - delay
+	boundary = (math.floor(epoch / interval) + 1) * interval + delay
+	return datetime.fromtimestamp(boundary, tz=dt_timezone.utc)
+
+
+def store(key: str, lat: float, lon: float, data: Dict[str, Any]) -> ForecastCell:
+	now = timezone.now()
+	cell, _ = ForecastCell.objects.update_or_create(
+		key=key,
+		defaults={'latitude': lat, 'longitude': lon, 'data': data, 'fetched_at': now, 'fresh_until': next_model_update(now)},
+	)
+	return cell
+
+
+def profile_cells(rows: Iterable[Tuple[int, Optional[str], str]], geocode: Callable[..., Optional[Dict[str, Any]]]) -> Tuple[Dict[str, Dict[str, Any]], int]:
+	"""
+	Group (user_id, district_village, state) rows by forecast grid cell.
+
+	Locations are resolved like the weather page does (village first, then
+	the state name, passing the profile's state code as `state`), each
+	distinct (query, state) once. Returns
+	({cell key: {'lat', 'lon', 'users': [user ids]}}, number of unresolved rows).
+	"""
+	state_names = dict(FarmerProfile.STATE_CHOICES)
+	resolved: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+	cells: Dict[str, Dict[str, Any]] = {}
+	unresolved = 0
+	for user_id, village, state in rows:
+		geo = None
+		for query in ((village or '').strip(), state_names.get(state, '')):
+			if not query:
+				continue
+			if (query, state) not in resolved:
+				try:
+					resolved[query, state] = geocode(query, state=state)
+				except Exception as e:
+					logger.warning("Geocoding %r failed: %s", query, e)
+					resolved[query, state] = None
+			geo = resolved[query, state]
+			if geo:
+				break
+		if not geo:
+			unresolved += 1
+			continue
+		key, lat, lon = snap(geo['latitude'], geo['longitude'])
+		cells.setdefault(key, {'lat': lat, 'lon': lon, 'users': []})['users'].append(user_id)
+	return cells, unresolved
+
+
+def lookup(lat: float, lon: float) -> Tuple[str, float, float, Optional[Dict[str, Any]], bool]:
+	"""
+	(cell key, cell lat, cell lon, cached data, stale) for a point.
+
+	data is None when the cell is missing or older than FORECAST_STALE_TTL;
+	stale is True when data is usable but past its model update.
+	"""
+	key, lat_c, lon_c = snap(lat, lon)
+	cell = ForecastCell.objects.filter(key=key).first()
+	now = timezone.now()
+	if cell is not None:
+		if cell.fresh_until > now:
+			return key, lat_c, lon_c, cell.data, False
+		stale_ttl = getattr(settings, 'FORECAST_STALE_TTL', 6 * 3600)
+		if cell.fetched_at + timedelta(seconds=stale_ttl) > now:
+			return key, lat_c, lon_c, cell.data, True
+	return key, lat_c, lon_c, None, False
+
+
+def get_forecast(lat: float, lon: float, fetch: Fetch) -> Dict[str, Any]:
+	"""
+	Forecast for the grid cell containing (lat, lon), shared by all users in the cell.
+
+	Fresh rows are returned as is. Rows past their model update but within
+	FORECAST_STALE_TTL are returned immediately while one background refresh
+	runs; anything older (or missing) is fetched inline, with concurrent
+	requests for the same cell coalesced into one upstream call.
+	"""
+	key, lat_c, lon_c, data, stale = lookup(lat, lon)
+	if data is not None:
+		if stale:
+			_refresh_in_background(key, lat_c, lon_c, fetch)
+		return data
+	return _flight.do(key, lambda: store(key, lat_c, lon_c, fetch(lat_c, lon_c)).data)
+
+
+async def aget_forecast(lat: float, lon: float, afetch: Callable[[float, float], Awaitable[Dict[str, Any]]], fetch: Fetch) -> Dict[str, Any]:
+	"""
+	Async get_forecast: misses are fetched with `afetch` on the event loop,
+	concurrent misses for the same cell sharing one upstream call; stale
+	cells are refreshed in the background with the sync `fetch`.
+	"""
+	key, lat_c, lon_c, data, stale = await sync_to_async(lookup)(lat, lon)
+	if data is not None:
+		if stale:
+			await sync_to_async(_refresh_in_background)(key, lat_c, lon_c, fetch)
+		return data
+
+	loop = asyncio.get_running_loop()
+	pending = _async_inflight.get((loop, key))
+	if pending is not None:
+		return await asyncio.shield(pending)
+	future = _async_inflight[(loop, key)] = loop.create_future()
+	try:
+		# Another request may have stored the cell since our lookup
+		data = (await sync_to_async(lookup)(lat, lon))[3]
+		if data is None:
+			data = await afetch(lat_c, lon_c)
+			await sync_to_async(store)(key, lat_c, lon_c, data)
+		future.set_result(data)
+		return data
+	except asyncio.CancelledError:
+		future.cancel()
+		raise
+	except Exception as e:
+		future.set_exception(e)
+		future.exception()  # retrieved here, so an unawaited future does not log it again
+		raise
+	finally:
+		_async_inflight.pop((loop, key), None)
+
+
+def _refresh_in_background(key: str, lat: float, lon: float, fetch: Fetch):
+	# One refresh per cell at a time, across workers
+	lock_key = f"forecast:refresh-lock:{key}"
+	if not cache.add(lock_key, 1, timeout=60):
+		return
+	threading.Thread(target=_refresh, args=(key, lat, lon, fetch, lock_key), daemon=True).start()
+
+
+def _refresh(key: str, lat: float, lon: float, fetch: Fetch, lock_key: str):
+	try:
+		store(key, lat, lon, fetch(lat, lon))
+	except Exception:
+		logger.exception("Background forecast refresh failed for cell %s", key)
+	finally:
+		cache.delete(lock_key)
+		close_old_connections()
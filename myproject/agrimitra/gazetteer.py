@@ -0,0 +1,203 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+from .models import FarmerProfile
+
+BUNDLED_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer_in.tsv'
+
+KIND_RANK = {'state': 0, 'district': 1, 'village': 2}
+
+_non_alnum_re = re.compile(r'[^a-z0-9]+')
+
+# Spelling variants common in romanized Indian place names, applied in order
+_PHONETIC_RULES = [
+	(re.compile(r'([kgcjtdpb])h+'), r'\1'),  # aspirates: bh→b, dh→d, kh→k ...
+	(re.compile(r'sh|ss'), 's'),
+	(re.compile(r'ph'), 'f'),
+	(re.compile(r'w'), 'v'),
+	(re.compile(r'z'), 'j'),
+	(re.compile(r'q'), 'k'),
+	(re.compile(r'x'), 'ks'),
+	(re.compile(r'ee|ie|ey|y$'), 'i'),
+	(re.compile(r'oo|ou'), 'u'),
+	(re.compile(r'aa'), 'a'),
+	(re.compile(r'([a-z])\1+'), r'\1'),  # doubled letters
+	(re.compile(r'(?<=[a-z]{3})[aeiou]$'), ''),  # trailing schwa: Pune/Puna, Nashika/Nashik
+]
+
+
+def fold(text: str) -> str:
+	"""ASCII, case-folded, single-spaced form of a place name."""
+	text = unicodedata.normalize('NFKD', text or '')
+	text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+	return _non_alnum_re.sub(' ', text).strip()
+
+
+def phonetic(text: str) -> str:
+	"""Transliteration-insensitive key: 'Nasik', 'Nashik' and 'Naashik' all map to 'nasik'."""
+	key = fold(text).replace(' ', '')
+	for pattern, repl in _PHONETIC_RULES:
+		key = pattern.sub(repl, key)
+	return key
+
+
+class Place(NamedTuple):
+	name: str
+	kind: str
+	state: str
+	latitude: float
+	longitude: float
+
+	def as_dict(self) -> Dict:
+		"""Same shape as OpenMeteoClient.geocode() results."""
+		return {
+			'name': self.name,
+			'latitude': self.latitude,
+			'longitude': self.longitude,
+			'country_code': 'IN',
+			'admin1': dict(FarmerProfile.STATE_CHOICES).get(self.state, self.state),
+			'kind': self.kind,
+			'state': self.state,
+		}
+
+
+class Gazetteer:
+	"""
+	In-memory index of Indian places.
+
+	Names (and alternate names) are kept as two sorted arrays of folded and
+	phonetic keys with parallel place ids, so prefix search is a bisect plus
+	a short scan and fuzzy lookups only compare keys that share a prefix.
+	"""
+
+	def __init__(self, places: Iterable[Tuple[Place, List[str]]]):
+		self.places: List[Place] = []
+		folded, phon = [], []
+		for place, alternates in places:
+			pid = len(self.places)
+			self.places.append(place)
+			for name in {place.name, *alternates}:
+				if fold(name):
+					folded.append((fold(name), pid))
+					phon.append((phonetic(name), pid, fold(name)))
+		folded.sort()
+		phon.sort()
+		self._keys = [k for k, _ in folded]
+		self._ids = [i for _, i in folded]
+		self._pkeys = [k for k, _, _ in phon]
+		self._pids = [i for _, i, _ in phon]
+		# Folded spelling behind each phonetic key, for scoring fuzzy matches
+		self._pnames = [n for _, _, n in phon]
+
+	@classmethod
+	def from_files(cls, paths: Iterable[Path]) -> 'Gazetteer':
+		def rows():
+			for path in paths:
+				path = Path(path)
+				if not path.exists():
+					continue
+				with path.open(encoding='utf-8') as f:
+					for line in f:
+						if not line.strip() or line.startswith('#'):
+							continue
+						name, kind, state, lat, lon, *rest = line.rstrip('\n').split('\t')
+						alternates = [a.strip() for a in (rest[0] if rest else '').split(',') if a.strip()]
+						yield Place(name, kind, state, float(lat), float(lon)), alternates
+		return cls(rows())
+
+	def __len__(self):
+		return len(self.places)
+
+	@staticmethod
+	def _scan(keys: List[str], ids: List[int], prefix: str, limit: int) -> List[int]:
+		found = []
+		i = bisect_left(keys, prefix)
+		while i < len(keys) and keys[i].startswith(prefix) and len(found) < limit:
+			if ids[i] not in found:
+				found.append(ids[i])
+			i += 1
+		return found
+
+	def _rank(self, ids: Iterable[int], query: str, state: Optional[str]) -> List[Place]:
+		places = [self.places[i] for i in dict.fromkeys(ids)]
+		if state:
+			places = [p for p in places if p.state == state] or places
+		return sorted(places, key=lambda p: (fold(p.name) != query, KIND_RANK.get(p.kind, 9), len(p.name), p.name))
+
+	def autocomplete(self, text: str, limit: int = 10, state: Optional[str] = None) -> List[Place]:
+		"""Places whose name (or an alternate spelling) starts with `text`."""
+		prefix = fold(text)
+		if not prefix:
+			return []
+		ids = self._scan(self._keys, self._ids, prefix, limit * 20)
+		if len(ids) < limit and len(prefix) >= 3:
+			ids += self._scan(self._pkeys, self._pids, phonetic(text), limit * 20)
+		return self._rank(ids, prefix, state)[:limit]
+
+	def lookup(self, query: str, fuzzy: bool = True, state: Optional[str] = None) -> Optional[Place]:
+		"""
+		Best single match for a place query such as 'Nasik' or 'Aurangabad, Bihar'.
+
+		Without a state, an exact (folded) name match anywhere. With `state`
+		(or a state named after the comma) only places in that state are
+		answered: 'Aurangabad, Bihar' never becomes Aurangabad in Maharashtra.
+		There, if fuzzy, places whose spelling is at least GAZETTEER_FUZZY_RATIO
+		similar count too: 'Nasik' finds Nashik, but 'Akole' does not become
+		Akola. Anything else is left to the remote geocoder.
+		"""
+		name, _, rest = (query or '').partition(',')
+		state = (self.state_code(rest.split(',')[0]) if rest.strip() else None) or state
+		key = fold(name)
+		if not key:
+			return None
+		i = bisect_left(self._keys, key)
+		ids = []
+		while i < len(self._keys) and self._keys[i] == key:
+			ids.append(self._ids[i])
+			i += 1
+		if state:
+			ids = [pid for pid in ids if self.places[pid].state == state]
+		if not ids and fuzzy and state and len(key) >= 4:
+			min_ratio = getattr(settings, 'GAZETTEER_FUZZY_RATIO', 0.9)
+			lo, hi = self._prefix_range(phonetic(name), 2)
+			scored = [
+				(SequenceMatcher(None, key, self._pnames[j]).ratio(), self._pids[j])
+				for j in range(lo, hi) if self.places[self._pids[j]].state == state
+			]
+			best = max((r for r, _ in scored), default=0)
+			if best >= min_ratio:
+				ids = [pid for r, pid in scored if r == best]
+		ranked = self._rank(ids, key, state)
+		return ranked[0] if ranked else None
+
+	def _prefix_range(self, pkey: str, n: int) -> Tuple[int, int]:
+		lo = bisect_left(self._pkeys, pkey[:n])
+		return lo, bisect_left(self._pkeys, pkey[:n] + '\uffff', lo)
+
+	def state_code(self, text: str) -> Optional[str]:
+		place = self.lookup(text.strip(), fuzzy=False) if text.strip() else None
+		if place and place.kind == 'state':
+			return place.state
+		code = text.strip().upper()
+		return code if code in dict(FarmerProfile.STATE_CHOICES) else None
+
+
+_gazetteer = None
+_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+	"""The process-wide gazetteer, loaded from settings.GAZETTEER_FILES on first use."""
+	global _gazetteer
+	if _gazetteer is None:
+		with _lock:
+			if _gazetteer is None:
+				_gazetteer = Gazetteer.from_files(getattr(settings, 'GAZETTEER_FILES', [BUNDLED_PATH]))
+	return _gazetteer
@@ -1,7 +1,15 @@
+import hashlib
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Optional, Tuple, List, Dict
 
 from django.conf import settings
+from django.core.cache import cache
+
+from .image_utils import prepare_image
+from .model_router import ModelRouter, classify_error, UNAVAILABLE, IMAGE, TRANSIENT
+from .singleflight import SingleFlight
 
 # Lazy import holder
 genai = None  # will be imported in _ensure_client()
@@ -14,6 +22,59 @@ SYSTEM_INSTRUCTION = (
     "When relevant, provide practical, location-agnostic guidance and safety notes."
 )
 
+class GeminiTimeoutError(RuntimeError):
+    """Raised when a request's overall latency budget runs out before any model answered."""
+
+    def __init__(self, budget: float, elapsed: float, tried: Optional[List[str]] = None):
+        self.budget = budget
+        self.elapsed = elapsed
+        self.tried = list(tried or [])
+        super().__init__(f"Gemini request exceeded its {budget:.0f}s time budget.")
+
+    def __reduce__(self):
+        # Rebuilt from its fields when a coalesced call hands it to other workers
+        return self.__class__, (self.budget, self.elapsed, self.tried)
+
+    def as_dict(self) -> dict:
+        return {
+            "code": "timeout",
+            "budget": round(self.budget, 2),
+            "elapsed": round(self.elapsed, 2),
+            "tried": self.tried,
+        }
+
+
+class Deadline:
+    """Wall-clock budget shared by every upstream attempt of one request."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.elapsed())
+
+    def check(self, tried: Optional[List[str]] = None):
+        if self.remaining() <= 0:
+            raise GeminiTimeoutError(self.budget, self.elapsed(), tried)
+
+
+# Identical prompts arriving together (e.g. a forwarded advisory) share one upstream call
+_coalescer = SingleFlight(
+    'gemini',
+    wait_timeout=getattr(settings, 'GEMINI_COALESCE_WAIT', 90),
+)
+
+# Per-process latency/error tracking and circuit breakers for candidate models
+_router = ModelRouter(
+    cooldown=getattr(settings, 'GEMINI_BREAKER_COOLDOWN', 60),
+    failure_threshold=getattr(settings, 'GEMINI_BREAKER_FAILURES', 3),
+)
+_hedge_pool = ThreadPoolExecutor(max_workers=getattr(settings, 'GEMINI_HEDGE_MAX_WORKERS', 8), thread_name_prefix='gemini-hedge')
+
 
 def _ensure_client():
     global genai
@@ -56,26 +117,36 @@ def _model_candidates() -> list[str]:
 
 
 def _image_part_from_django_file(f) -> Optional[dict]:
-    if not f:
+    """Return the inline image part for an upload, downscaled for the model."""
+    prepared = prepare_image(
+        f,
+        max_side=getattr(settings, 'GEMINI_IMAGE_MAX_SIDE', 1024),
+        quality=getattr(settings, 'GEMINI_IMAGE_QUALITY', 80),
+    )
+    if prepared is None:
         return None
-    # Ensure file is read into bytes; Django may give InMemoryUploadedFile or TemporaryUploadedFile
-    data = f.read()
-    # Reset pointer for any further use
-    try:
-        f.seek(0)
-    except Exception:
-        pass
-    mime = getattr(f, 'content_type', None) or 'application/octet-stream'
-    return {"inline_data": {"mime_type": mime, "data": data}}
+    return {"inline_data": {"mime_type": prepared.mime_type, "data": prepared.data}}
 
 
-def ask_gemini(message: str, image_file=None, language: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> Tuple[str, dict]:
+def _analysis_cache_key(parts: list) -> str:
+    # Exact prepared bytes plus every prompt input (language, summary, history, question):
+    # look-alike photos of different plants must not share a diagnosis
+    return f"gemini:image-analysis:{_coalesce_key(parts)}"
+
+
+def ask_gemini(message: str, image_file=None, language: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None, summary: Optional[str] = None, timeout: Optional[float] = None) -> Tuple[str, dict]:
     """
     Ask Gemini with a text prompt and optional image.
 
+    `summary` is a rolling summary of older turns; `history` holds the recent
+    turns that follow it (see conversation_memory.build_history).
+    `timeout` is the overall budget in seconds across every fallback attempt
+    (defaults to settings.GEMINI_REQUEST_BUDGET).
+
     Returns: (text_response, raw_response_dict)
-    Raises RuntimeError on configuration or API errors.
+    Raises GeminiTimeoutError when the budget runs out, RuntimeError on configuration or API errors.
     """
+    deadline = Deadline(timeout if timeout is not None else getattr(settings, 'GEMINI_REQUEST_BUDGET', 45))
     _ensure_client()
 
     parts = []
@@ -83,9 +154,12 @@ def ask_gemini(message: str, image_file=None, language: Optional[str] = None, hi
     if language:
         parts.append(f"Important: Respond ONLY in {language}. If the user writes in another language, translate and answer strictly in {language}.")
 
+    if summary:
+        parts.append(f"Summary of the earlier conversation: {summary.strip()}")
+
     # Include short history for context (user/assistant alternating), newest last
     if history:
-        for turn in history[-8:]:
+        for turn in history[-getattr(settings, 'CHAT_HISTORY_MAX_TURNS', 12):]:
             r = (turn.get('role') or '').lower()
             t = (turn.get('text') or '').strip()
             if not t:
@@ -107,62 +181,149 @@ def ask_gemini(message: str, image_file=None, language: Optional[str] = None, hi
     if not parts:
         raise RuntimeError("Empty prompt: provide text or an image.")
 
+    # The same photo re-sent with the same question in the same context reuses the earlier analysis
+    analysis_key = _analysis_cache_key(parts) if img_part else None
+    if analysis_key:
+        cached = cache.get(analysis_key)
+        if cached is not None:
+            # Flagged so quotas.record_usage does not charge the original call's tokens again
+            text, raw = cached
+            return text, dict(raw or {}, cached=True)
+
+    if not getattr(settings, 'GEMINI_COALESCE', True):
+        result = _generate(parts, img_part, deadline)
+    else:
+        key = _coalesce_key(parts)
+        try:
+            result = _coalescer.do(key, lambda: _generate(parts, img_part, deadline), timeout=deadline.remaining())
+        except TimeoutError:
+            raise GeminiTimeoutError(deadline.budget, deadline.elapsed())
+
+    if analysis_key and result[0]:
+        cache.set(analysis_key, result, timeout=getattr(settings, 'GEMINI_IMAGE_CACHE_TTL', 7 * 24 * 3600))
+    return result
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def _coalesce_key(parts: list) -> str:
+    """Key a prompt by its normalized text parts (language, history, message) and image hash."""
+    h = hashlib.sha256()
+    for p in parts:
+        if isinstance(p, str):
+            h.update(b"t:" + _normalize_text(p).encode('utf-8') + b"\0")
+        else:
+            h.update(b"i:" + hashlib.sha256(p["inline_data"]["data"]).digest())
+    return h.hexdigest()
+
+
+def _call_model(model_name: str, parts: list, deadline: Deadline) -> Tuple[str, dict]:
+    """Run one generate_content call, bounded by whatever is left of the deadline."""
+    deadline.check()
+    model = genai.GenerativeModel(
+        model_name=model_name,
+        system_instruction=SYSTEM_INSTRUCTION,
+        generation_config={
+            "temperature": 0.6,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 2048,
+        },
+    )
+    resp = model.generate_content(parts, request_options={"timeout": deadline.remaining()})
+    text = getattr(resp, 'text', None) or ""
+    if not text:
+        try:
+            for cand in (resp.candidates or []):
+                for part in (cand.content.parts or []):
+                    if getattr(part, 'text', None):
+                        text += part.text
+        except Exception:
+            pass
+    return (text or ""), getattr(resp, 'to_dict', lambda: {} )()
+
+
+def _timed_call(model_name: str, parts: list, deadline: Deadline) -> Tuple[str, dict]:
+    """_call_model() that feeds its latency and outcome to the router."""
+    started = time.monotonic()
+    try:
+        result = _call_model(model_name, parts, deadline)
+    except GeminiTimeoutError:
+        raise
+    except Exception as e:
+        _router.record_failure(model_name, time.monotonic() - started, classify_error(e))
+        raise
+    _router.record_success(model_name, time.monotonic() - started)
+    return result
+
+
+def _hedged_call(primary: str, backup: str, parts: list, deadline: Deadline, attempted: List[str]) -> Tuple[str, dict]:
+    """
+    Call primary; if it has not answered by its p95 latency, also call backup
+    and return whichever succeeds first. Models actually called are appended
+    to `attempted`.
+    """
+    delay = _router.hedge_delay(primary)
+    if delay is None or delay >= deadline.remaining():
+        return _timed_call(primary, parts, deadline)
+    futures = {_hedge_pool.submit(_timed_call, primary, parts, deadline): primary}
+    done, _ = wait(futures, timeout=delay)
+    if not done:
+        attempted.append(backup)
+        futures[_hedge_pool.submit(_timed_call, backup, parts, deadline)] = backup
+    pending = set(futures)
+    last_err = None
+    while pending:
+        done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            raise GeminiTimeoutError(deadline.budget, deadline.elapsed())
+        for f in done:
+            try:
+                return f.result()
+            except GeminiTimeoutError:
+                raise
+            except Exception as e:
+                last_err = e
+    raise last_err
+
+
+def _generate(parts: list, img_part: Optional[dict], deadline: Deadline) -> Tuple[str, dict]:
+    """Send prepared parts upstream, walking routed and discovered models until the deadline."""
     last_err = None
     tried = []
-    for model_name in _model_candidates():
-        if not model_name:
-            continue
+    hedge = getattr(settings, 'GEMINI_HEDGE', False)
+    queue = _router.order([m for m in _model_candidates() if m])
+    while queue:
+        model_name = queue.pop(0)
+        backup = queue[0] if hedge and queue else None
+        attempted = [model_name]
         try:
-            model = genai.GenerativeModel(
-                model_name=model_name,
-                system_instruction=SYSTEM_INSTRUCTION,
-                generation_config={
-                    "temperature": 0.6,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 2048,
-                },
-            )
-            resp = model.generate_content(parts)
-            text = getattr(resp, 'text', None) or ""
-            if not text:
-                try:
-                    for cand in (resp.candidates or []):
-                        for part in (cand.content.parts or []):
-                            if getattr(part, 'text', None):
-                                text += part.text
-                except Exception:
-                    pass
-            return (text or ""), getattr(resp, 'to_dict', lambda: {} )()
+            if backup:
+                return _hedged_call(model_name, backup, parts, deadline, attempted)
+            return _timed_call(model_name, parts, deadline)
+        except GeminiTimeoutError as e:
+            e.tried = tried + attempted
+            raise
         except Exception as e:  # pragma: no cover
-            tried.append(model_name)
-            # If model not found/unsupported, try next; otherwise break
-            msg = str(e).lower()
+            tried.extend(attempted)
+            if backup in attempted:
+                queue.remove(backup)
+            deadline.check(tried)
             last_err = e
-            # If image not supported by this model, try text-only fallback once
-            if img_part and ('image' in msg or 'inline_data' in msg or 'inlinedata' in msg):
-                try:
-                    resp = model.generate_content([p for p in parts if isinstance(p, str) and p])
-                    text = getattr(resp, 'text', None) or ""
-                    if not text:
-                        try:
-                            for cand in (resp.candidates or []):
-                                for part in (cand.content.parts or []):
-                                    if getattr(part, 'text', None):
-                                        text += part.text
-                        except Exception:
-                            pass
-                    return (text or ""), getattr(resp, 'to_dict', lambda: {} )()
-                except Exception as e2:  # pragma: no cover
-                    last_err = e2
-                    msg = str(e2).lower()
-            if 'not found' in msg or '404' in msg or 'not supported' in msg:
+            kind = classify_error(e)
+            # Unavailable models, image rejections (we never drop the photo) and
+            # transient upstream errors move on to the next model; auth or
+            # request errors would fail the same way everywhere
+            if kind in (UNAVAILABLE, IMAGE, TRANSIENT):
                 continue
             break
 
     # Dynamic discovery fallback: list models available to the key and try those supporting generateContent
+    deadline.check(tried)
     try:
-        models = list(genai.list_models())
+        models = list(genai.list_models(request_options={"timeout": deadline.remaining()}))
     except Exception as e:  # pragma: no cover
         models = []
         last_err = last_err or e
@@ -178,31 +339,15 @@ def ask_gemini(message: str, image_file=None, language: Optional[str] = None, hi
             dyn_names.sort(key=lambda n: (('vision' not in n and '1.5' not in n), n))
         else:
             dyn_names.sort()
-        for model_name in dyn_names:
+        for model_name in _router.order([n for n in dyn_names if n not in tried]):
             try:
-                model = genai.GenerativeModel(
-                    model_name=model_name,
-                    system_instruction=SYSTEM_INSTRUCTION,
-                    generation_config={
-                        "temperature": 0.6,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        "max_output_tokens": 2048,
-                    },
-                )
-                resp = model.generate_content(parts)
-                text = getattr(resp, 'text', None) or ""
-                if not text:
-                    try:
-                        for cand in (resp.candidates or []):
-                            for part in (cand.content.parts or []):
-                                if getattr(part, 'text', None):
-                                    text += part.text
-                    except Exception:
-                        pass
-                return (text or ""), getattr(resp, 'to_dict', lambda: {} )()
+                return _timed_call(model_name, parts, deadline)
+            except GeminiTimeoutError as e:
+                e.tried = tried
+                raise
             except Exception as e:  # pragma: no cover
                 tried.append(model_name)
+                deadline.check(tried)
                 last_err = e
                 continue
 
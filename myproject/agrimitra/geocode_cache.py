@@ -0,0 +1,99 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import GeocodeEntry
+
+# Returned by lookup() when nothing usable is cached (None means a cached 'not found')
+MISS = object()
+_space_re = re.compile(r'[\s,.;:/\-]+')
+
+
+def normalize_query(query: str, country_code: Optional[str] = None) -> str:
+	"""Cache key for a place query: NFKC, case-folded, punctuation and runs of spaces collapsed."""
+	text = unicodedata.normalize('NFKC', query or '').casefold()
+	text = _space_re.sub(' ', text).strip()
+	return f"{(country_code or '*').upper()}:{text[:200]}"
+
+
+class LRU:
+	"""Small thread-safe LRU of key -> (value, expires_at epoch seconds)."""
+
+	def __init__(self, size: int):
+		self.size = size
+		self._data: 'OrderedDict[str, Tuple[Any, float]]' = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: str):
+		with self._lock:
+			hit = self._data.get(key)
+			if hit is None:
+				return MISS
+			value, expires = hit
+			if expires <= time.time():
+				del self._data[key]
+				return MISS
+			self._data.move_to_end(key)
+			return value
+
+	def set(self, key: str, value: Any, expires: float):
+		with self._lock:
+			self._data[key] = (value, expires)
+			self._data.move_to_end(key)
+			while len(self._data) > self.size:
+				self._data.popitem(last=False)
+
+	def clear(self):
+		with self._lock:
+			self._data.clear()
+
+
+_lru = LRU(getattr(settings, 'GEOCODE_LRU_SIZE', 1024))
+
+
+def _ttl(result: Optional[Dict[str, Any]]) -> float:
+	if result is None:
+		return getattr(settings, 'GEOCODE_NEGATIVE_TTL', 24 * 3600)
+	return getattr(settings, 'GEOCODE_CACHE_TTL', 90 * 24 * 3600)
+
+
+def lookup(key: str):
+	"""Cached answer for a normalized key from the LRU or the GeocodeEntry table, else MISS."""
+	value = _lru.get(key)
+	if value is not MISS:
+		return value
+	entry = GeocodeEntry.objects.filter(key=key).first()
+	if entry is not None:
+		expires = entry.fetched_at + timedelta(seconds=_ttl(entry.result))
+		if expires > timezone.now():
+			_lru.set(key, entry.result, expires.timestamp())
+			return entry.result
+	return MISS
+
+
+def store(key: str, result: Optional[Dict[str, Any]]):
+	now = timezone.now()
+	GeocodeEntry.objects.update_or_create(key=key, defaults={'result': result, 'fetched_at': now})
+	_lru.set(key, result, now.timestamp() + _ttl(result))
+
+
+def get_or_fetch(key: str, fetch: Callable[[], Optional[Dict[str, Any]]], refresh: bool = False) -> Optional[Dict[str, Any]]:
+	"""
+	Resolve a normalized geocode key through the in-process LRU, then the
+	GeocodeEntry table, then `fetch`. "Not found" (None) is cached too, for
+	a shorter time. Errors from `fetch` are not cached.
+	"""
+	if not refresh:
+		value = lookup(key)
+		if value is not MISS:
+			return value
+	result = fetch()
+	store(key, result)
+	return result
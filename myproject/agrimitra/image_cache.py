@@ -0,0 +1,233 @@
+import hashlib
+import io
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from . import image_utils
+from .geocode_cache import LRU, MISS
+from .models import CachedImage
+
+logger = logging.getLogger(__name__)
+
+# Process-local view of the table: source hash -> {width: storage name} ({} while not cached)
+_lru = LRU(getattr(settings, 'IMAGE_CACHE_LRU_SIZE', 512))
+# Bounds background downloads per process, however many images a page is missing
+_fetch_slots = threading.BoundedSemaphore(2)
+
+
+def sizes() -> Tuple[int, ...]:
+	return tuple(sorted(getattr(settings, 'IMAGE_CACHE_SIZES', (160, 400, 800, 1280))))
+
+
+def source_hash(source: str) -> str:
+	return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _encode(img, width: int) -> Tuple[bytes, str]:
+	"""One size variant: WebP if Pillow can write it, else progressive JPEG."""
+	copy = img.copy()
+	copy.thumbnail((width, width * 4), image_utils.Image.LANCZOS)
+	quality = getattr(settings, 'IMAGE_CACHE_QUALITY', 70)
+	buf = io.BytesIO()
+	try:
+		copy.save(buf, format='WEBP', quality=quality, method=4)
+		return buf.getvalue(), 'webp'
+	except (KeyError, OSError):
+		buf = io.BytesIO()
+		copy.convert('RGB').save(buf, format='JPEG', quality=quality, optimize=True, progressive=True)
+		return buf.getvalue(), 'jpg'
+
+
+def ingest(source: str, data: bytes) -> CachedImage:
+	"""
+	Store size variants of an image under content-hashed media names.
+
+	Variants are made for each IMAGE_CACHE_SIZES width below the original
+	width, plus the original width itself. An image already stored for
+	another source reuses its files.
+	"""
+	if not image_utils._ensure_pillow():
+		raise RuntimeError("Pillow is required to cache images")
+	from PIL import ImageOps
+
+	digest = hashlib.sha256(data).hexdigest()
+	twin = CachedImage.objects.filter(content_hash=digest).exclude(variants={}).first()
+	if twin is not None:
+		fields = {'width': twin.width, 'height': twin.height, 'variants': twin.variants, 'size': twin.size}
+	else:
+		img = ImageOps.exif_transpose(image_utils.Image.open(io.BytesIO(data)))
+		if img.mode not in ('RGB', 'RGBA', 'L'):
+			img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+		widths = [w for w in sizes() if w < img.width] + [min(img.width, sizes()[-1])]
+		variants, total = {}, 0
+		for width in dict.fromkeys(widths):
+			blob, ext = _encode(img, width)
+			name = f"imgcache/{digest[:2]}/{digest[:20]}-{width}.{ext}"
+			if not default_storage.exists(name):
+				name = default_storage.save(name, ContentFile(blob))
+			variants[str(width)] = name
+			total += len(blob)
+		fields = {'width': img.width, 'height': img.height, 'variants': variants, 'size': total}
+
+	now = timezone.now()
+	image, _ = CachedImage.objects.update_or_create(
+		source_hash=source_hash(source),
+		defaults={'source': source, 'content_hash': digest, 'error': '', 'fetched_at': now, 'last_used': now, **fields},
+	)
+	_lru.set(image.source_hash, _names(image), time.time() + 3600)
+	return image
+
+
+def download(url: str) -> bytes:
+	"""Fetch an image, refusing non-images and anything over IMAGE_CACHE_MAX_SOURCE_BYTES."""
+	limit = getattr(settings, 'IMAGE_CACHE_MAX_SOURCE_BYTES', 10 * 1024 * 1024)
+	with requests.get(url, timeout=(5, 30), stream=True, headers={'User-Agent': 'KrishiMitra image cache'}) as r:
+		r.raise_for_status()
+		if not r.headers.get('Content-Type', '').startswith('image/'):
+			raise ValueError(f"not an image: {r.headers.get('Content-Type')}")
+		chunks, total = [], 0
+		for chunk in r.iter_content(64 * 1024):
+			total += len(chunk)
+			if total > limit:
+				raise ValueError("image too large")
+			chunks.append(chunk)
+	return b''.join(chunks)
+
+
+def fetch(source: str) -> Optional[CachedImage]:
+	"""
+	Download and ingest one remote image; failures are recorded so they are
+	retried later, not on every view. Database errors (e.g. SQLite "database
+	is locked" under concurrent writers) are logged and leave the image
+	uncached, to be tried again on a later view.
+	"""
+	try:
+		image = ingest(source, download(source))
+	except DatabaseError as e:
+		logger.warning("Could not store cached image %s: %s", source, e)
+		return None
+	except Exception as e:
+		logger.warning("Could not cache image %s: %s", source, e)
+		try:
+			CachedImage.objects.update_or_create(
+				source_hash=source_hash(source),
+				defaults={'source': source, 'variants': {}, 'size': 0, 'error': str(e)[:255], 'fetched_at': timezone.now()},
+			)
+		except DatabaseError as db_error:
+			logger.warning("Could not record failed image fetch %s: %s", source, db_error)
+		_lru.set(source_hash(source), {}, time.time() + 600)
+		return None
+	try:
+		evict()
+	except DatabaseError as e:
+		logger.warning("Image cache eviction failed: %s", e)
+	return image
+
+
+def _names(image: CachedImage) -> Dict[int, str]:
+	return {int(w): name for w, name in image.variants.items()}
+
+
+def _fetch_in_background(source: str):
+	if not getattr(settings, 'IMAGE_CACHE_FETCH', True):
+		return
+	# One download per source at a time, across workers
+	lock_key = f"imgcache:fetch-lock:{source_hash(source)}"
+	if not cache.add(lock_key, 1, timeout=120):
+		return
+	threading.Thread(target=_fetch_worker, args=(source, lock_key), daemon=True).start()
+
+
+def _fetch_worker(source: str, lock_key: str):
+	try:
+		with _fetch_slots:
+			fetch(source)
+	except Exception:
+		logger.exception("Background image fetch failed for %s", source)
+	finally:
+		cache.delete(lock_key)
+		# This thread's connections would otherwise stay open until it is collected
+		connections.close_all()
+
+
+def local_url(source: str, width: int) -> str:
+	"""
+	Media URL of the smallest cached variant at least `width` wide (or the
+	largest there is). Until the image is cached the source URL is returned
+	and a background download is started, so pages never wait on it.
+	"""
+	if not source or not source.startswith(('http://', 'https://')):
+		return source
+	key = source_hash(source)
+	names = _lru.get(key)
+	if names is not MISS and names and not default_storage.exists(_pick(names, width)):
+		# Evicted by another worker since this process read the row
+		names = MISS
+	if names is MISS:
+		image = CachedImage.objects.filter(source_hash=key).first()
+		retry_after = timedelta(seconds=getattr(settings, 'IMAGE_CACHE_RETRY', 24 * 3600))
+		if image is None or (not image.variants and image.fetched_at + retry_after < timezone.now()):
+			_fetch_in_background(source)
+			names = {}
+		else:
+			names = _names(image)
+			_touch(image)
+		_lru.set(key, names, time.time() + (3600 if names else 60))
+	if not names:
+		return source
+	return default_storage.url(_pick(names, width))
+
+
+def _pick(names: Dict[int, str], width: int) -> str:
+	fitting = [w for w in names if w >= width]
+	return names[min(fitting) if fitting else max(names)]
+
+
+def _touch(image: CachedImage):
+	# last_used drives eviction; hourly resolution is plenty and keeps page views write-free
+	if image.last_used < timezone.now() - timedelta(hours=1):
+		CachedImage.objects.filter(id=image.id).update(last_used=timezone.now())
+
+
+def evict(budget: Optional[int] = None) -> Tuple[int, int]:
+	"""
+	Delete least recently used images until their files fit in
+	IMAGE_CACHE_MAX_BYTES. Rows sharing a content hash share their files, so
+	they go together, ordered by the most recent use of any of them.
+	Returns (images evicted, bytes freed).
+	"""
+	budget = getattr(settings, 'IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024) if budget is None else budget
+	used = disk_usage()
+	evicted = freed = 0
+	blobs = (CachedImage.objects.exclude(variants={}).values('content_hash')
+			 .annotate(last_used=Max('last_used'), size=Max('size')).order_by('last_used'))
+	for blob in blobs.iterator():
+		if used <= budget:
+			break
+		rows = list(CachedImage.objects.filter(content_hash=blob['content_hash']).exclude(variants={}))
+		CachedImage.objects.filter(id__in=[row.id for row in rows]).delete()
+		for row in rows:
+			_lru.set(row.source_hash, {}, time.time() + 60)
+		for name in set(name for row in rows for name in row.variants.values()):
+			default_storage.delete(name)
+		evicted += len(rows)
+		used -= blob['size']
+		freed += blob['size']
+	return evicted, freed
+
+
+def disk_usage() -> int:
+	"""Bytes of cached variants on disk; rows sharing a content hash share files, so each hash counts once."""
+	return sum(dict(CachedImage.objects.exclude(variants={}).values_list('content_hash', 'size')).values())
@@ -0,0 +1,60 @@
+import io
+from typing import Optional, NamedTuple
+
+# Lazy import holder; Pillow is optional and only needed for image uploads
+Image = None
+
+
+class PreparedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+
+
+def _ensure_pillow() -> bool:
+    global Image
+    if Image is None:
+        try:
+            from PIL import Image as _Image
+            Image = _Image
+        except Exception:  # pragma: no cover
+            return False
+    return True
+
+
+def prepare_image(f, max_side: int = 1024, quality: int = 80) -> Optional[PreparedImage]:
+    """
+    Downscale and recompress an uploaded image for a vision model.
+
+    The upload is decoded straight from its file object (JPEG decoding is
+    scaled down in the decoder via draft()), EXIF rotation is applied and the
+    result is re-encoded as JPEG no larger than max_side on either side.
+    Falls back to the raw bytes if Pillow is missing or cannot decode the file.
+    """
+    if not f:
+        return None
+    if _ensure_pillow():
+        try:
+            from PIL import ImageOps
+            img = Image.open(f)
+            img.draft('RGB', (max_side, max_side))
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format='JPEG', quality=quality, optimize=True)
+            return PreparedImage(buf.getvalue(), 'image/jpeg')
+        except Exception:
+            pass
+        finally:
+            try:
+                f.seek(0)
+            except Exception:
+                pass
+    data = f.read()
+    try:
+        f.seek(0)
+    except Exception:
+        pass
+    mime = getattr(f, 'content_type', None) or 'application/octet-stream'
+    return PreparedImage(data, mime)
@@ -0,0 +1,133 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from django.db import DatabaseError, connection
+from django.db.models import Prefetch, Q
+
+from .models import LearningItem, LearningLabel, LearningVariant
+
+logger = logging.getLogger(__name__)
+
+# FTS5 table over LearningVariant rows (rowid = variant id), created by migration 0022 on SQLite
+FTS_TABLE = 'agrimitra_learningsearch'
+
+# Words, keeping Indic vowel signs and viramas (which \w does not match) inside them
+_word_re = re.compile(r'[\w\u0900-\u0d7f]+')
+
+_INDEX_SQL = f"""
+	INSERT INTO {FTS_TABLE} (rowid, title, summary, body, labels, item_id, language)
+	SELECT v.id, v.title, v.summary, v.body,
+		(SELECT group_concat(l.value, ' ') FROM agrimitra_learninglabel l WHERE l.item_id = v.item_id),
+		v.item_id, v.language
+	FROM agrimitra_learningvariant v
+"""
+
+_fts = None
+
+
+def fts_available() -> bool:
+	global _fts
+	if _fts is None:
+		try:
+			with connection.cursor() as cursor:
+				_fts = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names(cursor)
+		except DatabaseError:
+			_fts = False
+	return _fts
+
+
+def index_item(item_id: int):
+	"""Re-index every language variant of one item (after it, a variant or a label changed)."""
+	if not fts_available():
+		return
+	with connection.cursor() as cursor:
+		cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE item_id = %s", [item_id])
+		cursor.execute(_INDEX_SQL + " WHERE v.item_id = %s", [item_id])
+
+
+def rebuild_index():
+	if not fts_available():
+		return
+	with connection.cursor() as cursor:
+		cursor.execute(f"DELETE FROM {FTS_TABLE}")
+		cursor.execute(_INDEX_SQL)
+
+
+def fts_query(text: str) -> str:
+	"""User text -> FTS5 query: every word must match, the last one as a prefix."""
+	words = _word_re.findall(text or '')
+	terms = ['"%s"' % w for w in words[:10]]
+	if terms:
+		terms[-1] += '*'
+	return ' '.join(terms)
+
+
+def search_ids(text: str, language: str, limit: int = 100) -> List[int]:
+	"""Item ids matching `text` in the given language or English, best match (bm25) first."""
+	query = fts_query(text)
+	if not query:
+		return []
+	if fts_available():
+		try:
+			with connection.cursor() as cursor:
+				cursor.execute(
+					f"SELECT item_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND language IN (%s, 'en') "
+					f"ORDER BY bm25({FTS_TABLE}, 10.0, 4.0, 1.0, 6.0) LIMIT %s",
+					[query, language, limit],
+				)
+				return list(dict.fromkeys(row[0] for row in cursor.fetchall()))
+		except DatabaseError as e:
+			logger.warning("Learning FTS query %r failed, falling back to LIKE: %s", query, e)
+	# No FTS5: plain substring match on the same fields
+	qs = LearningVariant.objects.filter(language__in=[language, 'en'])
+	for word in _word_re.findall(text)[:10]:
+		qs = qs.filter(Q(title__icontains=word) | Q(summary__icontains=word) | Q(body__icontains=word))
+	return list(dict.fromkeys(qs.values_list('item_id', flat=True)[:limit]))
+
+
+def browse(language: str, text: str = '', kind: str = '', crop: str = '', tag: str = '', crops: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+	"""
+	Published items as dicts with the variant in `language` (English or any
+	other as fallback). Filtered by search text, kind, crop and tag; without
+	a search, items for the farmer's `crops` come first.
+	"""
+	qs = LearningItem.objects.filter(published=True)
+	if kind:
+		qs = qs.filter(kind=kind)
+	if crop:
+		qs = qs.filter(labels__kind=LearningLabel.CROP, labels__value=crop.lower())
+	if tag:
+		qs = qs.filter(labels__kind=LearningLabel.TAG, labels__value=tag.lower())
+	ranked = None
+	if text:
+		ranked = search_ids(text, language)
+		qs = qs.filter(id__in=ranked)
+	qs = qs.prefetch_related(
+		'labels',
+		Prefetch('variants', queryset=LearningVariant.objects.only('id', 'item_id', 'language', 'title', 'summary', 'body')),
+	).distinct()
+
+	rows = []
+	for item in qs:
+		by_lang = {v.language: v for v in item.variants.all()}
+		variant = by_lang.get(language) or by_lang.get('en') or next(iter(by_lang.values()), None)
+		if variant is None:
+			continue
+		labels = list(item.labels.all())
+		rows.append({
+			'item': item,
+			'title': variant.title,
+			'summary': variant.summary,
+			'body': variant.body,
+			'language': variant.language,
+			'crops': [l.value for l in labels if l.kind == LearningLabel.CROP],
+			'tags': [l.value for l in labels if l.kind == LearningLabel.TAG],
+		})
+	if ranked is not None:
+		order = {item_id: i for i, item_id in enumerate(ranked)}
+		rows.sort(key=lambda r: order.get(r['item'].id, len(order)))
+	elif crops:
+		# Stable sort keeps priority order within each group
+		rows.sort(key=lambda r: not set(r['crops']) & set(crops))
+	return rows
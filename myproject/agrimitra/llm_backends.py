@@ -0,0 +1,173 @@
+import abc
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .gemini_client import ask_gemini, GeminiTimeoutError
+
+
+class LLMBackend(abc.ABC):
+    """
+    Interface the chat views talk to.
+
+    ask() returns (text, raw_response_dict) like ask_gemini; stream() yields
+    text chunks of the same answer. Backends raise GeminiTimeoutError when a
+    request's time budget runs out and RuntimeError for other failures.
+    """
+
+    name = 'base'
+
+    @abc.abstractmethod
+    def ask(self, message: str, image_file=None, language: Optional[str] = None,
+            history: Optional[List[Dict[str, str]]] = None, summary: Optional[str] = None,
+            timeout: Optional[float] = None) -> Tuple[str, dict]:
+        ...
+
+    def stream(self, message: str, image_file=None, language: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None, summary: Optional[str] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        text, _raw = self.ask(message, image_file, language=language, history=history, summary=summary, timeout=timeout)
+        yield text
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through gemini_client (coalescing, routing, deadlines)."""
+
+    name = 'gemini'
+
+    def ask(self, message, image_file=None, language=None, history=None, summary=None, timeout=None):
+        return ask_gemini(message, image_file, language=language, history=history, summary=summary, timeout=timeout)
+
+
+class FakeBackend(LLMBackend):
+    """
+    Offline, deterministic stand-in for benchmarking and local development.
+
+    The reply depends only on the prompt (message, language, history, summary,
+    image bytes) and `seed`. Latency is drawn from a fixed, uniform or
+    lognormal distribution, and `error_rate` / `timeout_rate` inject
+    RuntimeError / GeminiTimeoutError failures.
+
+    Options (settings.LLM_BACKEND_OPTIONS):
+        latency: 'fixed' | 'uniform' | 'lognormal'   (default 'lognormal')
+        latency_ms: median/fixed latency             (default 800)
+        latency_spread: uniform half-width in ms, or lognormal sigma (default 0.5)
+        error_rate, timeout_rate: probabilities      (default 0)
+        stream_chunk_ms: delay between streamed chunks (default 30)
+        seed: RNG seed                               (default 0)
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: str = 'lognormal', latency_ms: float = 800, latency_spread: float = 0.5,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, stream_chunk_ms: float = 30, seed: int = 0):
+        if latency not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_spread = latency_spread
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.stream_chunk_ms = stream_chunk_ms
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._seed = seed
+
+    def _sample_latency(self) -> Tuple[float, float]:
+        """Return (latency seconds, uniform roll used for error injection)."""
+        with self._rng_lock:
+            if self.latency == 'fixed':
+                ms = self.latency_ms
+            elif self.latency == 'uniform':
+                ms = self._rng.uniform(self.latency_ms - self.latency_spread, self.latency_ms + self.latency_spread)
+            else:
+                ms = self._rng.lognormvariate(0, self.latency_spread) * self.latency_ms
+            roll = self._rng.random()
+        return max(0.0, ms) / 1000, roll
+
+    def _digest(self, message, image_file, language, history, summary) -> str:
+        h = hashlib.sha256(f"{self._seed}\0{message or ''}\0{language or ''}\0{summary or ''}".encode('utf-8'))
+        for turn in history or []:
+            h.update(f"{turn.get('role')}:{turn.get('text')}\0".encode('utf-8'))
+        if image_file:
+            h.update(image_file.read())
+            try:
+                image_file.seek(0)
+            except Exception:
+                pass
+        return h.hexdigest()
+
+    def _reply(self, digest: str, message: str, language: Optional[str], image_file) -> str:
+        topic = (message or 'your photo').strip()
+        if len(topic) > 80:
+            topic = topic[:80] + '…'
+        lang_note = f" ({language})" if language else ''
+        seen = " I looked at the attached image." if image_file else ''
+        return (
+            f"[fake-{digest[:8]}]{lang_note} Here is some general guidance about \"{topic}\".{seen} "
+            "Check your soil moisture, follow the local agriculture office's advisory, and consult "
+            "a Krishi Vigyan Kendra before applying any chemicals."
+        )
+
+    def _run(self, message, image_file, language, history, summary, timeout):
+        delay, roll = self._sample_latency()
+        budget = timeout if timeout is not None else getattr(settings, 'GEMINI_REQUEST_BUDGET', 45)
+        if roll < self.timeout_rate or delay > budget:
+            time.sleep(min(delay, budget))
+            raise GeminiTimeoutError(budget, min(delay, budget), [self.name])
+        time.sleep(delay)
+        if roll < self.timeout_rate + self.error_rate:
+            raise RuntimeError("Fake backend injected error: 503 service unavailable")
+        digest = self._digest(message, image_file, language, history, summary)
+        return self._reply(digest, message, language, image_file), delay
+
+    def ask(self, message, image_file=None, language=None, history=None, summary=None, timeout=None):
+        text, delay = self._run(message, image_file, language, history, summary, timeout)
+        prompt_chars = len(message or '') + len(summary or '') + sum(len(t.get('text') or '') for t in history or [])
+        return text, {
+            'model': 'fake',
+            'latency_ms': round(delay * 1000),
+            'usage_metadata': {
+                'prompt_token_count': prompt_chars // 4 + 1,
+                'candidates_token_count': len(text) // 4 + 1,
+                'total_token_count': (prompt_chars + len(text)) // 4 + 2,
+            },
+        }
+
+    def stream(self, message, image_file=None, language=None, history=None, summary=None, timeout=None):
+        # Time-to-first-chunk follows the latency distribution; the rest trickles out
+        text, _delay = self._run(message, image_file, language, history, summary, timeout)
+        words = text.split(' ')
+        for i in range(0, len(words), 4):
+            if i:
+                time.sleep(self.stream_chunk_ms / 1000)
+            yield ' '.join(words[i:i + 4]) + (' ' if i + 4 < len(words) else '')
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
+
+_backend = None
+_backend_key = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend chosen by settings.LLM_BACKEND (name or dotted path)."""
+    global _backend, _backend_key
+    name = getattr(settings, 'LLM_BACKEND', 'gemini') or 'gemini'
+    options = getattr(settings, 'LLM_BACKEND_OPTIONS', {}) or {}
+    key = (name, repr(sorted(options.items())))
+    with _backend_lock:
+        if _backend is None or _backend_key != key:
+            cls = BACKENDS.get(name) or import_string(name)
+            _backend = cls(**options)
+            _backend_key = key
+        return _backend
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from agrimitra.archive import archive_idle, incremental_vacuum
+
+
+class Command(BaseCommand):
+    help = "Compress messages of idle conversations into ConversationArchive and reclaim SQLite space."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-days', type=int, default=getattr(settings, 'CHAT_ARCHIVE_IDLE_DAYS', 90))
+        parser.add_argument('--limit', type=int, default=500, help="Maximum conversations to archive in this run")
+        parser.add_argument('--no-vacuum', action='store_true', help="Skip the incremental VACUUM step")
+        parser.add_argument('--vacuum-pages', type=int, default=0, help="Free pages to reclaim (0 = all)")
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help="One-time switch of an existing SQLite DB to auto_vacuum=INCREMENTAL (runs a full VACUUM)")
+
+    def handle(self, *args, **opts):
+        convs, msgs = archive_idle(opts['idle_days'], limit=opts['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {msgs} messages from {convs} conversations idle for more than {opts['idle_days']} days."
+        ))
+        if not opts['no_vacuum']:
+            self.stdout.write(incremental_vacuum(opts['vacuum_pages'], enable=opts['enable_incremental_vacuum']))
@@ -0,0 +1,80 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra.llm_backends import BACKENDS, get_backend
+
+SAMPLE_QUESTIONS = [
+    "Best crop for Kharif season",
+    "Organic pest control for tomato",
+    "How to improve soil fertility?",
+    "How to control whitefly infestation in cotton?",
+    "When should I irrigate wheat after sowing?",
+    "Government schemes for farmers",
+]
+
+
+class Command(BaseCommand):
+    help = "Measure chat throughput and latency through the configured LLM backend (use --backend fake to run offline)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default=None, help="Backend name; defaults to settings.LLM_BACKEND")
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--stream', action='store_true', help="Use stream() and report time to first chunk")
+        parser.add_argument('--language', default='English')
+
+    def handle(self, *args, **opts):
+        if opts['backend']:
+            if opts['backend'] not in BACKENDS:
+                raise CommandError(f"Unknown backend {opts['backend']!r}; choose from {', '.join(BACKENDS)}")
+            backend = BACKENDS[opts['backend']](**(getattr(settings, 'LLM_BACKEND_OPTIONS', {}) or {}))
+        else:
+            backend = get_backend()
+
+        latencies, ttfb, errors = [], [], []
+        lock = threading.Lock()
+
+        def one(i):
+            question = SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]
+            started = time.monotonic()
+            first = None
+            try:
+                if opts['stream']:
+                    for _chunk in backend.stream(question, language=opts['language']):
+                        if first is None:
+                            first = time.monotonic() - started
+                else:
+                    backend.ask(question, language=opts['language'])
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+                return
+            with lock:
+                latencies.append(time.monotonic() - started)
+                if first is not None:
+                    ttfb.append(first)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=opts['concurrency']) as pool:
+            list(pool.map(one, range(opts['requests'])))
+        wall = time.monotonic() - started
+
+        self.stdout.write(f"Backend: {backend.name} | requests: {opts['requests']} | concurrency: {opts['concurrency']}")
+        self.stdout.write(f"Wall time: {wall:.2f}s | throughput: {opts['requests'] / wall:.1f} req/s")
+        if latencies:
+            self.stdout.write(f"Latency ms: {self._summary(latencies)}")
+        if ttfb:
+            self.stdout.write(f"First chunk ms: {self._summary(ttfb)}")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"Errors: {len(errors)} ({', '.join(sorted(set(errors)))})"))
+
+    @staticmethod
+    def _summary(values):
+        ordered = sorted(values)
+        pct = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return f"p50 {pct(0.5):.0f} | p95 {pct(0.95):.0f} | p99 {pct(0.99):.0f} | mean {statistics.mean(ordered) * 1000:.0f}"
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra import assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Fail if any template carries more inline <style>/<script> than the budget, then collect "
+        "static files as content-hashed bundles with precompressed .gz/.br twins."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=int, help="Inline bytes allowed per template (default INLINE_ASSET_BUDGET)")
+        parser.add_argument('--check', action='store_true', help="Only check the inline budget, do not collect")
+
+    def handle(self, *args, **opts):
+        budget = opts['budget'] if opts['budget'] is not None else getattr(settings, 'INLINE_ASSET_BUDGET', 1024)
+        over = []
+        for path in self._templates():
+            sizes = assets.inline_assets(path.read_text(encoding='utf-8'))
+            total = sum(sizes.values())
+            if total:
+                self.stdout.write(f"{path.name}: {sizes['style']} B inline style, {sizes['script']} B inline script")
+            if total > budget:
+                over.append(f"{path.name} ({total} B)")
+        if over:
+            raise CommandError(
+                f"Inline assets over the {budget} B per-template budget: {', '.join(over)}. "
+                "Move them into static/css or static/js."
+            )
+        self.stdout.write(f"Inline assets within the {budget} B budget.")
+        if opts['check']:
+            return
+
+        call_command('collectstatic', interactive=False, verbosity=opts['verbosity'])
+        raw = gz = br = count = 0
+        for name in set(getattr(staticfiles_storage, 'hashed_files', {}).values()):
+            if not name.endswith(assets.COMPRESSIBLE):
+                continue
+            full = staticfiles_storage.path(name)
+            size = os.path.getsize(full)
+            count += 1
+            raw += size
+            gz += os.path.getsize(full + '.gz') if os.path.exists(full + '.gz') else size
+            br += os.path.getsize(full + '.br') if os.path.exists(full + '.br') else size
+        self.stdout.write(self.style.SUCCESS(
+            f"Collected {count} text assets: {raw // 1024} KiB, {gz // 1024} KiB gzip, {br // 1024} KiB brotli."
+        ))
+
+    def _templates(self):
+        for directory in settings.TEMPLATES[0].get('DIRS', []):
+            yield from sorted(Path(directory).rglob('*.html'))
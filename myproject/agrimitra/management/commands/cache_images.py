@@ -0,0 +1,82 @@
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra import image_cache
+from agrimitra.models import CachedImage, LearningItem
+
+# Literal URLs piped through the local_image filter, e.g. {{ 'https://…/x.jpg'|local_image:1280 }}
+_template_url_re = re.compile(r"""['"](https?://[^'"]+)['"]\s*\|\s*local_image""")
+
+
+class Command(BaseCommand):
+    help = (
+        "Download content images (learning catalog and template backgrounds) into the local thumbnail "
+        "cache, or import them from a directory, then evict least recently used images over the disk budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            help="Import from a directory holding the image files and a sources.tsv of "
+                 "'<file name><TAB><source URL>' lines, instead of downloading",
+        )
+        parser.add_argument('--force', action='store_true', help="Re-fetch images that are already cached")
+        parser.add_argument('--delay', type=float, default=0.2, help="Seconds to pause between downloads")
+        parser.add_argument('--budget-mb', type=int, help="Disk budget for eviction (default IMAGE_CACHE_MAX_BYTES)")
+
+    def handle(self, *args, **opts):
+        if opts['dir']:
+            stored, failed = self._import_dir(Path(opts['dir']))
+        else:
+            stored, failed = self._download(opts['force'], opts['delay'])
+        budget = opts['budget_mb'] * 1024 * 1024 if opts['budget_mb'] is not None else None
+        evicted, freed = image_cache.evict(budget)
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached {stored} images, {failed} failed; evicted {evicted} ({freed // 1024} KiB). "
+            f"Cache now uses {image_cache.disk_usage() // 1024} KiB."
+        ))
+
+    def _sources(self):
+        urls = set(LearningItem.objects.exclude(image_url='').values_list('image_url', flat=True))
+        for directory in settings.TEMPLATES[0].get('DIRS', []):
+            for path in Path(directory).rglob('*.html'):
+                urls.update(_template_url_re.findall(path.read_text(encoding='utf-8')))
+        return sorted(urls)
+
+    def _download(self, force, delay):
+        sources = self._sources()
+        if not force:
+            cached = set(CachedImage.objects.exclude(variants={}).values_list('source', flat=True))
+            sources = [s for s in sources if s not in cached]
+        self.stdout.write(f"{len(sources)} images to fetch.")
+        stored = failed = 0
+        for source in sources:
+            if image_cache.fetch(source):
+                stored += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Failed: {source}")
+            time.sleep(delay)
+        return stored, failed
+
+    def _import_dir(self, directory: Path):
+        manifest = directory / 'sources.tsv'
+        if not manifest.exists():
+            raise CommandError(f"{manifest} not found")
+        stored = failed = 0
+        for line in manifest.read_text(encoding='utf-8').splitlines():
+            if not line.strip() or line.startswith('#'):
+                continue
+            name, _, source = line.partition('\t')
+            try:
+                image_cache.ingest(source.strip(), (directory / name.strip()).read_bytes())
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{name}: {e}")
+            else:
+                stored += 1
+        return stored, failed
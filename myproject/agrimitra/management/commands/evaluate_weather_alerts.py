@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra.weather_alerts import active_cell_index, refresh_alerts
+from agrimitra.weather_client import default_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate heavy rain, heatwave, frost and high wind rules over the cached forecasts of every "
+        "grid cell with active farmers and store per-user alert rows. Run after prefetch_forecasts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=30, help="Only users who logged in within this many days")
+
+    def handle(self, *args, **opts):
+        index, unresolved = active_cell_index(opts['active_days'], default_client().geocode)
+        try:
+            written, removed = refresh_alerts(index)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(index)} cells, {sum(map(len, index.values()))} users ({unresolved} without a location): "
+            f"{written} alerts written, {removed} removed."
+        ))
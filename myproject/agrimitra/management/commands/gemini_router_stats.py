@@ -0,0 +1,36 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from agrimitra.model_router import STATS_CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = "Show per-model routing stats (latency, error rate, circuit-breaker state) published by running workers."
+
+    def handle(self, *args, **options):
+        workers = cache.get(STATS_CACHE_KEY) or {}
+        if not workers:
+            self.stdout.write(
+                "No routing stats published yet. Stats are shared through the cache, so CACHES must be a "
+                "backend shared with the web workers (the default LocMemCache is per-process)."
+            )
+            return
+        for pid, report in sorted(workers.items()):
+            age = int(time.time() - report.get('at', 0))
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Worker {pid} (updated {age}s ago)"))
+            models = report.get('models') or {}
+            if not models:
+                self.stdout.write("  no calls recorded")
+                continue
+            for name, st in sorted(models.items()):
+                line = (
+                    f"  - {name} | {st['state']} | samples: {st['samples']} | errors: {st['error_rate']:.0%}"
+                    f" | p50: {st['p50_ms'] if st['p50_ms'] is not None else '-'} ms"
+                    f" | p95: {st['p95_ms'] if st['p95_ms'] is not None else '-'} ms"
+                )
+                if st.get('reopens_in_s') is not None:
+                    line += f" | reopens in {st['reopens_in_s']}s"
+                style = self.style.ERROR if st['state'] == 'open' else self.style.WARNING if st['state'] == 'half-open' else (lambda x: x)
+                self.stdout.write(style(line))
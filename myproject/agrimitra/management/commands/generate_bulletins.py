@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra.bulletins import COMMON_CROPS, current_season, generate_bulletin
+from agrimitra.models import AdvisoryBulletin, FarmerProfile
+from agrimitra.quotas import global_bucket
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-generate seasonal advisory bulletins for every (state, crop, language) through the LLM backend. "
+        "Runs at low priority: paced, and backs off whenever live chat traffic has drained the global rate limit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--states', help="Comma-separated state codes (default: all)")
+        parser.add_argument('--crops', help="Comma-separated crops (default: all common crops)")
+        parser.add_argument('--languages', help="Comma-separated language codes (default: all)")
+        parser.add_argument('--season', default='', help="kharif, rabi or zaid (default: current season)")
+        parser.add_argument('--force', action='store_true', help="Regenerate bulletins that already exist")
+        parser.add_argument('--delay', type=float, default=1.0, help="Seconds to pause between upstream calls")
+
+    def handle(self, *args, **opts):
+        states = self._pick(opts['states'], [c for c, _ in FarmerProfile.STATE_CHOICES], 'state')
+        crops = self._pick(opts['crops'], list(COMMON_CROPS), 'crop')
+        languages = self._pick(opts['languages'], [c for c, _ in FarmerProfile.LANGUAGE_CHOICES], 'language')
+        season = opts['season'] or current_season()
+        if season not in dict(AdvisoryBulletin.SEASON_CHOICES):
+            raise CommandError(f"Unknown season {season!r}")
+
+        existing = set()
+        if not opts['force']:
+            existing = set(
+                AdvisoryBulletin.objects.filter(season=season, state__in=states, crop__in=crops, language__in=languages)
+                .values_list('state', 'crop', 'language')
+            )
+        todo = [(s, c, l) for s in states for c in crops for l in languages if (s, c, l) not in existing]
+        self.stdout.write(f"{len(todo)} bulletins to generate for the {season} season ({len(existing)} already stored).")
+
+        # Low priority: only spend global rate-limit tokens while at least half the
+        # burst is left for live chat, otherwise wait for the bucket to refill
+        bucket = global_bucket()
+        reserve = bucket.capacity / 2
+        done = failed = 0
+        for state, crop, language in todo:
+            while True:
+                ok, wait = bucket.consume(reserve=reserve)
+                if ok:
+                    break
+                time.sleep(max(wait, opts['delay']))
+            try:
+                generate_bulletin(state, crop, language, season)
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{state}/{crop}/{language}: {e}")
+            time.sleep(opts['delay'])
+        self.stdout.write(self.style.SUCCESS(f"Generated {done} bulletins, {failed} failed."))
+
+    @staticmethod
+    def _pick(value, allowed, label):
+        if not value:
+            return allowed
+        chosen = [v.strip() for v in value.split(',') if v.strip()]
+        unknown = [v for v in chosen if v not in allowed]
+        if unknown:
+            raise CommandError(f"Unknown {label}(s): {', '.join(unknown)}")
+        return chosen
@@ -0,0 +1,70 @@
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agrimitra.gazetteer import fold
+from agrimitra.models import FarmerProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert a GeoNames country dump (e.g. IN.txt from download.geonames.org/export/dump/) into "
+        "gazetteer rows for districts (ADM2) and villages/towns (populated places)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dump', help="Path to the GeoNames IN.txt file")
+        parser.add_argument('--admin1-codes', required=True, help="Path to GeoNames admin1CodesASCII.txt (maps admin1 codes to states)")
+        parser.add_argument('--output', help="TSV to write (default: the last entry of settings.GAZETTEER_FILES)")
+        parser.add_argument('--max-alternates', type=int, default=5)
+
+    def handle(self, *args, **opts):
+        output = Path(opts['output'] or getattr(settings, 'GAZETTEER_FILES')[-1])
+        states = self._state_codes(opts['admin1_codes'])
+        written = skipped = 0
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(opts['dump'], encoding='utf-8') as src, output.open('w', encoding='utf-8') as out:
+            out.write("# Generated by import_gazetteer from GeoNames data (CC BY 4.0)\n")
+            for row in csv.reader(src, delimiter='\t', quoting=csv.QUOTE_NONE):
+                if len(row) < 11 or row[8] != 'IN':
+                    continue
+                feature_class, feature_code = row[6], row[7]
+                if feature_class == 'P':
+                    kind = 'village'
+                elif feature_class == 'A' and feature_code == 'ADM2':
+                    kind = 'district'
+                else:
+                    continue
+                state = states.get(row[10])
+                if not state:
+                    skipped += 1
+                    continue
+                name = row[2] or row[1]
+                # Latin-script alternates only; the index folds names to ASCII
+                alternates = [a for a in row[3].split(',') if a and a.isascii() and fold(a) and fold(a) != fold(name)]
+                out.write('\t'.join([
+                    name, kind, state, row[4], row[5], ','.join(alternates[:opts['max_alternates']]),
+                ]) + '\n')
+                written += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} places to {output} ({skipped} skipped without a known state). Restart workers to load them."
+        ))
+
+    @staticmethod
+    def _state_codes(path):
+        by_name = {fold(name): code for code, name in FarmerProfile.STATE_CHOICES}
+        by_name.update({'orissa': 'OD', 'pondicherry': 'PY', 'uttaranchal': 'UK', 'dadra and nagar haveli': 'DN', 'daman and diu': 'DN'})
+        codes = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) >= 2 and parts[0].startswith('IN.'):
+                        code = by_name.get(fold(parts[1]))
+                        if code:
+                            codes[parts[0][3:]] = code
+        except OSError as e:
+            raise CommandError(f"Cannot read admin1 codes: {e}")
+        return codes
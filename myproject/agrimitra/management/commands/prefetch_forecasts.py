@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from agrimitra import forecast_cache
+from agrimitra.models import ForecastCell
+from agrimitra.weather_alerts import active_cells
+from agrimitra.weather_client import default_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch forecasts for every grid cell that active farmers live in, using Open-Meteo's "
+        "multi-location requests, and store them in the shared forecast cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=30, help="Only users who logged in within this many days")
+        parser.add_argument('--chunk', type=int, default=50, help="Locations per upstream request")
+        parser.add_argument('--force', action='store_true', help="Refetch cells that are still fresh")
+        parser.add_argument('--delay', type=float, default=0.5, help="Seconds to pause between upstream requests")
+
+    def handle(self, *args, **opts):
+        client = default_client()
+        located, unresolved = active_cells(opts['active_days'], client.geocode)
+        cells = {key: (cell['lat'], cell['lon']) for key, cell in located.items()}
+
+        if not opts['force']:
+            fresh = set(ForecastCell.objects.filter(key__in=cells, fresh_until__gt=timezone.now()).values_list('key', flat=True))
+            cells = {k: v for k, v in cells.items() if k not in fresh}
+        self.stdout.write(f"{len(cells)} cells to fetch ({unresolved} profiles without a resolvable location).")
+
+        keys = sorted(cells)
+        stored = failed = 0
+        for i in range(0, len(keys), opts['chunk']):
+            chunk = keys[i:i + opts['chunk']]
+            try:
+                results = client.forecast_many([cells[k] for k in chunk])
+            except Exception as e:
+                failed += len(chunk)
+                self.stderr.write(f"Batch of {len(chunk)} cells failed: {e}")
+            else:
+                for key, data in zip(chunk, results):
+                    lat, lon = cells[key]
+                    forecast_cache.store(key, lat, lon, data)
+                stored += len(chunk)
+            time.sleep(opts['delay'])
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} cells, {failed} failed."))
@@ -0,0 +1,55 @@
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from django.core.management.base import BaseCommand
+
+from agrimitra import chat_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued chatbot jobs (ChatJob) with a bounded number of concurrent upstream calls."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Maximum jobs answered at once")
+        parser.add_argument('--poll', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit")
+
+    def handle(self, *args, **opts):
+        worker = chat_jobs.worker_id()
+        concurrency = max(1, opts['concurrency'])
+        slots = threading.Semaphore(concurrency)
+        stopping = threading.Event()
+
+        def stop(*_):
+            self.stdout.write("Stopping after in-flight jobs finish...")
+            stopping.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        def work(job):
+            try:
+                job = chat_jobs.run(job)
+                self.stdout.write(f"job {job.id}: {job.status} (attempt {job.attempts})")
+            finally:
+                close_old_connections()
+                slots.release()
+
+        self.stdout.write(f"Chat worker {worker} started (concurrency {concurrency})")
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='chat-worker') as pool:
+            while not stopping.is_set():
+                free = 0
+                while slots.acquire(blocking=False):
+                    free += 1
+                jobs = chat_jobs.claim(worker, free) if free else []
+                for _ in range(free - len(jobs)):
+                    slots.release()
+                for job in jobs:
+                    pool.submit(work, job)
+                if not jobs:
+                    if opts['once'] and free == concurrency:
+                        break
+                    time.sleep(opts['poll'])
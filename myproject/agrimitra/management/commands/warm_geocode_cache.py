@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from agrimitra.models import FarmerProfile
+from agrimitra.weather_client import OpenMeteoClient
+
+
+class Command(BaseCommand):
+    help = "Pre-resolve every distinct farmer district/village and state name into the geocode cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true', help="Re-query places that are already cached")
+        parser.add_argument('--delay', type=float, default=0.2, help="Seconds to pause between upstream lookups")
+
+    def handle(self, *args, **opts):
+        villages = (
+            FarmerProfile.objects.exclude(district_village__isnull=True).exclude(district_village='')
+            .values_list('district_village', flat=True).distinct()
+        )
+        state_names = dict(FarmerProfile.STATE_CHOICES)
+        states = [state_names.get(code, code) for code in FarmerProfile.objects.values_list('state', flat=True).distinct() if code]
+        # The weather page geocodes the village first and falls back to the state name
+        queries = sorted({q.strip() for q in villages if q.strip()}) + sorted(set(states))
+
+        client = OpenMeteoClient()
+        found = missing = failed = 0
+        for query in queries:
+            try:
+                result = client.geocode(query, refresh=opts['refresh'])
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{query}: {e}")
+            else:
+                if result:
+                    found += 1
+                else:
+                    missing += 1
+                    self.stdout.write(f"Not found: {query}")
+            time.sleep(opts['delay'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(queries)} places: {found} resolved, {missing} not found, {failed} failed."
+        ))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0013_advisorybulletin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('comment', 'Comment')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('language', models.CharField(choices=[('hi', 'Hindi'), ('en', 'English'), ('mr', 'Marathi'), ('ta', 'Tamil'), ('te', 'Telugu'), ('bn', 'Bengali'), ('gu', 'Gujarati'), ('pa', 'Punjabi'), ('ml', 'Malayalam'), ('kn', 'Kannada')], max_length=2)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id', 'language', 'source_hash')},
+            },
+        ),
+    ]
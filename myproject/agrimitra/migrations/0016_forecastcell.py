@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0015_geocodeentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32, unique=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('data', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+                ('fresh_until', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0016_forecastcell'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('heavy_rain', 'Heavy rain'), ('heatwave', 'Heatwave'), ('frost', 'Frost'), ('high_wind', 'High wind')], max_length=20)),
+                ('date', models.DateField()),
+                ('severity', models.CharField(choices=[('warning', 'Warning'), ('severe', 'Severe')], max_length=10)),
+                ('value', models.FloatField()),
+                ('message', models.CharField(max_length=200)),
+                ('cell', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weather_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date', 'kind'],
+                'indexes': [models.Index(fields=['user', 'date'], name='weather_alert_user_date')],
+                'unique_together': {('user', 'kind', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0017_weatheralert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Scheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=80, unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('income', 'Income Support'), ('insurance', 'Insurance'), ('credit', 'Loans & Credit'), ('subsidy', 'Subsidies'), ('equipment', 'Equipment'), ('irrigation', 'Irrigation'), ('livestock', 'Livestock'), ('soil', 'Soil Health'), ('market', 'Markets')], max_length=20)),
+                ('benefit', models.CharField(blank=True, help_text='Short headline, e.g. "₹6,000/year"', max_length=120)),
+                ('url', models.URLField(blank=True)),
+                ('states', models.JSONField(blank=True, default=list, help_text='State codes; empty for nationwide')),
+                ('farming_types', models.JSONField(blank=True, default=list, help_text='Values from FarmerProfile.FARMING_CHOICES; empty for any')),
+                ('farm_sizes', models.JSONField(blank=True, default=list, help_text='Farm size bands; empty for any')),
+                ('crops', models.JSONField(blank=True, default=list, help_text='Canonical crop names (see bulletins.COMMON_CROPS); empty for any')),
+                ('priority', models.IntegerField(default=0, help_text='Higher first')),
+                ('active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-priority', 'title'],
+            },
+        ),
+    ]
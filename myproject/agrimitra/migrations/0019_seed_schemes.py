@@ -0,0 +1,114 @@
+from django.db import migrations
+
+SCHEMES = [
+    {
+        'slug': 'pm-kisan', 'title': 'PM-KISAN Samman Nidhi', 'category': 'income', 'priority': 100,
+        'description': 'Income support of ₹6,000 per year, paid in three instalments, to all landholding farmer families.',
+        'benefit': '₹6,000/year', 'url': 'https://pmkisan.gov.in/',
+    },
+    {
+        'slug': 'pmfby', 'title': 'Pradhan Mantri Fasal Bima Yojana (PMFBY)', 'category': 'insurance', 'priority': 90,
+        'description': 'Crop insurance against yield loss from natural calamities, pests and diseases at a low farmer premium.',
+        'benefit': 'Premium 1.5–5%', 'url': 'https://pmfby.gov.in/', 'farming_types': ['crop', 'horticulture', 'mixed'],
+    },
+    {
+        'slug': 'kisan-credit-card', 'title': 'Kisan Credit Card', 'category': 'credit', 'priority': 80,
+        'description': 'Timely short-term credit for cultivation and allied activities with interest subvention for prompt repayment.',
+        'benefit': 'Up to ₹3 lakh at 4%', 'url': 'https://www.myscheme.gov.in/schemes/kcc',
+    },
+    {
+        'slug': 'soil-health-card', 'title': 'Soil Health Card', 'category': 'soil', 'priority': 70,
+        'description': 'Free soil testing with crop-wise nutrient and fertilizer recommendations for your plot.',
+        'benefit': 'Free soil test', 'url': 'https://soilhealth.dac.gov.in/', 'farming_types': ['crop', 'horticulture', 'mixed'],
+    },
+    {
+        'slug': 'pmksy-per-drop-more-crop', 'title': 'PMKSY – Per Drop More Crop', 'category': 'irrigation', 'priority': 60,
+        'description': 'Subsidy on drip and sprinkler irrigation, higher for small and marginal farmers.',
+        'benefit': 'Up to 55% subsidy', 'url': 'https://pmksy.gov.in/',
+        'farming_types': ['crop', 'horticulture', 'mixed'], 'farm_sizes': ['marginal', 'small'],
+    },
+    {
+        'slug': 'smam', 'title': 'Sub-Mission on Agricultural Mechanization', 'category': 'equipment', 'priority': 50,
+        'description': 'Subsidy on tractors, power tillers and other implements, and support for custom hiring centres.',
+        'benefit': '40–50% subsidy', 'url': 'https://agrimachinery.nic.in/',
+        'farming_types': ['crop', 'horticulture', 'mixed'],
+    },
+    {
+        'slug': 'pm-kusum', 'title': 'PM-KUSUM Solar Pumps', 'category': 'irrigation', 'priority': 45,
+        'description': 'Subsidy for standalone solar irrigation pumps and solarisation of grid-connected pumps.',
+        'benefit': 'Up to 60% subsidy', 'url': 'https://pmkusum.mnre.gov.in/',
+        'farming_types': ['crop', 'horticulture', 'mixed'],
+    },
+    {
+        'slug': 'e-nam', 'title': 'e-NAM National Agriculture Market', 'category': 'market', 'priority': 40,
+        'description': 'Sell produce online across mandis with transparent price discovery and direct payment.',
+        'benefit': 'Online mandi', 'url': 'https://enam.gov.in/', 'farming_types': ['crop', 'horticulture', 'mixed'],
+    },
+    {
+        'slug': 'nmeo-oilseeds', 'title': 'National Mission on Edible Oils – Oilseeds', 'category': 'subsidy', 'priority': 35,
+        'description': 'Seed minikits, demonstrations and input support for oilseed growers.',
+        'benefit': 'Free seed minikits', 'url': 'https://nmeo.dac.gov.in/', 'crops': ['soybean', 'groundnut', 'mustard'],
+    },
+    {
+        'slug': 'nfsm', 'title': 'National Food Security Mission', 'category': 'subsidy', 'priority': 34,
+        'description': 'Support for quality seed, demonstrations and farm inputs for rice, wheat, pulses and coarse cereals.',
+        'benefit': 'Seed and input support', 'url': 'https://www.nfsm.gov.in/',
+        'crops': ['rice', 'wheat', 'maize', 'chickpea', 'pigeon pea'],
+    },
+    {
+        'slug': 'midh', 'title': 'Mission for Integrated Development of Horticulture', 'category': 'subsidy', 'priority': 33,
+        'description': 'Assistance for orchards, protected cultivation, post-harvest and cold-storage infrastructure.',
+        'benefit': 'Up to 50% assistance', 'url': 'https://midh.gov.in/', 'farming_types': ['horticulture', 'mixed'],
+    },
+    {
+        'slug': 'rashtriya-gokul-mission', 'title': 'Rashtriya Gokul Mission', 'category': 'livestock', 'priority': 32,
+        'description': 'Breed improvement of indigenous cattle with doorstep artificial insemination services.',
+        'benefit': 'Free AI services', 'url': 'https://dahd.gov.in/', 'farming_types': ['dairy', 'mixed'],
+    },
+    {
+        'slug': 'national-livestock-mission', 'title': 'National Livestock Mission', 'category': 'livestock', 'priority': 31,
+        'description': 'Capital subsidy for poultry, sheep, goat and piggery entrepreneurship units.',
+        'benefit': '50% capital subsidy', 'url': 'https://nlm.udyamimitra.in/', 'farming_types': ['poultry', 'dairy', 'mixed'],
+    },
+    {
+        'slug': 'namo-shetkari', 'title': 'Namo Shetkari Maha Samman Nidhi', 'category': 'income', 'priority': 20,
+        'description': 'Maharashtra top-up of ₹6,000 per year for PM-KISAN beneficiaries.',
+        'benefit': '₹6,000/year', 'url': 'https://nsmny.mahait.org/', 'states': ['MH'],
+    },
+    {
+        'slug': 'kalia', 'title': 'KALIA', 'category': 'income', 'priority': 20,
+        'description': 'Odisha livelihood support for small and marginal farmers and landless cultivators.',
+        'benefit': '₹4,000/year', 'url': 'https://kalia.odisha.gov.in/', 'states': ['OD'], 'farm_sizes': ['marginal', 'small'],
+    },
+    {
+        'slug': 'rythu-bharosa', 'title': 'Rythu Bharosa', 'category': 'income', 'priority': 20,
+        'description': 'Telangana per-acre investment support for each crop season.',
+        'benefit': 'Per-acre support', 'url': 'https://rythubharosa.telangana.gov.in/', 'states': ['TS'],
+    },
+    {
+        'slug': 'krishak-bandhu', 'title': 'Krishak Bandhu', 'category': 'income', 'priority': 20,
+        'description': 'West Bengal assured income support per acre and death benefit for farmer families.',
+        'benefit': 'Up to ₹10,000/year', 'url': 'https://krishakbandhu.net/', 'states': ['WB'],
+    },
+]
+
+
+def seed(apps, schema_editor):
+    Scheme = apps.get_model('agrimitra', 'Scheme')
+    for row in SCHEMES:
+        Scheme.objects.update_or_create(slug=row['slug'], defaults={k: v for k, v in row.items() if k != 'slug'})
+
+
+def unseed(apps, schema_editor):
+    apps.get_model('agrimitra', 'Scheme').objects.filter(slug__in=[row['slug'] for row in SCHEMES]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0018_scheme'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed, unseed),
+    ]
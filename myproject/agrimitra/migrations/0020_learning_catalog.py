@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0019_seed_schemes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearningItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=80, unique=True)),
+                ('kind', models.CharField(choices=[('guide', 'Guide'), ('video', 'Video'), ('article', 'Article'), ('course', 'Course')], default='article', max_length=10)),
+                ('image_url', models.URLField(blank=True, max_length=500)),
+                ('link', models.URLField(blank=True, help_text='External video or document, if any', max_length=500)),
+                ('minutes', models.PositiveSmallIntegerField(default=5, help_text='Reading or watching time')),
+                ('priority', models.IntegerField(default=0, help_text='Higher first')),
+                ('published', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-priority', 'slug'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LearningLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('crop', 'Crop')], max_length=4)),
+                ('value', models.CharField(max_length=40)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='agrimitra.learningitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'value'], name='learning_label_kind_value')],
+                'unique_together': {('item', 'kind', 'value')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LearningVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('hi', 'Hindi'), ('en', 'English'), ('mr', 'Marathi'), ('ta', 'Tamil'), ('te', 'Telugu'), ('bn', 'Bengali'), ('gu', 'Gujarati'), ('pa', 'Punjabi'), ('ml', 'Malayalam'), ('kn', 'Kannada')], default='en', max_length=2)),
+                ('title', models.CharField(max_length=200)),
+                ('summary', models.CharField(blank=True, max_length=300)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='agrimitra.learningitem')),
+            ],
+            options={
+                'unique_together': {('item', 'language')},
+            },
+        ),
+    ]
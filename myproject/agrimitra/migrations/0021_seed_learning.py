@@ -0,0 +1,110 @@
+from django.db import migrations
+
+UNSPLASH = 'https://images.unsplash.com/photo-{}?auto=format&fit=crop&w=800&q=60'
+
+ITEMS = [
+    {
+        'slug': 'organic-farming-basics', 'kind': 'guide', 'minutes': 15, 'priority': 60,
+        'image_url': UNSPLASH.format('1500937386664-56ed8efc5f3f'),
+        'tags': ['organic', 'soil'], 'crops': [],
+        'variants': {
+            'en': ('Basics of Organic Farming', 'Sustainable practices for chemical-free cultivation.',
+                   'Build soil organic matter with compost, green manure and crop residues. Use bio-fertilizers such as '
+                   'Rhizobium and Azotobacter, rotate crops, and manage pests with neem-based sprays and traps instead of '
+                   'synthetic pesticides. Certification under PGS-India is available for groups of farmers.'),
+            'hi': ('जैविक खेती की मूल बातें', 'रसायन-मुक्त खेती के टिकाऊ तरीके।',
+                   'कम्पोस्ट, हरी खाद और फसल अवशेषों से मिट्टी में जैविक पदार्थ बढ़ाएं। राइजोबियम और एज़ोटोबैक्टर जैसे जैव-उर्वरक '
+                   'अपनाएं, फसल चक्र अपनाएं और कीटों के लिए नीम आधारित छिड़काव व ट्रैप का उपयोग करें।'),
+        },
+    },
+    {
+        'slug': 'soil-fertility-at-home', 'kind': 'article', 'minutes': 12, 'priority': 55,
+        'image_url': UNSPLASH.format('1599058945522-58f12ec2a975'),
+        'tags': ['soil', 'testing'], 'crops': [],
+        'variants': {
+            'en': ('How to Test Soil Fertility at Home', 'Simple checks for texture, pH and organic matter.',
+                   'Take samples from several spots at 15 cm depth and mix them. The jar test shows sand, silt and clay '
+                   'layers; pH strips give a rough reading. For fertilizer doses, send the sample for a Soil Health Card test.'),
+            'hi': ('घर पर मिट्टी की उर्वरता कैसे जांचें', 'बनावट, पीएच और जैविक पदार्थ की आसान जांच।',
+                   'खेत के कई स्थानों से 15 सेमी गहराई से नमूने लेकर मिलाएं। जार टेस्ट से रेत, गाद और चिकनी मिट्टी की परतें दिखती हैं; '
+                   'उर्वरक की मात्रा के लिए मृदा स्वास्थ्य कार्ड जांच कराएं।'),
+        },
+    },
+    {
+        'slug': 'modern-irrigation', 'kind': 'video', 'minutes': 14, 'priority': 50,
+        'image_url': UNSPLASH.format('1501004318641-b39e6451bec6'),
+        'tags': ['irrigation', 'water'], 'crops': ['sugarcane', 'cotton', 'tomato'],
+        'variants': {
+            'en': ('Modern Irrigation Techniques', 'Drip and sprinkler systems that save water.',
+                   'Drip irrigation delivers water to the root zone and saves 30–50% water in sugarcane, cotton and '
+                   'vegetables. Sprinklers suit wheat and pulses on uneven land. Schedule irrigation by crop stage and soil '
+                   'moisture rather than by the calendar. Subsidies are available under PMKSY.'),
+        },
+    },
+    {
+        'slug': 'integrated-pest-management', 'kind': 'guide', 'minutes': 10, 'priority': 45,
+        'image_url': UNSPLASH.format('1543336668-cc2564b906b5'),
+        'tags': ['pests', 'ipm'], 'crops': ['cotton', 'rice'],
+        'variants': {
+            'en': ('Integrated Pest Management', 'Combine cultural, biological and chemical control.',
+                   'Monitor fields weekly with pheromone and yellow sticky traps. Act only when pests cross the economic '
+                   'threshold. Encourage natural enemies, use resistant varieties and spray the least toxic effective '
+                   'product. Pink bollworm in cotton and stem borer in rice respond well to IPM.'),
+            'hi': ('समेकित कीट प्रबंधन', 'सांस्कृतिक, जैविक और रासायनिक नियंत्रण का संयोजन।',
+                   'फेरोमोन और पीले चिपचिपे ट्रैप से हर सप्ताह निगरानी करें। कीट आर्थिक सीमा पार करें तभी दवा का छिड़काव करें। '
+                   'कपास में गुलाबी सुंडी और धान में तना छेदक के लिए आईपीएम कारगर है।'),
+        },
+    },
+    {
+        'slug': 'crop-rotation', 'kind': 'video', 'minutes': 8, 'priority': 40,
+        'image_url': UNSPLASH.format('1464226184884-fa280b87c399'),
+        'tags': ['soil', 'planning'], 'crops': ['wheat', 'rice', 'chickpea'],
+        'variants': {
+            'en': ('Crop Rotation Guide', 'Maximize soil health and yield with proper crop sequencing.',
+                   'Alternate cereals with legumes such as chickpea or pigeon pea to fix nitrogen and break pest cycles. '
+                   'A rice–wheat system benefits from a summer green manure or moong crop.'),
+        },
+    },
+    {
+        'slug': 'government-schemes-guide', 'kind': 'article', 'minutes': 18, 'priority': 30,
+        'image_url': UNSPLASH.format('1523741543316-beb7fc7023d8'),
+        'tags': ['schemes', 'finance'], 'crops': [],
+        'variants': {
+            'en': ('Government Farming Schemes', 'Complete guide to available subsidies and support.',
+                   'PM-KISAN income support, PMFBY crop insurance, Kisan Credit Card loans, Soil Health Card testing and '
+                   'PMKSY irrigation subsidies: who qualifies, which documents to keep ready and how to apply.'),
+        },
+    },
+]
+
+
+def seed(apps, schema_editor):
+    LearningItem = apps.get_model('agrimitra', 'LearningItem')
+    LearningVariant = apps.get_model('agrimitra', 'LearningVariant')
+    LearningLabel = apps.get_model('agrimitra', 'LearningLabel')
+    for row in ITEMS:
+        item, _ = LearningItem.objects.update_or_create(slug=row['slug'], defaults={
+            'kind': row['kind'], 'minutes': row['minutes'], 'priority': row['priority'], 'image_url': row['image_url'],
+        })
+        for language, (title, summary, body) in row['variants'].items():
+            LearningVariant.objects.update_or_create(item=item, language=language, defaults={
+                'title': title, 'summary': summary, 'body': body,
+            })
+        for kind in ('tag', 'crop'):
+            for value in row[kind + 's']:
+                LearningLabel.objects.get_or_create(item=item, kind=kind, value=value)
+
+
+def unseed(apps, schema_editor):
+    apps.get_model('agrimitra', 'LearningItem').objects.filter(slug__in=[row['slug'] for row in ITEMS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0020_learning_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed, unseed),
+    ]
@@ -0,0 +1,49 @@
+import unicodedata
+
+from django.db import OperationalError, migrations
+
+# unicode61 splits words at Indic vowel signs and viramas unless they are declared token characters
+INDIC_MARKS = ''.join(chr(c) for c in range(0x0900, 0x0D80) if unicodedata.category(chr(c)) in ('Mn', 'Mc'))
+
+# Mirrors agrimitra.learning_catalog (FTS_TABLE and _INDEX_SQL)
+CREATE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS agrimitra_learningsearch USING fts5(
+        title, summary, body, labels, item_id UNINDEXED, language UNINDEXED,
+        tokenize = "unicode61 remove_diacritics 2 tokenchars '{INDIC_MARKS}'"
+    )
+"""
+POPULATE_SQL = """
+    INSERT INTO agrimitra_learningsearch (rowid, title, summary, body, labels, item_id, language)
+    SELECT v.id, v.title, v.summary, v.body,
+        (SELECT group_concat(l.value, ' ') FROM agrimitra_learninglabel l WHERE l.item_id = v.item_id),
+        v.item_id, v.language
+    FROM agrimitra_learningvariant v
+"""
+
+
+def create_search_table(apps, schema_editor):
+    # Full-text search needs SQLite's FTS5; elsewhere search falls back to LIKE queries
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL)
+        except OperationalError:  # SQLite built without FTS5
+            return
+        cursor.execute(POPULATE_SQL)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS agrimitra_learningsearch")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agrimitra', '0021_seed_learning'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
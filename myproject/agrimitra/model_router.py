@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+STATS_CACHE_KEY = 'gemini:router-stats'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Error kinds returned by classify_error()
+UNAVAILABLE = 'unavailable'  # model missing or unsupported for this key
+IMAGE = 'image'  # model rejected the image part
+TRANSIENT = 'transient'  # 429/5xx/timeouts: another model may answer
+FATAL = 'fatal'  # bad key, bad request: no point trying other models
+
+
+def classify_error(e: Exception) -> str:
+    """Map an upstream exception to an error kind, by type when google-api-core is available."""
+    try:
+        from google.api_core import exceptions as gexc
+        if isinstance(e, (gexc.NotFound, gexc.MethodNotImplemented)):
+            return UNAVAILABLE
+        if isinstance(e, (gexc.ResourceExhausted, gexc.ServiceUnavailable, gexc.DeadlineExceeded,
+                          gexc.InternalServerError, gexc.GatewayTimeout, gexc.TooManyRequests)):
+            return TRANSIENT
+        if isinstance(e, (gexc.Unauthenticated, gexc.PermissionDenied)):
+            return FATAL
+    except Exception:  # pragma: no cover
+        pass
+    msg = str(e).lower()
+    if 'image' in msg or 'inline_data' in msg or 'inlinedata' in msg:
+        return IMAGE
+    if 'not found' in msg or '404' in msg or 'not supported' in msg:
+        return UNAVAILABLE
+    if isinstance(e, TimeoutError) or any(s in msg for s in ('429', '500', '502', '503', '504', 'timeout', 'deadline', 'unavailable', 'quota', 'exhausted')):
+        return TRANSIENT
+    return FATAL
+
+
+class ModelStats:
+    """Rolling latency/outcome window and circuit-breaker state for one model."""
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)  # (latency_seconds, ok)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.probe_until = 0.0  # half-open: no other trial request until then
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        lat = sorted(l for l, ok in self.samples if ok)
+        if not lat:
+            return None
+        return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+
+class ModelRouter:
+    """
+    Orders candidate models by observed latency and error rate.
+
+    A model's breaker opens after `failure_threshold` consecutive failures or
+    when its windowed error rate reaches `max_error_rate`; it stays out of
+    rotation for `cooldown` seconds, then goes half-open: a single trial
+    request is let through (a trial not reported back within `cooldown`
+    lapses), its success closes the breaker and its failure opens it again.
+    Models reported as unavailable (404/unsupported) are benched for
+    `unavailable_cooldown`. Image rejections are not counted: a model that
+    turns down inline images can still answer text.
+    """
+
+    def __init__(self, window: int = 50, min_samples: int = 5, failure_threshold: int = 3,
+                 max_error_rate: float = 0.5, cooldown: float = 60, unavailable_cooldown: float = 3600,
+                 error_penalty: float = 30, publish_interval: float = 5):
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.unavailable_cooldown = unavailable_cooldown
+        self.error_penalty = error_penalty
+        self.publish_interval = publish_interval
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelStats] = {}
+        self._published_at = 0.0
+
+    def _get(self, model: str) -> ModelStats:
+        st = self._stats.get(model)
+        if st is None:
+            st = self._stats[model] = ModelStats(self.window)
+        return st
+
+    def _available(self, st: ModelStats, now: float) -> bool:
+        if st.state == OPEN and now >= st.open_until:
+            st.state = HALF_OPEN
+            st.probe_until = 0.0
+        if st.state == HALF_OPEN:
+            if now < st.probe_until:
+                return False
+            st.probe_until = now + self.cooldown
+            return True
+        return st.state != OPEN
+
+    def order(self, candidates: List[str]) -> List[str]:
+        """Healthy models fastest first, untried models in configured order, open breakers dropped."""
+        now = time.monotonic()
+        with self._lock:
+            ranked = []
+            for idx, name in enumerate(candidates):
+                st = self._get(name)
+                if not self._available(st, now):
+                    continue
+                p50 = st.percentile(0.5)
+                if st.samples:
+                    score = (p50 if p50 is not None else 0.0) + st.error_rate() * self.error_penalty
+                    ranked.append((0, score, idx, name))
+                else:
+                    ranked.append((1, 0.0, idx, name))
+            if not ranked:
+                # Everything is benched: fall back to the models that reopen soonest
+                return sorted(candidates, key=lambda n: self._get(n).open_until)
+        ranked.sort()
+        return [name for *_, name in ranked]
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """p95 latency of a model once enough successful samples exist."""
+        with self._lock:
+            st = self._get(model)
+            if sum(1 for _, ok in st.samples if ok) < self.min_samples:
+                return None
+            return st.percentile(0.95)
+
+    def record_success(self, model: str, latency: float):
+        with self._lock:
+            st = self._get(model)
+            st.samples.append((latency, True))
+            st.consecutive_failures = 0
+            st.state = CLOSED
+            st.probe_until = 0.0
+        self._maybe_publish()
+
+    def record_failure(self, model: str, latency: float, kind: str = TRANSIENT):
+        with self._lock:
+            st = self._get(model)
+            if kind == IMAGE:
+                # Says nothing about text traffic; a half-open model stays on trial
+                st.probe_until = 0.0
+                return
+            st.samples.append((latency, False))
+            st.consecutive_failures += 1
+            now = time.monotonic()
+            if kind == UNAVAILABLE:
+                st.state = OPEN
+                st.open_until = now + self.unavailable_cooldown
+            elif (st.state == HALF_OPEN
+                  or st.consecutive_failures >= self.failure_threshold
+                  or (len(st.samples) >= self.min_samples and st.error_rate() >= self.max_error_rate)):
+                st.state = OPEN
+                st.open_until = now + self.cooldown
+        self._maybe_publish()
+
+    def snapshot(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for name, st in self._stats.items():
+                p50, p95 = st.percentile(0.5), st.percentile(0.95)
+                out[name] = {
+                    'state': st.state,
+                    'samples': len(st.samples),
+                    'error_rate': round(st.error_rate(), 3),
+                    'p50_ms': round(p50 * 1000) if p50 is not None else None,
+                    'p95_ms': round(p95 * 1000) if p95 is not None else None,
+                    'consecutive_failures': st.consecutive_failures,
+                    'reopens_in_s': round(st.open_until - now) if st.state == OPEN else None,
+                }
+            return out
+
+    def _maybe_publish(self):
+        """Share this worker's stats through the cache for the gemini_router_stats command."""
+        now = time.monotonic()
+        if now - self._published_at < self.publish_interval:
+            return
+        self._published_at = now
+        try:
+            workers = cache.get(STATS_CACHE_KEY) or {}
+            workers[str(os.getpid())] = {'at': time.time(), 'models': self.snapshot()}
+            # Drop workers that have not reported for an hour
+            workers = {pid: w for pid, w in workers.items() if time.time() - w.get('at', 0) < 3600}
+            cache.set(STATS_CACHE_KEY, workers, timeout=24 * 3600)
+        except Exception:  # pragma: no cover
+            pass
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -125,11 +126,18 @@ class Conversation(models.Model):
 	"""A chat conversation for the chatbot, per user."""
 	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations')
 	title = models.CharField(max_length=200, blank=True, default='')
+	# Rolling summary of older turns; messages after summary_message_id are sent verbatim
+	summary = models.TextField(blank=True, default='')
+	summary_message_id = models.BigIntegerField(blank=True, null=True)
+	summary_updated_at = models.DateTimeField(blank=True, null=True)
+	# Messages moved to ConversationArchive; rehydrated on the next read
+	archived = models.BooleanField(default=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
 	class Meta:
 		ordering = ['-updated_at']
+		indexes = [models.Index(fields=['user', '-updated_at', '-id'], name='conversation_user_recent')]
 
 	def __str__(self):
 		return f"{self.title or 'Untitled'} ({self.user.username})"
@@ -151,3 +159,329 @@ class ConversationMessage(models.Model):
 
 	def __str__(self):
 		return f"{self.role} • {self.text[:30]}..."
+
+
+class ConversationArchive(models.Model):
+	"""Compressed JSON of an idle conversation's messages, one blob per conversation."""
+	conversation = models.OneToOneField(Conversation, on_delete=models.CASCADE, related_name='archive')
+	codec = models.CharField(max_length=10)
+	data = models.BinaryField()
+	message_count = models.PositiveIntegerField(default=0)
+	raw_bytes = models.PositiveBigIntegerField(default=0)
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	def __str__(self):
+		return f"Archive of Conversation({self.conversation_id}): {self.message_count} messages"
+
+
+class AdvisoryBulletin(models.Model):
+	"""Pre-generated seasonal advisory for a crop in a state, in one language."""
+	SEASON_CHOICES = (
+		('kharif', 'Kharif'),
+		('rabi', 'Rabi'),
+		('zaid', 'Zaid'),
+	)
+	state = models.CharField(max_length=2, choices=FarmerProfile.STATE_CHOICES)
+	crop = models.CharField(max_length=40)
+	language = models.CharField(max_length=2, choices=FarmerProfile.LANGUAGE_CHOICES)
+	season = models.CharField(max_length=10, choices=SEASON_CHOICES)
+	text = models.TextField()
+	generated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['state', 'crop', 'language']
+		unique_together = (('state', 'crop', 'language', 'season'),)
+
+	def __str__(self):
+		return f"{self.crop} • {self.state} • {self.language} • {self.season}"
+
+
+class ContentTranslation(models.Model):
+	"""Machine translation of a forum Post or Comment, valid for one version of its text."""
+	POST = 'post'
+	COMMENT = 'comment'
+	KIND_CHOICES = (
+		(POST, 'Post'),
+		(COMMENT, 'Comment'),
+	)
+	kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+	object_id = models.PositiveBigIntegerField()
+	language = models.CharField(max_length=2, choices=FarmerProfile.LANGUAGE_CHOICES)
+	# sha256 of the source text; an edit changes it, so stale rows never match
+	source_hash = models.CharField(max_length=64)
+	text = models.TextField()
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		unique_together = (('kind', 'object_id', 'language', 'source_hash'),)
+
+	def __str__(self):
+		return f"{self.kind} {self.object_id} → {self.language}"
+
+
+class GeocodeEntry(models.Model):
+	"""Cached Open-Meteo geocoding answer for a normalized place query; result is null for 'not found'."""
+	key = models.CharField(max_length=255, unique=True)
+	result = models.JSONField(null=True, blank=True)
+	fetched_at = models.DateTimeField()
+
+	class Meta:
+		verbose_name_plural = 'geocode entries'
+
+	def __str__(self):
+		return f"{self.key} → {'not found' if self.result is None else self.result.get('name')}"
+
+
+class ForecastCell(models.Model):
+	"""Normalized Open-Meteo forecast for one grid cell, shared by everyone located in it."""
+	key = models.CharField(max_length=32, unique=True)
+	latitude = models.FloatField()
+	longitude = models.FloatField()
+	data = models.JSONField()
+	fetched_at = models.DateTimeField()
+	# Served as fresh until the next upstream model update, then as stale while a refresh runs
+	fresh_until = models.DateTimeField(db_index=True)
+
+	def __str__(self):
+		return f"Forecast {self.key} @ {self.fetched_at:%Y-%m-%d %H:%M}"
+
+
+class WeatherAlert(models.Model):
+	"""A forecast weather hazard for one user's grid cell on one day, written by evaluate_weather_alerts."""
+	HEAVY_RAIN = 'heavy_rain'
+	HEATWAVE = 'heatwave'
+	FROST = 'frost'
+	HIGH_WIND = 'high_wind'
+	KIND_CHOICES = (
+		(HEAVY_RAIN, 'Heavy rain'),
+		(HEATWAVE, 'Heatwave'),
+		(FROST, 'Frost'),
+		(HIGH_WIND, 'High wind'),
+	)
+	SEVERITY_CHOICES = (
+		('warning', 'Warning'),
+		('severe', 'Severe'),
+	)
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='weather_alerts')
+	kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+	date = models.DateField()
+	severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+	value = models.FloatField()
+	message = models.CharField(max_length=200)
+	cell = models.CharField(max_length=32)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['date', 'kind']
+		unique_together = (('user', 'kind', 'date'),)
+		indexes = [models.Index(fields=['user', 'date'], name='weather_alert_user_date')]
+
+	def __str__(self):
+		return f"{self.get_kind_display()} on {self.date} for {self.user}"
+
+
+class ChatJob(models.Model):
+	"""A queued chatbot request, answered by the run_chat_worker command."""
+	QUEUED = 'queued'
+	RUNNING = 'running'
+	DONE = 'done'
+	FAILED = 'failed'
+	STATUS_CHOICES = (
+		(QUEUED, 'Queued'),
+		(RUNNING, 'Running'),
+		(DONE, 'Done'),
+		(FAILED, 'Failed'),
+	)
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_jobs')
+	conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='jobs')
+	# The persisted user turn this job answers; history is taken from before it
+	user_message = models.ForeignKey(ConversationMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+	message = models.TextField(blank=True)
+	image = models.ImageField(upload_to='chat_jobs/', blank=True, null=True)
+	language = models.CharField(max_length=40, blank=True, default='')
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	max_attempts = models.PositiveSmallIntegerField(default=3)
+	run_after = models.DateTimeField(default=timezone.now)
+	locked_by = models.CharField(max_length=64, blank=True, default='')
+	locked_at = models.DateTimeField(blank=True, null=True)
+	reply = models.ForeignKey(ConversationMessage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+	error = models.TextField(blank=True, default='')
+	created_at = models.DateTimeField(auto_now_add=True)
+	finished_at = models.DateTimeField(blank=True, null=True)
+
+	class Meta:
+		ordering = ['id']
+		indexes = [models.Index(fields=['status', 'run_after'])]
+
+	def __str__(self):
+		return f"ChatJob({self.id}) {self.status} for {self.user.username}"
+
+
+class LLMUsage(models.Model):
+	"""Daily LLM request and token totals per user, from response usage metadata."""
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='llm_usage')
+	day = models.DateField()
+	requests = models.PositiveIntegerField(default=0)
+	prompt_tokens = models.PositiveBigIntegerField(default=0)
+	output_tokens = models.PositiveBigIntegerField(default=0)
+	total_tokens = models.PositiveBigIntegerField(default=0)
+
+	class Meta:
+		ordering = ['-day', '-total_tokens']
+		unique_together = (('user', 'day'),)
+		verbose_name_plural = 'LLM usage'
+
+	def __str__(self):
+		return f"{self.user.username} {self.day}: {self.total_tokens} tokens"
+
+
+class Scheme(models.Model):
+	"""
+	Government scheme with structured eligibility.
+
+	Each eligibility list is empty when the scheme is open to everyone on
+	that dimension (e.g. no states means nationwide).
+	"""
+	CATEGORY_CHOICES = (
+		('income', 'Income Support'),
+		('insurance', 'Insurance'),
+		('credit', 'Loans & Credit'),
+		('subsidy', 'Subsidies'),
+		('equipment', 'Equipment'),
+		('irrigation', 'Irrigation'),
+		('livestock', 'Livestock'),
+		('soil', 'Soil Health'),
+		('market', 'Markets'),
+	)
+	# Landholding classes of the Agriculture Census, in acres (1 ha ≈ 2.47 acres)
+	FARM_SIZE_CHOICES = (
+		('marginal', 'Marginal (under 2.5 acres)'),
+		('small', 'Small (2.5–5 acres)'),
+		('semi_medium', 'Semi-medium (5–10 acres)'),
+		('medium', 'Medium (10–25 acres)'),
+		('large', 'Large (25 acres and above)'),
+	)
+
+	slug = models.SlugField(max_length=80, unique=True)
+	title = models.CharField(max_length=200)
+	description = models.TextField()
+	category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+	benefit = models.CharField(max_length=120, blank=True, help_text='Short headline, e.g. "₹6,000/year"')
+	url = models.URLField(blank=True)
+	states = models.JSONField(default=list, blank=True, help_text='State codes; empty for nationwide')
+	farming_types = models.JSONField(default=list, blank=True, help_text='Values from FarmerProfile.FARMING_CHOICES; empty for any')
+	farm_sizes = models.JSONField(default=list, blank=True, help_text='Farm size bands; empty for any')
+	crops = models.JSONField(default=list, blank=True, help_text='Canonical crop names (see bulletins.COMMON_CROPS); empty for any')
+	priority = models.IntegerField(default=0, help_text='Higher first')
+	active = models.BooleanField(default=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['-priority', 'title']
+
+	def __str__(self):
+		return self.title
+
+	@property
+	def region(self) -> str:
+		if not self.states:
+			return 'All India'
+		names = dict(FarmerProfile.STATE_CHOICES)
+		return ', '.join(names.get(s, s) for s in self.states)
+
+
+class LearningItem(models.Model):
+	"""Learning resource; its text lives in one LearningVariant per language."""
+	GUIDE = 'guide'
+	VIDEO = 'video'
+	ARTICLE = 'article'
+	COURSE = 'course'
+	KIND_CHOICES = (
+		(GUIDE, 'Guide'),
+		(VIDEO, 'Video'),
+		(ARTICLE, 'Article'),
+		(COURSE, 'Course'),
+	)
+	slug = models.SlugField(max_length=80, unique=True)
+	kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=ARTICLE)
+	image_url = models.URLField(max_length=500, blank=True)
+	link = models.URLField(max_length=500, blank=True, help_text='External video or document, if any')
+	minutes = models.PositiveSmallIntegerField(default=5, help_text='Reading or watching time')
+	priority = models.IntegerField(default=0, help_text='Higher first')
+	published = models.BooleanField(default=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['-priority', 'slug']
+
+	def __str__(self):
+		return self.slug
+
+
+class LearningVariant(models.Model):
+	"""Title and text of a LearningItem in one language."""
+	item = models.ForeignKey(LearningItem, on_delete=models.CASCADE, related_name='variants')
+	language = models.CharField(max_length=2, choices=FarmerProfile.LANGUAGE_CHOICES, default='en')
+	title = models.CharField(max_length=200)
+	summary = models.CharField(max_length=300, blank=True)
+	body = models.TextField(blank=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		unique_together = (('item', 'language'),)
+
+	def __str__(self):
+		return f"{self.title} ({self.language})"
+
+
+class LearningLabel(models.Model):
+	"""Tag or crop attached to a LearningItem; indexed for filtering by either."""
+	TAG = 'tag'
+	CROP = 'crop'
+	KIND_CHOICES = (
+		(TAG, 'Tag'),
+		(CROP, 'Crop'),
+	)
+	item = models.ForeignKey(LearningItem, on_delete=models.CASCADE, related_name='labels')
+	kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+	# Lower-case; crops use the canonical names from bulletins.COMMON_CROPS
+	value = models.CharField(max_length=40)
+
+	class Meta:
+		unique_together = (('item', 'kind', 'value'),)
+		indexes = [models.Index(fields=['kind', 'value'], name='learning_label_kind_value')]
+
+	def __str__(self):
+		return f"{self.kind}:{self.value}"
+
+
+class CachedImage(models.Model):
+	"""Local thumbnails of a remote content image, stored in media under content-hashed names."""
+	source = models.TextField()
+	# sha256 of the source URL, for lookups (sources can be long)
+	source_hash = models.CharField(max_length=64, unique=True)
+	# sha256 of the original bytes; identical images share their files
+	content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+	width = models.PositiveIntegerField(default=0)
+	height = models.PositiveIntegerField(default=0)
+	# {"<width>": "<storage name>", ...}
+	variants = models.JSONField(default=dict, blank=True)
+	size = models.PositiveBigIntegerField(default=0, help_text='Bytes of all variants on disk')
+	error = models.CharField(max_length=255, blank=True)
+	fetched_at = models.DateTimeField(default=timezone.now)
+	last_used = models.DateTimeField(default=timezone.now, db_index=True)
+
+	def __str__(self):
+		return self.source[:80]
+
+
+class ChangeCounter(models.Model):
+	"""Write counter per page, bumped when a model the page renders changes; page ETags are built from these."""
+	# Page name, e.g. 'forum' (see versioning.track)
+	name = models.CharField(max_length=100, unique=True)
+	value = models.PositiveBigIntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"{self.name}={self.value}"
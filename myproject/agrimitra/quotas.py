@@ -0,0 +1,128 @@
+import time
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import LLMUsage
+
+
+class TokenBucket:
+	"""
+	Token bucket stored in the shared Django cache.
+
+	Each bucket is a (tokens, timestamp) pair. Updates are serialized by a
+	short-lived lock taken with cache.add(), which is atomic on every Django
+	cache backend, so workers sharing the cache share the bucket. A request
+	that cannot take the lock within LOCK_WAIT seconds is denied: contention
+	means a burst on this very bucket, which is what the limit is for.
+	"""
+
+	LOCK_WAIT = 0.1
+
+	def __init__(self, key: str, capacity: float, refill_per_sec: float):
+		self.key = f"ratelimit:{key}"
+		self.capacity = capacity
+		self.refill_per_sec = refill_per_sec
+
+	def consume(self, tokens: float = 1, reserve: float = 0) -> Tuple[bool, float]:
+		"""
+		Take tokens if available; returns (allowed, seconds until enough tokens).
+
+		`reserve` tokens must remain afterwards, which lets background work
+		use only the headroom that interactive traffic is not using.
+		"""
+		if self.capacity <= 0 or self.refill_per_sec <= 0:
+			return True, 0.0
+		lock_key = self.key + ':lock'
+		give_up = time.monotonic() + self.LOCK_WAIT
+		while not cache.add(lock_key, 1, timeout=2):
+			if time.monotonic() >= give_up:
+				return False, 1.0
+			time.sleep(0.002)
+		try:
+			now = time.time()
+			level, stamp = cache.get(self.key) or (self.capacity, now)
+			level = min(self.capacity, level + (now - stamp) * self.refill_per_sec)
+			allowed = level - tokens >= reserve
+			if allowed:
+				level -= tokens
+			# Keep state only as long as it takes to refill completely
+			ttl = int((self.capacity - level) / self.refill_per_sec) + 1
+			cache.set(self.key, (level, now), timeout=ttl)
+			retry_after = 0.0 if allowed else (tokens + reserve - level) / self.refill_per_sec
+			return allowed, retry_after
+		finally:
+			cache.delete(lock_key)
+
+
+def _per_minute_bucket(key: str, per_minute: float, burst: float) -> TokenBucket:
+	return TokenBucket(key, capacity=burst, refill_per_sec=per_minute / 60.0)
+
+
+def global_bucket() -> TokenBucket:
+	"""The bucket shared by every chat request (and by low-priority batch jobs)."""
+	return _per_minute_bucket(
+		"global",
+		getattr(settings, 'CHAT_RATE_GLOBAL_PER_MINUTE', 120),
+		getattr(settings, 'CHAT_RATE_GLOBAL_BURST', 30),
+	)
+
+
+def _daily_tokens_key(user_id: int) -> str:
+	return f"quota:tokens:{user_id}:{timezone.localdate().isoformat()}"
+
+
+def check_chat_quota(user) -> Optional[Tuple[str, float]]:
+	"""
+	Cache-only admission check for one chat request.
+
+	Returns None when allowed, else (reason, retry_after_seconds). Runs the
+	per-user bucket, then the global bucket shared by every user, then the
+	per-user daily token quota.
+	"""
+	ok, wait = _per_minute_bucket(
+		f"user:{user.id}",
+		getattr(settings, 'CHAT_RATE_USER_PER_MINUTE', 10),
+		getattr(settings, 'CHAT_RATE_USER_BURST', 5),
+	).consume()
+	if not ok:
+		return "You are sending messages too quickly. Please wait a moment.", wait
+	ok, wait = global_bucket().consume()
+	if not ok:
+		return "The assistant is very busy right now. Please try again shortly.", wait
+	daily = getattr(settings, 'CHAT_DAILY_TOKEN_QUOTA', 0)
+	if daily and (cache.get(_daily_tokens_key(user.id)) or 0) >= daily:
+		now = timezone.localtime()
+		midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+		return "You have used today's assistant quota. It resets at midnight.", (midnight - now).total_seconds()
+	return None
+
+
+def record_usage(user_id: int, raw: Optional[dict]):
+	"""
+	Add one request and its usage_metadata token counts to today's LLMUsage row.
+	Answers served from cache (raw['cached']) count as a request but cost no tokens.
+	"""
+	usage = {} if (raw or {}).get('cached') else (raw or {}).get('usage_metadata') or {}
+	prompt = int(usage.get('prompt_token_count') or 0)
+	output = int(usage.get('candidates_token_count') or 0)
+	total = int(usage.get('total_token_count') or (prompt + output))
+	day = timezone.localdate()
+	row, _ = LLMUsage.objects.get_or_create(user_id=user_id, day=day)
+	LLMUsage.objects.filter(pk=row.pk).update(
+		requests=F('requests') + 1,
+		prompt_tokens=F('prompt_tokens') + prompt,
+		output_tokens=F('output_tokens') + output,
+		total_tokens=F('total_tokens') + total,
+	)
+	if total:
+		key = _daily_tokens_key(user_id)
+		cache.add(key, 0, timeout=26 * 3600)
+		try:
+			cache.incr(key, total)
+		except ValueError:
+			cache.set(key, total, timeout=26 * 3600)
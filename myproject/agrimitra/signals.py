@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .eligibility import invalidate as invalidate_schemes
+from .learning_catalog import index_item
+from .models import (
+	CachedImage, Comment, CommentLike, ContentTranslation, FarmerProfile, LearningItem, LearningLabel, LearningVariant, Post,
+	PostVote, Scheme,
+)
+from .translations import forget
+from .versioning import track
+
+# Change counters behind the conditional GETs of the read-mostly pages: one per
+# page, moved only by the models it renders. The weather page's forecasts change
+# with each upstream model run, which its ETag covers through vary=.
+track('forum', Post, Comment, PostVote, CommentLike, FarmerProfile)
+track('forum', User, ignore=('last_login',))
+track('schemes', Scheme, FarmerProfile)
+track('learning', LearningItem, LearningVariant, LearningLabel, FarmerProfile)
+track('weather', FarmerProfile)
+# Every page shows content images, hotlinked until image_cache has local thumbnails
+for page in ('forum', 'schemes', 'learning', 'weather'):
+	track(page, CachedImage)
+
+
+@receiver(post_save, sender=Post)
+def _post_saved(sender, instance, created, **kwargs):
+	if not created:
+		forget(ContentTranslation.POST, instance.id, keep_text=instance.content)
+
+
+@receiver(post_save, sender=Comment)
+def _comment_saved(sender, instance, created, **kwargs):
+	if not created:
+		forget(ContentTranslation.COMMENT, instance.id, keep_text=instance.text)
+
+
+@receiver(post_delete, sender=Post)
+def _post_deleted(sender, instance, **kwargs):
+	forget(ContentTranslation.POST, instance.id)
+
+
+@receiver(post_delete, sender=Comment)
+def _comment_deleted(sender, instance, **kwargs):
+	forget(ContentTranslation.COMMENT, instance.id)
+
+
+@receiver([post_save, post_delete], sender=Scheme)
+def _scheme_changed(sender, **kwargs):
+	invalidate_schemes()
+
+
+@receiver([post_save, post_delete], sender=LearningItem)
+def _learning_item_changed(sender, instance, **kwargs):
+	index_item(instance.id)
+
+
+@receiver([post_save, post_delete], sender=LearningVariant)
+def _learning_variant_changed(sender, instance, **kwargs):
+	index_item(instance.item_id)
+
+
+@receiver([post_save, post_delete], sender=LearningLabel)
+def _learning_label_changed(sender, instance, **kwargs):
+	# Labels have no timestamp of their own; touching the item moves the catalog version
+	LearningItem.objects.filter(id=instance.item_id).update(updated_at=timezone.now())
+	index_item(instance.item_id)
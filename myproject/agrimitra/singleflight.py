@@ -0,0 +1,122 @@
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+
+
+class _Call:
+    """An in-flight call shared by every thread waiting on the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    Within a process, the first thread to arrive runs the function and the
+    others block until it finishes. Across workers, a lock held in the shared
+    Django cache elects one leader; followers poll the cache for the leader's
+    result. Cross-worker coalescing only helps when CACHES points at a backend
+    shared by all workers (Redis, Memcached, database); with the default
+    LocMemCache it degrades to per-process coalescing.
+    """
+
+    def __init__(self, namespace: str, lock_ttl: float = 120, wait_timeout: float = 90, poll_interval: float = 0.1, result_ttl: float = 10):
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn() once for all concurrent callers of key and return its result.
+
+        A follower gives up with TimeoutError after `timeout` seconds; the
+        leader's own call is bounded by fn itself.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn, timeout)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _do_shared(self, key: str, fn: Callable[[], Any], timeout: Optional[float]) -> Any:
+        lock_key = f"{self.namespace}:lock:{key}"
+        wait = self.wait_timeout if timeout is None else min(self.wait_timeout, timeout)
+        deadline = time.monotonic() + wait
+        while True:
+            token = uuid.uuid4().hex
+            if cache.add(lock_key, token, timeout=self.lock_ttl):
+                return self._lead(lock_key, token, fn)
+            token = cache.get(lock_key)
+            if token is None:
+                # Leader finished between our add() and get(); race for the lock again
+                continue
+            outcome = self._follow(lock_key, token, deadline)
+            if outcome is not None:
+                if 'error' in outcome:
+                    # Same exception class as the leader's (e.g. a timeout), so callers handle it alike
+                    error = outcome.get('exception')
+                    raise error if isinstance(error, Exception) else RuntimeError(outcome['error'])
+                return outcome['result']
+            if time.monotonic() >= deadline:
+                if timeout is not None and wait >= timeout:
+                    raise TimeoutError(f"Timed out waiting for in-flight call {key}")
+                # Leader is stuck or gone; stop waiting and call upstream ourselves
+                return fn()
+
+    def _lead(self, lock_key: str, token: str, fn: Callable[[], Any]) -> Any:
+        result_key = f"{self.namespace}:result:{token}"
+        try:
+            result = fn()
+        except Exception as e:
+            try:
+                cache.set(result_key, {'error': str(e), 'exception': e}, timeout=self.result_ttl)
+            except Exception:
+                # Not picklable: followers get the message as a RuntimeError
+                cache.set(result_key, {'error': str(e)}, timeout=self.result_ttl)
+            raise
+        else:
+            cache.set(result_key, {'result': result}, timeout=self.result_ttl)
+            return result
+        finally:
+            cache.delete(lock_key)
+
+    def _follow(self, lock_key: str, token: str, deadline: float):
+        """Wait for the leader identified by token; None if it vanished without a result."""
+        result_key = f"{self.namespace}:result:{token}"
+        while time.monotonic() < deadline:
+            outcome = cache.get(result_key)
+            if outcome is not None:
+                return outcome
+            if cache.get(lock_key) != token:
+                # Lock released or expired; pick up a result written just before release
+                return cache.get(result_key)
+            time.sleep(self.poll_interval)
+        return None
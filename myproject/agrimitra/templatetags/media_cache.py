@@ -0,0 +1,15 @@
+from django import template
+
+from ..image_cache import local_url
+
+register = template.Library()
+
+
+@register.filter
+def local_image(url, width=400):
+	"""Rewrite a remote image URL to its locally cached thumbnail: {{ url|local_image:400 }}."""
+	try:
+		width = int(width)
+	except (TypeError, ValueError):
+		width = 400
+	return local_url(str(url or ''), width)
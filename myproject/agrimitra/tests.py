@@ -1,3 +1,1208 @@
-from django.test import TestCase
+import io
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from . import gemini_client
+
+
+def _photo(spot=None) -> SimpleUploadedFile:
+	"""A 64x64 gradient JPEG, optionally with a small dark spot."""
+	from PIL import Image
+	img = Image.new('RGB', (64, 64))
+	img.putdata([(x * 4, 120, 60) for y in range(64) for x in range(64)])
+	if spot:
+		for dx in range(2):
+			for dy in range(2):
+				img.putpixel((spot[0] + dx, spot[1] + dy), (0, 0, 0))
+	buf = io.BytesIO()
+	img.save(buf, format='JPEG', quality=95)
+	return SimpleUploadedFile('leaf.jpg', buf.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(GEMINI_COALESCE=False)
+class ImageAnalysisCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		patcher = mock.patch.object(gemini_client, '_ensure_client')
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.generate = mock.patch.object(gemini_client, '_generate', side_effect=lambda parts, img, deadline: (f"answer {len(parts)}", {})).start()
+		self.addCleanup(mock.patch.stopall)
+
+	def test_same_photo_and_question_reuses_the_analysis(self):
+		_text, raw = gemini_client.ask_gemini('What is this?', image_file=_photo())
+		self.assertNotIn('cached', raw)
+		_text, raw = gemini_client.ask_gemini('What is this?', image_file=_photo())
+		self.assertEqual(self.generate.call_count, 1)
+		self.assertTrue(raw['cached'])
+
+	def test_look_alike_photos_do_not_share_a_diagnosis(self):
+		a, b = _photo(), _photo(spot=(30, 30))
+		gemini_client.ask_gemini('What is this?', image_file=a)
+		gemini_client.ask_gemini('What is this?', image_file=b)
+		self.assertEqual(self.generate.call_count, 2)
+
+	def test_conversation_context_is_part_of_the_key(self):
+		gemini_client.ask_gemini('What is this?', image_file=_photo(), summary='Farmer grows wheat.')
+		gemini_client.ask_gemini('What is this?', image_file=_photo(), summary='Farmer grows cotton.')
+		gemini_client.ask_gemini('What is this?', image_file=_photo(), summary='Farmer grows cotton.',
+			history=[{'role': 'user', 'text': 'Leaves are yellow'}])
+		self.assertEqual(self.generate.call_count, 3)
+
+
+@override_settings(GEMINI_COALESCE=True)
+class PromptCoalescingTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		mock.patch.object(gemini_client, '_ensure_client').start()
+		self.addCleanup(mock.patch.stopall)
+
+	def _ask_together(self, *messages):
+		import threading
+		calls = []
+
+		def generate(parts, img, deadline):
+			calls.append(parts)
+			time.sleep(0.2)
+			return f"answer {len(calls)}", {}
+
+		mock.patch.object(gemini_client, '_generate', side_effect=generate).start()
+		replies = [None] * len(messages)
+
+		def ask(i):
+			replies[i] = gemini_client.ask_gemini(messages[i])[0]
+
+		threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(messages))]
+		for t in threads:
+			t.start()
+			time.sleep(0.02)
+		for t in threads:
+			t.join()
+		return calls, replies
+
+	def test_identical_prompts_share_one_call(self):
+		calls, replies = self._ask_together('When to sow wheat?', 'when to sow  WHEAT?', 'When to sow wheat?')
+		self.assertEqual(len(calls), 1)
+		self.assertEqual(set(replies), {'answer 1'})
+
+	def test_different_prompts_are_not_coalesced(self):
+		calls, _replies = self._ask_together('When to sow wheat?', 'When to sow rice?')
+		self.assertEqual(len(calls), 2)
+
+
+class LatencyBudgetTests(TestCase):
+	def test_fallback_stops_when_the_budget_runs_out(self):
+		def slow_failure(model_name, parts, deadline):
+			time.sleep(0.06)
+			raise RuntimeError('503 service unavailable')
+
+		deadline = gemini_client.Deadline(0.05)
+		with mock.patch.object(gemini_client, '_model_candidates', return_value=['m1', 'm2']), \
+				mock.patch.object(gemini_client, '_timed_call', side_effect=slow_failure) as call:
+			with self.assertRaises(gemini_client.GeminiTimeoutError) as caught:
+				gemini_client._generate(['hi'], None, deadline)
+		self.assertEqual(call.call_count, 1)
+		self.assertEqual(caught.exception.tried, ['m1'])
+		self.assertGreaterEqual(caught.exception.elapsed, 0.05)
+
+	def test_next_model_is_tried_within_budget(self):
+		outcomes = [RuntimeError('503 service unavailable'), ('answer', {})]
+		deadline = gemini_client.Deadline(5)
+		with mock.patch.object(gemini_client, '_model_candidates', return_value=['m1', 'm2']), \
+				mock.patch.object(gemini_client, '_timed_call', side_effect=outcomes) as call:
+			self.assertEqual(gemini_client._generate(['hi'], None, deadline), ('answer', {}))
+		self.assertEqual([c.args[0] for c in call.call_args_list], ['m1', 'm2'])
+
+
+class SingleFlightTests(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	def _run_with_follower(self, fn):
+		"""Lead fn in one SingleFlight (worker A) while a second instance (worker B) follows through the cache."""
+		import threading
+		from .singleflight import SingleFlight
+		leader, follower = SingleFlight('test', poll_interval=0.01), SingleFlight('test', poll_interval=0.01)
+		started, outcome = threading.Event(), {}
+
+		def lead():
+			try:
+				leader.do('k', lambda: (started.set(), time.sleep(0.2), fn())[-1])
+			except Exception as e:
+				outcome['leader'] = e
+
+		thread = threading.Thread(target=lead)
+		thread.start()
+		started.wait(2)
+		try:
+			outcome['follower'] = follower.do('k', lambda: 'called upstream again', timeout=5)
+		except Exception as e:
+			outcome['follower'] = e
+		thread.join()
+		return outcome
+
+	def test_followers_share_the_leaders_result(self):
+		self.assertEqual(self._run_with_follower(lambda: 'answer')['follower'], 'answer')
+
+	def test_followers_get_the_leaders_exception_class(self):
+		def timeout():
+			raise gemini_client.GeminiTimeoutError(45, 45.2, ['gemini-a'])
+
+		error = self._run_with_follower(timeout)['follower']
+		self.assertIsInstance(error, gemini_client.GeminiTimeoutError)
+		self.assertEqual(error.as_dict()['tried'], ['gemini-a'])
+
+
+class ChatJobQueueTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .models import Conversation
+		cache.clear()
+		self.user = User.objects.create_user('ravi', password='pw')
+		self.conversation = Conversation.objects.create(user=self.user, title='Leaf spots')
+		self.client.force_login(self.user)
+
+	def _job(self, **fields):
+		from .models import ChatJob
+		return ChatJob.objects.create(user=self.user, conversation=self.conversation, message='hello', **fields)
+
+	def _expired_lease(self, attempts):
+		from datetime import timedelta
+		from django.utils import timezone
+		from .models import ChatJob
+		return self._job(status=ChatJob.RUNNING, attempts=attempts, max_attempts=3, locked_by='gone:1',
+						 locked_at=timezone.now() - timedelta(hours=1))
+
+	def test_expired_lease_with_attempts_left_is_claimed_again(self):
+		from . import chat_jobs
+		job = self._expired_lease(attempts=1)
+		claimed = chat_jobs.claim('w:1', 1)
+		self.assertEqual([j.id for j in claimed], [job.id])
+		self.assertEqual(claimed[0].attempts, 2)
+
+	def test_expired_lease_out_of_attempts_fails(self):
+		from . import chat_jobs
+		from .models import ChatJob
+		job = self._expired_lease(attempts=3)
+		self.assertEqual(chat_jobs.claim('w:1', 1), [])
+		job.refresh_from_db()
+		self.assertEqual(job.status, ChatJob.FAILED)
+		self.assertIsNotNone(job.finished_at)
+		self.assertTrue(job.error)
+
+	def test_job_status_answers_without_waiting(self):
+		job = self._job()
+		started = time.monotonic()
+		resp = self.client.get(f'/api/chatbot/jobs/{job.id}/?wait=20')
+		self.assertLess(time.monotonic() - started, 1)
+		self.assertEqual(resp.json()['status'], 'queued')
+
+	@override_settings(CHAT_USE_JOB_QUEUE=False, LLM_BACKEND='fake', LLM_BACKEND_OPTIONS={'latency': 'fixed', 'latency_ms': 0})
+	def test_async_flag_ignored_without_queue(self):
+		from .models import ChatJob
+		resp = self.client.post('/api/chatbot/ask/', {'message': 'My tomato leaves curl upward', 'async': '1'})
+		self.assertEqual(resp.status_code, 200)
+		self.assertTrue(resp.json()['reply'])
+		self.assertFalse(ChatJob.objects.exists())
+
+
+class TokenBucketTests(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	def test_burst_then_refill(self):
+		from .quotas import TokenBucket
+		bucket = TokenBucket('test', capacity=2, refill_per_sec=10)
+		self.assertTrue(bucket.consume()[0])
+		self.assertTrue(bucket.consume()[0])
+		allowed, retry_after = bucket.consume()
+		self.assertFalse(allowed)
+		self.assertGreater(retry_after, 0)
+		self.assertLessEqual(retry_after, 0.1)
+		time.sleep(0.15)
+		self.assertTrue(bucket.consume()[0])
+
+	def test_reserve_keeps_headroom(self):
+		from .quotas import TokenBucket
+		bucket = TokenBucket('test', capacity=3, refill_per_sec=0.01)
+		self.assertTrue(bucket.consume(reserve=2)[0])
+		self.assertFalse(bucket.consume(reserve=2)[0])
+		self.assertTrue(bucket.consume()[0])
+
+	def test_lock_contention_denies(self):
+		from .quotas import TokenBucket
+		bucket = TokenBucket('test', capacity=5, refill_per_sec=1)
+		cache.add(bucket.key + ':lock', 1, timeout=2)
+		with mock.patch.object(TokenBucket, 'LOCK_WAIT', 0.01):
+			allowed, retry_after = bucket.consume()
+		self.assertFalse(allowed)
+		self.assertGreater(retry_after, 0)
+		cache.delete(bucket.key + ':lock')
+		self.assertTrue(bucket.consume()[0])
+
+	def test_cached_answers_cost_no_tokens(self):
+		from django.contrib.auth.models import User
+		from .models import LLMUsage
+		from .quotas import record_usage
+		user = User.objects.create_user('ravi', password='pw')
+		usage = {'usage_metadata': {'prompt_token_count': 300, 'candidates_token_count': 200}}
+		record_usage(user.id, usage)
+		record_usage(user.id, dict(usage, cached=True))
+		row = LLMUsage.objects.get(user=user)
+		self.assertEqual((row.requests, row.total_tokens), (2, 500))
+
+	@override_settings(CHAT_RATE_USER_PER_MINUTE=1, CHAT_RATE_USER_BURST=1)
+	def test_chatbot_api_answers_429_when_bucket_empty(self):
+		from django.contrib.auth.models import User
+		from .quotas import _per_minute_bucket
+		user = User.objects.create_user('meena', password='pw')
+		self.client.force_login(user)
+		_per_minute_bucket(f"user:{user.id}", 1, 1).consume()
+		resp = self.client.post('/api/chatbot/ask/', {'message': 'When should I sow wheat?'})
+		self.assertEqual(resp.status_code, 429)
+		self.assertEqual(resp.json()['code'], 'rate_limited')
+		self.assertGreaterEqual(int(resp['Retry-After']), 1)
+
+
+class CursorPagingTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		self.user = User.objects.create_user('asha', password='pw')
+		self.client.force_login(self.user)
+
+	def test_messages_page_back_without_gaps_or_repeats(self):
+		from .models import Conversation, ConversationMessage
+		conversation = Conversation.objects.create(user=self.user, title='Sowing')
+		ids = [ConversationMessage.objects.create(conversation=conversation, role='user', text=f'm{i}').id for i in range(7)]
+		seen, before = [], None
+		while True:
+			params = {'c': conversation.id, 'limit': 3}
+			if before:
+				params['before'] = before
+			data = self.client.get('/api/chatbot/messages/', params).json()
+			seen = [m['id'] for m in data['messages']] + seen
+			before = data['next_before']
+			if not before:
+				break
+		self.assertEqual(seen, ids)
+
+	def test_exact_page_size_has_no_next_cursor(self):
+		from .models import Conversation, ConversationMessage
+		conversation = Conversation.objects.create(user=self.user, title='Sowing')
+		for i in range(3):
+			ConversationMessage.objects.create(conversation=conversation, role='user', text=f'm{i}')
+		data = self.client.get('/api/chatbot/messages/', {'c': conversation.id, 'limit': 3}).json()
+		self.assertEqual(len(data['messages']), 3)
+		self.assertIsNone(data['next_before'])
+
+	def test_conversations_with_equal_timestamps_split_across_pages(self):
+		from django.utils import timezone
+		from .models import Conversation
+		stamp = timezone.now()
+		ids = [Conversation.objects.create(user=self.user, title=f'c{i}').id for i in range(5)]
+		Conversation.objects.filter(id__in=ids).update(updated_at=stamp)
+		seen, cursor = [], None
+		while True:
+			data = self.client.get('/api/chatbot/conversations/', {'limit': 2, **({'cursor': cursor} if cursor else {})}).json()
+			seen += [c['id'] for c in data['conversations']]
+			cursor = data['next_cursor']
+			if not cursor:
+				break
+		self.assertEqual(seen, sorted(ids, reverse=True))
+
+	def test_bad_cursor_is_rejected(self):
+		resp = self.client.get('/api/chatbot/conversations/', {'cursor': 'yesterday|x'})
+		self.assertEqual(resp.status_code, 400)
+
+
+class ArchiveTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .models import Conversation
+		self.user = User.objects.create_user('kiran', password='pw')
+		self.conversation = Conversation.objects.create(user=self.user, title='Soil test')
+
+	def _messages(self, conversation, days_ago):
+		from datetime import timedelta
+		from django.utils import timezone
+		from .models import ConversationMessage
+		for i, role in enumerate(('user', 'assistant', 'user')):
+			ConversationMessage.objects.create(conversation=conversation, role=role, text=f'नमस्ते {i} ' * 20)
+		ConversationMessage.objects.filter(conversation=conversation).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+	def _round_trip(self):
+		from .archive import archive_conversation, ensure_hydrated
+		from .models import ConversationArchive, ConversationMessage
+		self._messages(self.conversation, days_ago=40)
+		before = list(ConversationMessage.objects.filter(conversation=self.conversation).order_by('id').values_list('id', 'role', 'text', 'created_at'))
+		self.assertEqual(archive_conversation(self.conversation), 3)
+		self.assertFalse(ConversationMessage.objects.filter(conversation=self.conversation).exists())
+		archive = ConversationArchive.objects.get(conversation=self.conversation)
+		self.assertLess(len(archive.data), archive.raw_bytes)
+		self.assertTrue(ensure_hydrated(self.conversation))
+		after = list(ConversationMessage.objects.filter(conversation=self.conversation).order_by('id').values_list('id', 'role', 'text', 'created_at'))
+		self.assertEqual(after, before)
+		self.assertFalse(ConversationArchive.objects.exists())
+		return archive.codec
+
+	@override_settings(CHAT_ARCHIVE_CODEC='zlib')
+	def test_zlib_round_trip(self):
+		self.assertEqual(self._round_trip(), 'zlib')
+
+	@override_settings(CHAT_ARCHIVE_CODEC='zstd')
+	def test_zstd_round_trip(self):
+		from .archive import _zstd
+		self.assertEqual(self._round_trip(), 'zstd' if _zstd() else 'zlib')
+
+	def test_idle_is_judged_by_latest_message(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from .archive import archive_idle
+		from .models import Conversation, ConversationMessage
+		idle = Conversation.objects.create(user=self.user, title='Old')
+		self._messages(idle, days_ago=40)
+		self._messages(self.conversation, days_ago=40)
+		ConversationMessage.objects.create(conversation=self.conversation, role='user', text='still here')
+		# Neither conversation row was touched recently; only the messages tell them apart
+		Conversation.objects.update(updated_at=timezone.now() - timedelta(days=60))
+		self.assertEqual(archive_idle(30), (1, 3))
+		self.assertTrue(Conversation.objects.get(id=idle.id).archived)
+		self.assertFalse(Conversation.objects.get(id=self.conversation.id).archived)
+
+
+class BulletinInstantAnswerTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .bulletins import current_season
+		from .models import AdvisoryBulletin, FarmerProfile
+		cache.clear()
+		self.user = User.objects.create_user('sunil', password='pw')
+		self.profile = FarmerProfile.objects.create(user=self.user, full_name='Sunil', state='MH', main_crops='Wheat')
+		AdvisoryBulletin.objects.create(state='MH', crop='wheat', language='en', season=current_season(), text='Wheat bulletin')
+
+	def test_generic_asks_get_the_bulletin(self):
+		from .bulletins import instant_answer
+		for message in ("today's advisory", "Wheat advice for this month", "wheat tips"):
+			with self.subTest(message=message):
+				self.assertEqual(instant_answer(self.profile, message, 'en').text, 'Wheat bulletin')
+
+	def test_specific_questions_go_to_the_model(self):
+		from .bulletins import instant_answer
+		for message in (
+			"I'm scared my wheat has rust, what should I do?",  # 'care' inside 'scared'
+			"wheat advice: leaves turning yellow with brown spots",
+			"advice on the pest in this photo of my wheat",
+			"what should I do with my wheat",
+			"गेहूं में कीड़ा लगा है, सलाह दें",
+		):
+			with self.subTest(message=message):
+				self.assertIsNone(instant_answer(self.profile, message, 'en'))
+
+	@override_settings(LLM_BACKEND='fake', LLM_BACKEND_OPTIONS={'latency': 'fixed', 'latency_ms': 0})
+	def test_chatbot_api_sends_symptom_question_to_llm(self):
+		self.client.force_login(self.user)
+		resp = self.client.post('/api/chatbot/ask/', {'message': 'I am scared, wheat leaves are curling', 'language': 'en'})
+		self.assertEqual(resp.status_code, 200)
+		self.assertNotEqual(resp.json().get('source'), 'bulletin')
+		resp = self.client.post('/api/chatbot/ask/', {'message': 'wheat advisory', 'language': 'en'})
+		self.assertEqual(resp.json()['source'], 'bulletin')
+
+
+class ForecastCoalescingTests(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	@override_settings(FORECAST_GRID_DEG=0.1, FORECAST_UPDATE_INTERVAL=3600, FORECAST_UPDATE_DELAY=600)
+	def test_grid_cells_and_model_update_schedule(self):
+		from datetime import datetime, timezone as dt_timezone
+		from . import forecast_cache
+		self.assertEqual(forecast_cache.snap(19.071, 72.876)[0], forecast_cache.snap(19.068, 72.884)[0])
+		self.assertNotEqual(forecast_cache.snap(19.07, 72.88)[0], forecast_cache.snap(19.17, 72.88)[0])
+		now = datetime(2026, 6, 1, 10, 5, tzinfo=dt_timezone.utc)
+		self.assertEqual(forecast_cache.next_model_update(now), datetime(2026, 6, 1, 10, 10, tzinfo=dt_timezone.utc))
+		now = datetime(2026, 6, 1, 10, 15, tzinfo=dt_timezone.utc)
+		self.assertEqual(forecast_cache.next_model_update(now), datetime(2026, 6, 1, 11, 10, tzinfo=dt_timezone.utc))
+
+	@override_settings(FORECAST_STALE_TTL=6 * 3600)
+	def test_fresh_stale_and_expired_cells(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from . import forecast_cache
+		from .models import ForecastCell
+		fetch = mock.Mock(return_value={'hourly': {'temperature_2m': [31]}})
+		key, lat, lon = forecast_cache.snap(19.07, 72.88)
+		forecast_cache.store(key, lat, lon, {'hourly': {'temperature_2m': [30]}})
+		self.assertEqual(forecast_cache.get_forecast(19.07, 72.88, fetch)['hourly']['temperature_2m'], [30])
+		fetch.assert_not_called()
+		# Past its model update: served as is while one background refresh runs
+		ForecastCell.objects.filter(key=key).update(fresh_until=timezone.now() - timedelta(minutes=1))
+		with mock.patch.object(forecast_cache, '_refresh_in_background') as refresh:
+			self.assertEqual(forecast_cache.get_forecast(19.07, 72.88, fetch)['hourly']['temperature_2m'], [30])
+		refresh.assert_called_once()
+		# Past the stale limit: fetched inline
+		ForecastCell.objects.filter(key=key).update(fetched_at=timezone.now() - timedelta(hours=7))
+		self.assertEqual(forecast_cache.get_forecast(19.07, 72.88, fetch)['hourly']['temperature_2m'], [31])
+		fetch.assert_called_once_with(lat, lon)
+
+	async def test_concurrent_async_misses_share_one_fetch(self):
+		import asyncio
+		from . import forecast_cache
+		from .models import ForecastCell
+		calls = []
+
+		async def afetch(lat, lon):
+			calls.append((lat, lon))
+			await asyncio.sleep(0.05)
+			return {'hourly': {'temperature_2m': [30]}}
+
+		results = await asyncio.gather(*(
+			forecast_cache.aget_forecast(19.07, 72.88, afetch, fetch=None) for _ in range(5)
+		))
+		self.assertEqual(len(calls), 1)
+		self.assertTrue(all(r == results[0] for r in results))
+		self.assertEqual(await ForecastCell.objects.acount(), 1)
+		self.assertEqual(forecast_cache._async_inflight, {})
+
+	async def test_failed_fetch_reaches_every_waiter(self):
+		import asyncio
+		from . import forecast_cache
+
+		async def afetch(lat, lon):
+			await asyncio.sleep(0.05)
+			raise ConnectionError('upstream down')
+
+		results = await asyncio.gather(
+			*(forecast_cache.aget_forecast(19.07, 72.88, afetch, fetch=None) for _ in range(3)),
+			return_exceptions=True,
+		)
+		self.assertTrue(all(isinstance(r, ConnectionError) for r in results))
+
+	def test_sync_misses_share_one_fetch(self):
+		import threading
+		from . import forecast_cache
+		calls = []
+
+		def fetch(lat, lon):
+			calls.append((lat, lon))
+			time.sleep(0.2)
+			return {'hourly': {}}
+
+		# Threads get their own DB connections, which cannot see this test's transaction
+		miss = lambda lat, lon: (*forecast_cache.snap(lat, lon), None, False)
+		with mock.patch.object(forecast_cache, 'lookup', side_effect=miss), \
+				mock.patch.object(forecast_cache, 'store', side_effect=lambda key, lat, lon, data: mock.Mock(data=data)):
+			threads = [threading.Thread(target=forecast_cache.get_forecast, args=(19.07, 72.88, fetch)) for _ in range(3)]
+			for t in threads:
+				t.start()
+			for t in threads:
+				t.join()
+		self.assertEqual(len(calls), 1)
+
+
+class GazetteerLookupTests(TestCase):
+	def setUp(self):
+		from .gazetteer import Gazetteer, Place
+		self.gazetteer = Gazetteer([
+			(Place('Akola', 'district', 'MH', 20.70, 77.01), []),
+			(Place('Nashik', 'district', 'MH', 20.00, 73.79), []),
+			(Place('Aurangabad', 'district', 'MH', 19.88, 75.34), []),
+			(Place('Aurangabad', 'district', 'BR', 24.75, 84.37), []),
+			(Place('Bihar', 'state', 'BR', 25.09, 85.31), []),
+		])
+
+	def test_exact_name_prefers_the_given_state(self):
+		self.assertEqual(self.gazetteer.lookup('aurangabad', state='BR').state, 'BR')
+		self.assertEqual(self.gazetteer.lookup('Aurangabad, Bihar').state, 'BR')
+		self.assertEqual(self.gazetteer.lookup('Aurangabad', state='MH').state, 'MH')
+
+	def test_same_name_in_another_state_is_not_answered(self):
+		self.assertIsNone(self.gazetteer.lookup('Aurangabad', state='GJ'))
+		self.assertIsNone(self.gazetteer.lookup('Akola, Bihar'))
+		self.assertEqual(self.gazetteer.lookup('Akola').state, 'MH')
+
+	def test_close_spelling_only_within_state(self):
+		self.assertEqual(self.gazetteer.lookup('Nashikk', state='MH').name, 'Nashik')
+		self.assertIsNone(self.gazetteer.lookup('Nashikk'))
+		self.assertIsNone(self.gazetteer.lookup('Nashikk', state='GJ'))
+
+	def test_different_place_is_not_snapped_to_a_neighbour(self):
+		# Akole (Ahmednagar) shares a phonetic key with Akola, ~250 km away
+		self.assertIsNone(self.gazetteer.lookup('Akole', state='MH'))
+
+	def test_unmatched_place_falls_through_to_remote_geocoder(self):
+		from . import weather_client
+		remote = {'name': 'Akole', 'latitude': 19.54, 'longitude': 74.0, 'country_code': 'IN', 'admin1': 'Maharashtra'}
+		cache.clear()
+		client = weather_client.OpenMeteoClient()
+		with mock.patch.object(weather_client, 'get_gazetteer', return_value=self.gazetteer), \
+				mock.patch.object(weather_client.geocode_cache, 'get_or_fetch', side_effect=lambda key, fetch, refresh=False: fetch()), \
+				mock.patch.object(client, '_geocode_remote', return_value=remote) as fetch:
+			self.assertEqual(client.geocode('Akole', state='MH'), remote)
+			self.assertEqual(client.geocode('Akola', state='MH')['latitude'], 20.70)
+		fetch.assert_called_once()
+
+
+class ActiveCellTests(TestCase):
+	def setUp(self):
+		from datetime import timedelta
+		from django.contrib.auth.models import User
+		from django.utils import timezone
+		from .models import FarmerProfile
+		for name, village, days in (('a', 'Nashik', 1), ('b', 'Nashik', 2), ('c', 'Akola', 90)):
+			user = User.objects.create_user(name, password='pw', last_login=timezone.now() - timedelta(days=days))
+			FarmerProfile.objects.create(user=user, full_name=name, state='MH', district_village=village)
+		self.places = {'Nashik': {'latitude': 20.0, 'longitude': 73.79}, 'Akola': {'latitude': 20.7, 'longitude': 77.01}}
+
+	def test_prefetch_fetches_cells_of_active_users(self):
+		from io import StringIO
+		from django.core.management import call_command
+		from .models import ForecastCell
+		client = mock.Mock()
+		client.geocode.side_effect = lambda query, state=None: self.places.get(query)
+		client.forecast_many.side_effect = lambda points: [{'hourly': {}} for _ in points]
+		with mock.patch('agrimitra.management.commands.prefetch_forecasts.default_client', return_value=client):
+			call_command('prefetch_forecasts', delay=0, stdout=StringIO())
+		self.assertEqual(list(ForecastCell.objects.values_list('key', flat=True)), ['20,73.8'])
+		client.geocode.assert_called_once_with('Nashik', state='MH')
+
+	def _day(self, offset, **values):
+		from datetime import timedelta
+		from django.utils import timezone
+		day = {'date': (timezone.localdate() + timedelta(days=offset)).isoformat(), 'precip': 0.0, 't_max': 32.0, 't_min': 18.0, 'gust_max': 20.0}
+		return {**day, **values}
+
+	def test_alerts_follow_the_latest_forecast(self):
+		from django.contrib.auth.models import User
+		from . import forecast_cache
+		from .models import WeatherAlert
+		from .weather_alerts import active_cell_index, refresh_alerts
+		geocode = lambda query, state=None: self.places.get(query)
+		index, unresolved = active_cell_index(30, geocode)
+		self.assertEqual((len(index), unresolved), (1, 0))
+		(key,) = index
+		lat, lon = map(float, key.split(','))
+		forecast_cache.store(key, lat, lon, {'daily': [self._day(-1, precip=200.0), self._day(1, precip=120.0), self._day(2, t_min=1.0)]})
+		self.assertEqual(refresh_alerts(index), (4, 0))
+		a = User.objects.get(username='a')
+		self.assertEqual(
+			sorted(WeatherAlert.objects.filter(user=a).values_list('kind', 'severity')),
+			sorted([(WeatherAlert.HEAVY_RAIN, 'severe'), (WeatherAlert.FROST, 'warning')]),
+		)
+		forecast_cache.store(key, lat, lon, {'daily': [self._day(1, precip=70.0)]})
+		self.assertEqual(refresh_alerts(index), (2, 2))
+		self.assertEqual(list(WeatherAlert.objects.filter(user=a).values_list('severity', flat=True)), ['warning'])
+
+
+class SchemeEligibilityTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from . import eligibility
+		from .models import Scheme
+		Scheme.objects.all().delete()
+		eligibility.invalidate()
+		self.nationwide = Scheme.objects.create(slug='kisan', title='Kisan', description='-', category='income', priority=3)
+		self.dairy = Scheme.objects.create(slug='dairy-mh', title='Dairy MH', description='-', category='livestock',
+										   states=['MH'], farming_types=['dairy'], priority=2)
+		self.wheat = Scheme.objects.create(slug='wheat-small', title='Wheat', description='-', category='subsidy',
+										   crops=['wheat'], farm_sizes=['marginal', 'small'], priority=1)
+		self.user = User.objects.create_user('geeta', password='pw')
+
+	def _profile(self, **fields):
+		from .models import FarmerProfile
+		return FarmerProfile(user=self.user, full_name='Geeta', **fields)
+
+	def _linear(self, profile):
+		"""The straightforward per-scheme check the index must agree with."""
+		from .eligibility import profile_segments
+		from .models import Scheme
+		found = []
+		for scheme in Scheme.objects.filter(active=True):
+			for state, band, ftype, crop in profile_segments(profile):
+				if all(not accepted or value in accepted for accepted, value in (
+					(scheme.states, state), (scheme.farm_sizes, band), (scheme.farming_types, ftype), (scheme.crops, crop),
+				)):
+					found.append(scheme)
+					break
+		return found
+
+	def test_index_matches_linear_check(self):
+		from decimal import Decimal
+		from .eligibility import recommended_schemes
+		for fields in (
+			{'state': 'MH', 'farming_types': 'dairy,crop', 'main_crops': 'wheat, onion', 'farm_size': Decimal('3')},
+			{'state': 'PB', 'farming_types': 'crop', 'main_crops': 'wheat', 'farm_size': Decimal('40')},
+			{'state': 'MH', 'farming_types': '', 'main_crops': '', 'farm_size': None},
+		):
+			with self.subTest(**fields):
+				profile = self._profile(**fields)
+				self.assertEqual(recommended_schemes(profile), self._linear(profile))
+
+	def test_unknown_values_still_get_unrestricted_schemes(self):
+		from .eligibility import recommended_schemes
+		profile = self._profile(state='Bombay', farming_types='fishery,Sericulture', main_crops='wheat', farm_size=2)
+		self.assertEqual(recommended_schemes(profile), [self.nationwide, self.wheat])
+
+	def test_labels_and_casing_map_to_codes(self):
+		from .eligibility import recommended_schemes
+		profile = self._profile(state='Maharashtra', farming_types='Dairy, Crop Farming', main_crops='')
+		self.assertEqual(recommended_schemes(profile), [self.nationwide, self.dairy])
+
+
+@override_settings(LLM_BACKEND='fake', LLM_BACKEND_OPTIONS={'latency': 'fixed', 'latency_ms': 0}, FORUM_TRANSLATE_MAX_ITEMS=2)
+class ForumTranslateTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .models import Comment, FarmerProfile, Post
+		cache.clear()
+		author = User.objects.create_user('author', password='pw')
+		FarmerProfile.objects.create(user=author, full_name='Author', state='MH', preferred_language='mr')
+		self.post = Post.objects.create(user=author, content='माझ्या कांद्याला भाव नाही')
+		self.comments = [Comment.objects.create(post=self.post, user=author, text=f'उत्तर {i}') for i in range(3)]
+		self.reader = User.objects.create_user('reader', password='pw')
+		FarmerProfile.objects.create(user=self.reader, full_name='Reader', state='MH', preferred_language='en')
+		self.client.force_login(self.reader)
+
+	def _translate(self):
+		return self.client.post('/api/forum/translate/', {
+			'posts': str(self.post.id), 'comments': ','.join(str(c.id) for c in self.comments),
+		})
+
+	def _empty_bucket(self):
+		from .quotas import _per_minute_bucket
+		bucket = _per_minute_bucket(f"user:{self.reader.id}", 10, 5)
+		while bucket.consume()[0]:
+			pass
+
+	def test_new_translations_are_capped_per_request(self):
+		data = self._translate().json()
+		self.assertEqual(len(data['posts']) + len(data['comments']), 2)
+		self.assertEqual(data['remaining'], 2)
+		data = self._translate().json()
+		self.assertEqual(len(data['posts']) + len(data['comments']), 4)
+		self.assertEqual(data['remaining'], 0)
+
+	def test_new_translations_are_rate_limited(self):
+		self._empty_bucket()
+		resp = self._translate()
+		self.assertEqual(resp.status_code, 429)
+		self.assertEqual(resp.json()['code'], 'rate_limited')
+
+	@override_settings(FORUM_TRANSLATE_MAX_ITEMS=10)
+	def test_stored_translations_need_no_token(self):
+		self._translate()
+		self._empty_bucket()
+		resp = self._translate()
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(len(resp.json()['comments']), 3)
+
+
+class LearningSearchTests(TestCase):
+	def setUp(self):
+		from .models import LearningItem, LearningLabel, LearningVariant
+		self.drip = LearningItem.objects.create(slug='drip-zz', priority=1)
+		LearningVariant.objects.create(item=self.drip, language='en', title='Zephyrine drip irrigation',
+									   summary='Save water', body='Laying drip lines on raised beds.')
+		LearningVariant.objects.create(item=self.drip, language='hi', title='ज़ेफ़िरीन टपक सिंचाई', body='पानी की बचत')
+		LearningLabel.objects.create(item=self.drip, kind=LearningLabel.TAG, value='quixotic')
+		self.mulch = LearningItem.objects.create(slug='mulch-zz')
+		LearningVariant.objects.create(item=self.mulch, language='en', title='Mulching basics',
+									   body='Zephyrine straw keeps the soil cool.')
+
+	def test_title_match_ranks_first_and_last_word_is_a_prefix(self):
+		from .learning_catalog import fts_available, search_ids
+		self.assertTrue(fts_available())
+		self.assertEqual(search_ids('zephyr', 'en'), [self.drip.id, self.mulch.id])
+		self.assertEqual(search_ids('zephyrine straw', 'en'), [self.mulch.id])
+
+	def test_labels_and_indic_words_are_searchable(self):
+		from .learning_catalog import search_ids
+		self.assertEqual(search_ids('quixotic', 'en'), [self.drip.id])
+		self.assertEqual(search_ids('सिंचाई', 'hi'), [self.drip.id])
+		self.assertEqual(search_ids('सिंचाई', 'mr'), [])
+
+	def test_index_follows_edits(self):
+		from .learning_catalog import search_ids
+		variant = self.mulch.variants.get(language='en')
+		variant.body = 'Rice straw keeps the soil cool.'
+		variant.save()
+		self.assertEqual(search_ids('zephyrine', 'en'), [self.drip.id])
+
+	def test_like_fallback_without_fts(self):
+		from . import learning_catalog
+		with mock.patch.object(learning_catalog, 'fts_available', return_value=False):
+			self.assertEqual(sorted(learning_catalog.search_ids('zephyrine', 'en')), sorted([self.drip.id, self.mulch.id]))
+
+
+class ImageCacheTests(TestCase):
+	source = 'https://example.com/field.jpg'
+
+	def setUp(self):
+		import shutil
+		import tempfile
+		from . import image_cache
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		patcher = override_settings(MEDIA_ROOT=media, IMAGE_CACHE_SIZES=(16, 32))
+		patcher.enable()
+		self.addCleanup(patcher.disable)
+		image_cache._lru.clear()
+		self.addCleanup(image_cache._lru.clear)
+
+	def test_files_deleted_by_another_worker_are_not_served(self):
+		from django.core.files.storage import default_storage
+		from . import image_cache
+		image = image_cache.ingest(self.source, _photo().read())
+		url = image_cache.local_url(self.source, 16)
+		self.assertNotEqual(url, self.source)
+		# Another process evicts: row and files go, this process's LRU still has the entry
+		image.delete()
+		for name in image.variants.values():
+			default_storage.delete(name)
+		with mock.patch.object(image_cache, '_fetch_in_background') as refetch:
+			self.assertEqual(image_cache.local_url(self.source, 16), self.source)
+		refetch.assert_called_once_with(self.source)
+
+	def test_eviction_frees_shared_files_once(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from . import image_cache
+		from .models import CachedImage
+		data, other = _photo().read(), _photo(spot=(10, 10)).read()
+		image_cache.ingest(self.source, data)
+		image_cache.ingest('https://example.com/copy.jpg', data)
+		image_cache.ingest('https://example.com/other.jpg', other)
+		size = CachedImage.objects.get(source='https://example.com/other.jpg').size
+		CachedImage.objects.filter(source='https://example.com/other.jpg').update(last_used=timezone.now() - timedelta(days=2))
+		CachedImage.objects.filter(source=self.source).update(last_used=timezone.now() - timedelta(days=3))
+		# The shared blob's newest use is today: the other image is the least recently used
+		self.assertEqual(image_cache.evict(budget=image_cache.disk_usage() - 1), (1, size))
+		self.assertEqual(CachedImage.objects.count(), 2)
+
+	def test_page_views_do_not_download_when_fetch_is_off(self):
+		from . import image_cache
+		with override_settings(IMAGE_CACHE_FETCH=False), mock.patch.object(image_cache.threading, 'Thread') as thread:
+			self.assertEqual(image_cache.local_url(self.source, 16), self.source)
+		thread.assert_not_called()
+
+	def test_database_errors_in_fetch_are_logged_not_raised(self):
+		from django.db import OperationalError
+		from . import image_cache
+		with mock.patch.object(image_cache, 'download', side_effect=ConnectionError('offline')), \
+				mock.patch.object(image_cache.CachedImage.objects, 'update_or_create', side_effect=OperationalError('database is locked')), \
+				self.assertLogs('agrimitra.image_cache', 'WARNING') as logs:
+			self.assertIsNone(image_cache.fetch(self.source))
+		self.assertIn('database is locked', '\n'.join(logs.output))
+
+	def test_background_worker_closes_its_connection(self):
+		from . import image_cache
+		with mock.patch.object(image_cache, 'fetch'), \
+				mock.patch.object(image_cache.connections, 'close_all') as close_all:
+			image_cache._fetch_worker(self.source, 'imgcache:test-lock')
+		close_all.assert_called_once()
+
+
+@override_settings(IMAGE_CACHE_FETCH=False)
+class ConditionalPageTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .models import FarmerProfile
+		self.user = User.objects.create_user('lata', password='pw')
+		FarmerProfile.objects.create(user=self.user, full_name='Lata', state='MH')
+		self.client.force_login(self.user)
+
+	def _revalidate(self, url='/forum/'):
+		etag = self.client.get(url)['ETag']
+		return etag, lambda: self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+	def test_unchanged_page_answers_304(self):
+		etag, again = self._revalidate()
+		resp = again()
+		self.assertEqual(resp.status_code, 304)
+		self.assertEqual(resp['ETag'], etag)
+
+	def test_rendered_model_change_invalidates(self):
+		from .models import Post
+		_etag, again = self._revalidate()
+		Post.objects.create(user=self.user, content='New post')
+		self.assertEqual(again().status_code, 200)
+
+	def test_newly_cached_image_invalidates(self):
+		from .models import CachedImage
+		_etag, again = self._revalidate()
+		CachedImage.objects.create(source='https://example.com/a.jpg', source_hash='a' * 64, variants={'160': 'imgcache/a-160.webp'})
+		self.assertEqual(again().status_code, 200)
+
+	def test_logins_and_other_pages_writes_keep_the_etag(self):
+		from django.contrib.auth.models import User
+		from django.contrib.auth.signals import user_logged_in
+		from .models import Scheme
+		other = User.objects.create_user('mohan', password='pw')
+		_etag, again = self._revalidate()
+		user_logged_in.send(sender=User, request=None, user=other)
+		Scheme.objects.create(slug='s', title='S', description='-', category='income')
+		self.assertEqual(again().status_code, 304)
+		_etag, again = self._revalidate('/schemes/')
+		self.assertEqual(again().status_code, 304)
+		Scheme.objects.create(slug='t', title='T', description='-', category='income')
+		self.assertEqual(again().status_code, 200)
+
+
+@override_settings(LLM_BACKEND='fake', LLM_BACKEND_OPTIONS={'latency': 'fixed', 'latency_ms': 0},
+				   CHAT_SUMMARY_ASYNC=False, CHAT_SUMMARY_EVERY=4, CHAT_SUMMARY_KEEP_RECENT=2)
+class ConversationMemoryTests(TestCase):
+	def setUp(self):
+		from django.contrib.auth.models import User
+		from .models import Conversation, ConversationMessage
+		cache.clear()
+		user = User.objects.create_user('vijay', password='pw')
+		self.conversation = Conversation.objects.create(user=user, title='Irrigation')
+		self.messages = [
+			ConversationMessage.objects.create(conversation=self.conversation, role=('user', 'assistant')[i % 2], text=f'turn {i} ' + 'x' * 36)
+			for i in range(6)
+		]
+
+	def test_history_keeps_newest_turns_within_budget(self):
+		from .conversation_memory import build_history
+		# Each turn costs 12 tokens
+		summary, turns = build_history(self.conversation, budget=30)
+		self.assertEqual(summary, '')
+		self.assertEqual([t['text'][:6] for t in turns], ['turn 4', 'turn 5'])
+		_summary, turns = build_history(self.conversation, budget=30, before_id=self.messages[5].id)
+		self.assertEqual([t['text'][:6] for t in turns], ['turn 3', 'turn 4'])
+
+	def test_summary_folds_older_turns(self):
+		from .conversation_memory import build_history, maybe_refresh_summary
+		self.assertTrue(maybe_refresh_summary(self.conversation))
+		self.conversation.refresh_from_db()
+		self.assertTrue(self.conversation.summary)
+		self.assertEqual(self.conversation.summary_message_id, self.messages[3].id)
+		summary, turns = build_history(self.conversation, budget=1000)
+		self.assertEqual(summary, self.conversation.summary)
+		self.assertEqual([t['text'][:6] for t in turns], ['turn 4', 'turn 5'])
+		# Nothing new to fold yet
+		self.assertFalse(maybe_refresh_summary(self.conversation))
+
+
+class ModelRouterTests(TestCase):
+	def _router(self, **options):
+		from .model_router import ModelRouter
+		return ModelRouter(publish_interval=3600, **options)
+
+	def test_faster_healthy_models_first_untried_after(self):
+		router = self._router()
+		router.record_success('slow', 2.0)
+		router.record_success('fast', 0.3)
+		self.assertEqual(router.order(['new', 'slow', 'fast']), ['fast', 'slow', 'new'])
+
+	def test_breaker_opens_then_half_opens_after_cooldown(self):
+		from .model_router import CLOSED, OPEN
+		router = self._router(failure_threshold=2, cooldown=0.05)
+		router.record_failure('a', 1.0)
+		router.record_failure('a', 1.0)
+		self.assertEqual(router.snapshot()['a']['state'], OPEN)
+		self.assertEqual(router.order(['a', 'b']), ['b'])
+		time.sleep(0.06)
+		self.assertIn('a', router.order(['a', 'b']))
+		# A failure while half-open reopens at once
+		router.record_failure('a', 1.0)
+		self.assertEqual(router.order(['a', 'b']), ['b'])
+		time.sleep(0.06)
+		router.order(['a'])
+		router.record_success('a', 0.5)
+		self.assertEqual(router.snapshot()['a']['state'], CLOSED)
+
+	def test_half_open_lets_a_single_probe_through(self):
+		router = self._router(failure_threshold=1, cooldown=0.05)
+		router.record_failure('a', 1.0)
+		time.sleep(0.06)
+		self.assertEqual(router.order(['a', 'b']), ['a', 'b'])
+		# The trial request has not reported back: nobody else gets the model
+		self.assertEqual(router.order(['a', 'b']), ['b'])
+		router.record_success('a', 0.5)
+		self.assertEqual(router.order(['a', 'b']), ['a', 'b'])
+
+	def test_image_rejections_do_not_open_the_breaker(self):
+		from .model_router import CLOSED, IMAGE
+		router = self._router(failure_threshold=2, min_samples=2)
+		for _ in range(5):
+			router.record_failure('a', 0.2, kind=IMAGE)
+		self.assertEqual(router.snapshot()['a']['state'], CLOSED)
+		self.assertEqual(router.snapshot()['a']['error_rate'], 0.0)
+		self.assertEqual(router.order(['a', 'b']), ['a', 'b'])
+
+	def test_unavailable_model_is_benched_and_all_benched_still_returns_models(self):
+		from .model_router import UNAVAILABLE
+		router = self._router(unavailable_cooldown=3600, cooldown=10, failure_threshold=1)
+		router.record_failure('gone', 0.1, kind=UNAVAILABLE)
+		router.record_failure('flaky', 0.1)
+		self.assertEqual(router.order(['gone', 'flaky']), ['flaky', 'gone'])
+
+	def test_hedge_delay_needs_enough_samples(self):
+		router = self._router(min_samples=3)
+		for latency in (0.1, 0.2):
+			router.record_success('m', latency)
+		self.assertIsNone(router.hedge_delay('m'))
+		router.record_success('m', 0.9)
+		self.assertEqual(router.hedge_delay('m'), 0.9)
+
+	def test_classify_error(self):
+		from .model_router import FATAL, IMAGE, TRANSIENT, UNAVAILABLE, classify_error
+		self.assertEqual(classify_error(RuntimeError('503 Service Unavailable')), TRANSIENT)
+		self.assertEqual(classify_error(TimeoutError()), TRANSIENT)
+		self.assertEqual(classify_error(RuntimeError('404 model not found')), UNAVAILABLE)
+		self.assertEqual(classify_error(RuntimeError('Unsupported inline_data for this model')), IMAGE)
+		self.assertEqual(classify_error(RuntimeError('API key not valid')), FATAL)
+
+
+class FakeBackendTests(TestCase):
+	def _backend(self, **options):
+		from .llm_backends import FakeBackend
+		return FakeBackend(latency='fixed', latency_ms=0, stream_chunk_ms=0, **options)
+
+	def test_backend_without_ask_fails_when_created(self):
+		from .llm_backends import LLMBackend
+
+		class Incomplete(LLMBackend):
+			name = 'incomplete'
+
+		with self.assertRaises(TypeError):
+			Incomplete()
+
+	def test_reply_is_deterministic_per_prompt_and_seed(self):
+		a, b = self._backend(), self._backend()
+		self.assertEqual(a.ask('When to sow?')[0], b.ask('When to sow?')[0])
+		self.assertNotEqual(a.ask('When to sow?')[0], a.ask('When to sow?', history=[{'role': 'user', 'text': 'hi'}])[0])
+		self.assertNotEqual(a.ask('When to sow?')[0], self._backend(seed=1).ask('When to sow?')[0])
+
+	def test_stream_yields_the_ask_reply(self):
+		backend = self._backend()
+		self.assertEqual(''.join(backend.stream('When to sow?')), backend.ask('When to sow?')[0])
+
+	def test_usage_metadata_is_reported(self):
+		_text, raw = self._backend().ask('x' * 400)
+		self.assertGreater(raw['usage_metadata']['prompt_token_count'], 100)
+
+	def test_injected_failures(self):
+		from .gemini_client import GeminiTimeoutError
+		with self.assertRaises(RuntimeError):
+			self._backend(error_rate=1.0).ask('hi')
+		with self.assertRaises(GeminiTimeoutError):
+			self._backend(timeout_rate=1.0).ask('hi')
+
+	@override_settings(LLM_BACKEND='fake', LLM_BACKEND_OPTIONS={'latency': 'fixed', 'latency_ms': 0})
+	def test_get_backend_follows_settings(self):
+		from .llm_backends import FakeBackend, get_backend
+		self.assertIsInstance(get_backend(), FakeBackend)
+		self.assertIs(get_backend(), get_backend())
+
+
+class GeocodeCacheTests(TestCase):
+	def setUp(self):
+		from . import geocode_cache
+		geocode_cache._lru.clear()
+		self.addCleanup(geocode_cache._lru.clear)
+
+	def test_normalized_queries_share_a_key(self):
+		from .geocode_cache import normalize_query
+		self.assertEqual(normalize_query('  Nashik,  MH ', 'in'), normalize_query('nashik mh', 'IN'))
+		self.assertNotEqual(normalize_query('Nashik', 'IN'), normalize_query('Nashik'))
+
+	def test_answers_and_not_found_are_cached_through_lru_and_table(self):
+		from . import geocode_cache
+		place = {'name': 'Wardha', 'latitude': 20.74, 'longitude': 78.6}
+		fetch = mock.Mock(side_effect=[place, None])
+		self.assertEqual(geocode_cache.get_or_fetch('IN:wardha', fetch), place)
+		self.assertIsNone(geocode_cache.get_or_fetch('IN:nowhere', fetch))
+		geocode_cache._lru.clear()  # another worker: only the table is shared
+		self.assertEqual(geocode_cache.get_or_fetch('IN:wardha', fetch), place)
+		self.assertIsNone(geocode_cache.get_or_fetch('IN:nowhere', fetch))
+		self.assertEqual(fetch.call_count, 2)
+
+	@override_settings(GEOCODE_NEGATIVE_TTL=60)
+	def test_not_found_expires_sooner(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from . import geocode_cache
+		from .models import GeocodeEntry
+		geocode_cache.store('IN:nowhere', None)
+		geocode_cache.store('IN:wardha', {'name': 'Wardha'})
+		GeocodeEntry.objects.update(fetched_at=timezone.now() - timedelta(hours=1))
+		geocode_cache._lru.clear()
+		self.assertIs(geocode_cache.lookup('IN:nowhere'), geocode_cache.MISS)
+		self.assertEqual(geocode_cache.lookup('IN:wardha'), {'name': 'Wardha'})
+
+	def test_fetch_errors_are_not_cached(self):
+		from . import geocode_cache
+		with self.assertRaises(ConnectionError):
+			geocode_cache.get_or_fetch('IN:wardha', mock.Mock(side_effect=ConnectionError))
+		self.assertIs(geocode_cache.lookup('IN:wardha'), geocode_cache.MISS)
+
+
+@override_settings(WEATHER_RETRY_BACKOFF=0, WEATHER_RETRIES=2)
+class WeatherClientRetryTests(TestCase):
+	def _response(self, status, body=None):
+		import requests
+		r = requests.Response()
+		r.status_code = status
+		r._content = b'{"results": []}' if body is None else body
+		return r
+
+	def _client(self, *outcomes):
+		from .weather_client import OpenMeteoClient
+		session = mock.Mock()
+		session.get.side_effect = list(outcomes)
+		return OpenMeteoClient(session=session), session
+
+	def _calls(self):
+		from . import weather_client
+		calls = []
+		weather_client.CALL_HOOKS.append(lambda *call: calls.append(call))
+		self.addCleanup(weather_client.CALL_HOOKS.pop)
+		return calls
+
+	def test_server_errors_are_retried(self):
+		calls = self._calls()
+		client, session = self._client(self._response(503), self._response(502), self._response(200))
+		self.assertEqual(client._get('geocode', 'https://example.com', {}), {'results': []})
+		self.assertEqual(session.get.call_count, 3)
+		self.assertEqual([(c[0], c[2], c[3]) for c in calls], [('geocode', 200, 3)])
+
+	def test_client_errors_are_not_retried(self):
+		import requests
+		client, session = self._client(self._response(400))
+		with self.assertRaises(requests.HTTPError):
+			client._get('geocode', 'https://example.com', {})
+		self.assertEqual(session.get.call_count, 1)
+
+	def test_connection_errors_give_up_after_retries(self):
+		import requests
+		calls = self._calls()
+		client, session = self._client(*[requests.ConnectionError('reset')] * 3)
+		with self.assertRaises(requests.ConnectionError):
+			client._get('forecast', 'https://example.com', {})
+		self.assertEqual(session.get.call_count, 3)
+		self.assertEqual(calls[0][2:], (None, 3))
+
+	def test_shared_session_is_reused(self):
+		from .weather_client import OpenMeteoClient, shared_session
+		self.assertIs(OpenMeteoClient().session, shared_session())
+		self.assertIs(OpenMeteoClient().session, OpenMeteoClient().session)
+
+
+@override_settings(AGRO_GDD_BASE=10.0, AGRO_GDD_CAP=30.0, AGRO_SPRAY_RAINFAST_HOURS=2, AGRO_SPRAY_MIN_HOURS=2, AGRO_SPRAY_MAX_WINDOWS=6)
+class AgroIndicesTests(TestCase):
+	def _payload(self):
+		hours = [f"2026-06-{d:02d}T{h:02d}:00" for d in (1, 2) for h in range(24)]
+		n = len(hours)
+		return {
+			'elevation': 500,
+			'hourly': {
+				'time': hours,
+				'temperature_2m': [20.0] * n,
+				'relative_humidity_2m': [60] * n,
+				'dew_point_2m': [10.0] * n,
+				'precipitation': [1.0 if t == '2026-06-01T13:00' else 0.0 for t in hours],
+				'precipitation_probability': [0] * n,
+				'wind_speed_10m': [5.0] * n,
+				'shortwave_radiation': [400.0 if 6 <= i % 24 < 18 else 0.0 for i in range(n)],
+				'terrestrial_radiation': [800.0 if 6 <= i % 24 < 18 else 0.0 for i in range(n)],
+				'is_day': [1 if 6 <= i % 24 < 18 else 0 for i in range(n)],
+			},
+		}
+
+	def test_daily_indices(self):
+		from .agro_indices import compute
+		result = compute(self._payload())
+		self.assertEqual([d['date'] for d in result['days']], ['2026-06-01', '2026-06-02'])
+		self.assertEqual([d['gdd'] for d in result['days']], [10.0, 10.0])
+		self.assertEqual(result['gdd_total'], 20.0)
+		self.assertEqual([d['leaf_wet_hours'] for d in result['days']], [1, 0])
+		self.assertTrue(all(d['et0'] > 0 for d in result['days']))
+
+	def test_spray_windows_stop_before_rain(self):
+		from .agro_indices import compute
+		windows = [(w['start'], w['hours']) for w in compute(self._payload())['spray_windows']]
+		self.assertEqual(windows, [('2026-06-01T06:00', 5), ('2026-06-01T14:00', 4), ('2026-06-02T06:00', 12)])
+
+	def test_past_hours_and_gaps(self):
+		from .agro_indices import compute
+		payload = self._payload()
+		payload['current'] = {'time': '2026-06-02T10:00'}
+		payload['hourly']['temperature_2m'][:24] = [None] * 24
+		result = compute(payload)
+		self.assertIsNone(result['days'][0]['gdd'])
+		self.assertEqual([w['start'] for w in result['spray_windows']], ['2026-06-02T10:00'])
+
+	def test_without_numpy(self):
+		from . import agro_indices
+		with mock.patch.object(agro_indices, 'load_numpy', return_value=None):
+			self.assertIsNone(agro_indices.compute(self._payload()))
+
+
+class StaticAssetTests(TestCase):
+	def setUp(self):
+		import shutil
+		import tempfile
+		from pathlib import Path
+		self.root = Path(tempfile.mkdtemp())
+		self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+		patcher = override_settings(STATIC_ROOT=str(self.root))
+		patcher.enable()
+		self.addCleanup(patcher.disable)
+		(self.root / 'js').mkdir()
+		self.script = self.root / 'js' / 'app.js'
+		self.script.write_text('console.log("namaste");\n' * 200)
+
+	def _get(self, path, **headers):
+		from django.test import RequestFactory
+		from .assets import serve
+		return serve(RequestFactory().get('/static/' + path, **headers), path)
+
+	def test_uncollected_files_keep_their_plain_names(self):
+		from .assets import PrecompressedManifestStaticFilesStorage
+		storage = PrecompressedManifestStaticFilesStorage(location=str(self.root / 'empty'), base_url='/static/')
+		self.assertEqual(storage.url('css/styles.css'), '/static/css/styles.css')
+		hashed = PrecompressedManifestStaticFilesStorage(location=str(self.root), base_url='/static/').url('js/app.js')
+		self.assertRegex(hashed, r'^/static/js/app\.[0-9a-f]{12}\.js$')
+
+	def test_inline_assets_ignore_src_scripts_and_json_blocks(self):
+		from .assets import inline_assets
+		html = (
+			'<style> a{} </style><script src="/x.js"></script>'
+			'<script type="application/json">{"a": 1}</script><script>go();</script>'
+		)
+		self.assertEqual(inline_assets(html), {'style': 3, 'script': 5})
+
+	def test_precompressed_twin_is_served_to_clients_that_accept_it(self):
+		from .assets import precompress
+		raw, gz, _br = precompress(str(self.script))
+		self.assertLess(gz, raw)
+		resp = self._get('js/app.js', HTTP_ACCEPT_ENCODING='gzip, deflate')
+		self.assertEqual(resp['Content-Encoding'], 'gzip')
+		self.assertIn('Accept-Encoding', resp['Vary'])
+		self.assertIn('javascript', resp['Content-Type'])
+		plain = self._get('js/app.js')
+		self.assertFalse(plain.has_header('Content-Encoding'))
+		self.assertEqual(b''.join(plain.streaming_content), self.script.read_bytes())
+
+	def test_unhashed_files_revalidate_with_if_modified_since(self):
+		resp = self._get('js/app.js')
+		self.assertIn('no-cache', resp['Cache-Control'])
+		self.assertEqual(self._get('js/app.js', HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']).status_code, 304)
+
+	def test_twins_and_paths_outside_static_root_are_not_served(self):
+		from django.http import Http404
+		from .assets import precompress
+		precompress(str(self.script))
+		for path in ('js/app.js.gz', '../etc/passwd', 'js/missing.js'):
+			with self.subTest(path=path), self.assertRaises(Http404):
+				self._get(path)
+
+	def test_templates_fit_the_inline_budget(self):
+		from io import StringIO
+		from django.core.management import call_command
+		call_command('build_static', check=True, stdout=StringIO())
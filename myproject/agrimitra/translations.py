@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from .llm_backends import get_backend
+from .models import ContentTranslation, FarmerProfile
+from .quotas import record_usage
+
+logger = logging.getLogger(__name__)
+
+# (kind, object_id) of a Post or Comment
+ItemKey = Tuple[str, int]
+
+TRANSLATE_PROMPT = (
+	"Translate each numbered forum message below into {language}. Keep the meaning, tone, crop names and numbers; "
+	"if a message is already in {language}, return it unchanged. Reply with the same [[n]] markers, each followed "
+	"by its translation only, and nothing else.\n\n{items}"
+)
+SINGLE_PROMPT = (
+	"Translate this forum message into {language}. Keep the meaning, tone, crop names and numbers; if it is already "
+	"in {language}, return it unchanged. Reply with the translation only.\n\n{text}"
+)
+_marker_re = re.compile(r'\[\[(\d+)\]\]')
+
+
+def source_hash(text: str) -> str:
+	return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def cached_translations(items: Dict[ItemKey, str], language: str) -> Dict[ItemKey, str]:
+	"""Stored translations of the given {(kind, id): source text} that still match the current text."""
+	if not items:
+		return {}
+	wanted = {(kind, oid, source_hash(text)) for (kind, oid), text in items.items()}
+	rows = ContentTranslation.objects.filter(
+		language=language,
+		object_id__in={oid for _kind, oid in items},
+		source_hash__in={h for _k, _o, h in wanted},
+	).values_list('kind', 'object_id', 'source_hash', 'text')
+	return {(kind, oid): text for kind, oid, h, text in rows if (kind, oid, h) in wanted}
+
+
+def translate_items(items: Dict[ItemKey, str], language: str, user_id: Optional[int] = None) -> Dict[ItemKey, str]:
+	"""
+	Translations of {(kind, id): source text} into `language`, translating only what is not stored yet.
+
+	Missing items are sent upstream in batches (settings.FORUM_TRANSLATE_BATCH
+	items / FORUM_TRANSLATE_BATCH_CHARS characters per call) and each batch is
+	stored as soon as it returns, so a failure part-way keeps earlier work.
+	Usage is recorded against `user_id`, the reader who asked.
+	"""
+	items = {k: v for k, v in items.items() if (v or '').strip()}
+	done = cached_translations(items, language)
+	missing = [(k, items[k]) for k in items if k not in done]
+	lang_name = dict(FarmerProfile.LANGUAGE_CHOICES).get(language, language)
+	for batch in _batches(missing):
+		translated = _translate_batch([text for _k, text in batch], lang_name, user_id)
+		ContentTranslation.objects.bulk_create(
+			[
+				ContentTranslation(kind=kind, object_id=oid, language=language, source_hash=source_hash(text), text=out)
+				for ((kind, oid), text), out in zip(batch, translated)
+			],
+			ignore_conflicts=True,
+		)
+		done.update((k, out) for (k, _text), out in zip(batch, translated))
+	return done
+
+
+def _batches(missing: List[Tuple[ItemKey, str]]) -> Iterable[List[Tuple[ItemKey, str]]]:
+	max_items = getattr(settings, 'FORUM_TRANSLATE_BATCH', 8)
+	max_chars = getattr(settings, 'FORUM_TRANSLATE_BATCH_CHARS', 4000)
+	batch, chars = [], 0
+	for item in missing:
+		if batch and (len(batch) >= max_items or chars + len(item[1]) > max_chars):
+			yield batch
+			batch, chars = [], 0
+		batch.append(item)
+		chars += len(item[1])
+	if batch:
+		yield batch
+
+
+def _translate_batch(texts: List[str], lang_name: str, user_id: Optional[int]) -> List[str]:
+	"""One upstream call for several texts; falls back to one call per text if the reply loses the markers."""
+	if len(texts) == 1:
+		return [_ask(SINGLE_PROMPT.format(language=lang_name, text=texts[0]), user_id)]
+	numbered = "\n\n".join(f"[[{i}]] {text}" for i, text in enumerate(texts, 1))
+	reply = _ask(TRANSLATE_PROMPT.format(language=lang_name, items=numbered), user_id)
+	parts = _marker_re.split(reply)
+	# parts = [preamble, n1, text1, n2, text2, ...]
+	found = {int(n): t.strip() for n, t in zip(parts[1::2], parts[2::2])}
+	if all(found.get(i) for i in range(1, len(texts) + 1)):
+		return [found[i] for i in range(1, len(texts) + 1)]
+	logger.warning("Batch translation reply had %s of %s markers; translating one by one", len(found), len(texts))
+	return [_ask(SINGLE_PROMPT.format(language=lang_name, text=text), user_id) for text in texts]
+
+
+def _ask(prompt: str, user_id: Optional[int]) -> str:
+	text, raw = get_backend().ask(prompt)
+	if user_id:
+		record_usage(user_id, raw)
+	return (text or '').strip()
+
+
+def forget(kind: str, object_id: int, keep_text: Optional[str] = None) -> int:
+	"""Drop stored translations of an object, except those of `keep_text` (its current text) if given."""
+	qs = ContentTranslation.objects.filter(kind=kind, object_id=object_id)
+	if keep_text is not None:
+		qs = qs.exclude(source_hash=source_hash(keep_text))
+	return qs.delete()[0]
@@ -0,0 +1,139 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import ChangeCounter
+
+
+def bump(*pages: str):
+	"""Advance the change counters of `pages` (for writes that send no signals, e.g. bulk_create)."""
+	for page in pages:
+		if not ChangeCounter.objects.filter(name=page).update(value=F('value') + 1, updated_at=timezone.now()):
+			ChangeCounter.objects.get_or_create(name=page)
+			ChangeCounter.objects.filter(name=page).update(value=F('value') + 1, updated_at=timezone.now())
+
+
+def track(page: str, *models, ignore: Iterable[str] = ()):
+	"""
+	Bump the counter of `page` on every save and delete of `models`: the
+	models whose rows the page renders. Saves that only update fields in
+	`ignore` (e.g. User.last_login on each login) do not count.
+	"""
+	ignore = frozenset(ignore)
+
+	def saved(sender, update_fields=None, **kwargs):
+		if not (ignore and update_fields and set(update_fields) <= ignore):
+			bump(page)
+
+	def deleted(sender, **kwargs):
+		bump(page)
+
+	for model in models:
+		uid = f"versioning:{page}:{model._meta.label_lower}"
+		post_save.connect(saved, sender=model, weak=False, dispatch_uid=uid)
+		post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+def versions(pages: List[str]) -> Dict[str, Tuple[int, Optional[object]]]:
+	"""{page: (counter, last update)} in one query; pages never bumped read as (0, None)."""
+	rows = dict.fromkeys(pages, (0, None))
+	for name, value, updated_at in ChangeCounter.objects.filter(name__in=pages).values_list('name', 'value', 'updated_at'):
+		rows[name] = (value, updated_at)
+	return rows
+
+
+def _page_state(request, labels: List[str], vary: Optional[Callable]) -> Optional[Tuple[str, Optional[object]]]:
+	"""(ETag, Last-Modified) for this request, or None when the page must not be revalidated."""
+	if request.method not in ('GET', 'HEAD'):
+		return None
+	# Flash messages are shown once; a 304 would hide them
+	if len(messages.get_messages(request)):
+		return None
+	counters = versions(labels)
+	key = [
+		*(f"{name}={value}" for name, (value, _) in sorted(counters.items())),
+		request.user.pk,
+		# Pages embed the CSRF token, which changes at login; the middleware keeps the
+		# secret here, including one first issued while rendering this response
+		request.META.get('CSRF_COOKIE', ''),
+		request.session.session_key or '',
+		request.get_full_path(),
+		vary(request) if vary else '',
+	]
+	etag = quote_etag(hashlib.sha1('|'.join(map(str, key)).encode()).hexdigest())
+	times = [t for _, t in counters.values() if t]
+	return etag, (max(times) if times else None)
+
+
+def _not_modified(request, state, cache_control):
+	# Only the ETag decides: Last-Modified does not cover the user or the query string
+	etag, _last_modified = state
+	response = get_conditional_response(request, etag=etag)
+	if response is not None:
+		response.headers['ETag'] = etag
+		patch_cache_control(response, **cache_control)
+	return response
+
+
+def _finish(request, response, labels, vary, cache_control):
+	# Views mark pages that must not be reused (e.g. an upstream error) with no-store
+	if response.status_code != 200 or 'no-store' in response.get('Cache-Control', ''):
+		return response
+	# Recomputed: the view itself may have written (e.g. cached a forecast)
+	state = _page_state(request, labels, vary)
+	if state is None:
+		return response
+	etag, last_modified = state
+	response.headers['ETag'] = etag
+	if last_modified:
+		response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+	patch_cache_control(response, **cache_control)
+	return response
+
+
+def conditional_page(page: str, vary: Optional[Callable] = None, max_age: int = 0):
+	"""
+	ETag, Last-Modified and Cache-Control for a read-mostly page, answering
+	If-None-Match with a 304 before the view runs.
+
+	The ETag covers the change counter of `page` (see track(); the models
+	are registered in signals.py), the user, the query string and
+	`vary(request)` for any other input. Responses are private; with
+	max_age=0 browsers revalidate every time, otherwise they reuse the page
+	for max_age seconds first. Works on sync and async views.
+	"""
+	labels = [page]
+	cache_control = {'private': True, 'max_age': max_age} if max_age else {'private': True, 'no_cache': True}
+
+	def decorator(view):
+		if iscoroutinefunction(view):
+			@wraps(view)
+			async def _wrapped(request, *args, **kwargs):
+				state = await sync_to_async(_page_state)(request, labels, vary)
+				if state is not None:
+					response = _not_modified(request, state, cache_control)
+					if response is not None:
+						return response
+				response = await view(request, *args, **kwargs)
+				return await sync_to_async(_finish)(request, response, labels, vary, cache_control)
+		else:
+			@wraps(view)
+			def _wrapped(request, *args, **kwargs):
+				state = _page_state(request, labels, vary)
+				if state is not None:
+					response = _not_modified(request, state, cache_control)
+					if response is not None:
+						return response
+				response = view(request, *args, **kwargs)
+				return _finish(request, response, labels, vary, cache_control)
+		return _wrapped
+	return decorator
@@ -1,3 +1,8 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.models import User
@@ -6,11 +11,23 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
 from datetime import datetime
-from .models import FarmerProfile, Post, Comment, PostVote, CommentLike, Conversation, ConversationMessage
+from .models import FarmerProfile, Post, Comment, PostVote, CommentLike, Conversation, ConversationMessage, ChatJob, ContentTranslation, LearningItem, Scheme
 from django.db.models import Sum, Count, Q, Prefetch
-from .gemini_client import ask_gemini
-from .weather_client import get_weather_for_query
+from .gemini_client import GeminiTimeoutError
+from . import chat_jobs
+from .quotas import check_chat_quota
+from .archive import ensure_hydrated
+from .bulletins import bulletins_for_profile, crops_in, instant_answer
+from .eligibility import get_index, recommended_schemes
+from .learning_catalog import browse
+from .translations import cached_translations, translate_items
+from .weather_client import AsyncOpenMeteoClient, aget_weather_for_query
+from .gazetteer import get_gazetteer
+from .weather_alerts import upcoming_alerts
+from .versioning import conditional_page
 
 
 def home(request):
@@ -114,11 +131,13 @@ def dashboard(request):
 	today_str = datetime.now().strftime('%A, %d %B %Y')
 	weather_str = sample_weather(profile.state if profile else '')
 
+	schemes = recommended_schemes(profile, limit=3)
+
 	stats = {
 		'posts': 12,
-		'scheme': 'PM-Kisan installment announced',
+		'scheme': schemes[0].title if schemes else 'PM-Kisan installment announced',
 		'weather': weather_str,
-		'alerts': 2,
+		'alerts': upcoming_alerts(request.user).count(),
 	}
 
 	community_feed = [
@@ -133,11 +152,6 @@ def dashboard(request):
 		{'title': 'Market linkage 101', 'type': 'Guide'},
 	]
 
-	schemes = [
-		{'title': 'Fasal Bima Yojana', 'state': 'All India'},
-		{'title': 'State drip irrigation subsidy', 'state': (profile.state if profile else 'Your State')},
-	]
-
 	ctx = {
 		'profile': profile,
 		'greeting_name': greeting_name,
@@ -147,6 +161,8 @@ def dashboard(request):
 		'community_feed': community_feed,
 		'learning_items': learning_items,
 		'schemes': schemes,
+		'bulletins': bulletins_for_profile(profile),
+		'weather_alerts': upcoming_alerts(request.user, limit=5),
 	}
 	return render(request, 'dashboard.html', ctx)
 
@@ -221,6 +237,7 @@ def update_profile_api(request):
 
 
 @login_required
+@conditional_page('forum')
 def forum(request):
 	profile = getattr(request.user, 'farmer_profile', None)
 	# Annotate comments and replies with like counts
@@ -371,6 +388,68 @@ def forum_comment_like(request):
 	return JsonResponse({'ok': True, 'comment_id': c.id, 'liked': liked, 'likes': likes_count})
 
 
+def _id_list(value, limit=50):
+	return [int(v) for v in (value or '').split(',') if v.strip().isdigit()][:limit]
+
+
+@login_required
+@require_POST
+def forum_translate(request):
+	"""
+	Translate posts/comments (comma-separated ids) into the reader's language.
+
+	Stored translations are reused. At most FORUM_TRANSLATE_MAX_ITEMS new ones
+	are made per request; `remaining` tells the client how many were left over.
+	"""
+	profile = getattr(request.user, 'farmer_profile', None)
+	language = request.POST.get('language') or (profile.preferred_language if profile else '') or 'en'
+	if language not in dict(FarmerProfile.LANGUAGE_CHOICES):
+		return JsonResponse({'ok': False, 'error': 'Unsupported language'}, status=400)
+
+	items = {}
+	for p in Post.objects.filter(id__in=_id_list(request.POST.get('posts'))).select_related('user__farmer_profile'):
+		if _written_in(p.user, language):
+			continue
+		items[(ContentTranslation.POST, p.id)] = p.content
+	for c in Comment.objects.filter(id__in=_id_list(request.POST.get('comments'))).select_related('user__farmer_profile'):
+		if _written_in(c.user, language):
+			continue
+		items[(ContentTranslation.COMMENT, c.id)] = c.text
+
+	# Stored translations are free; anything new costs LLM calls, so it is
+	# rate-limited like the chatbot and capped per request
+	done = cached_translations(items, language)
+	missing = [k for k, text in items.items() if k not in done and (text or '').strip()]
+	cap = getattr(settings, 'FORUM_TRANSLATE_MAX_ITEMS', 20)
+	if missing:
+		denied = check_chat_quota(request.user)
+		if denied:
+			return _rate_limited(*denied)
+		try:
+			done.update(translate_items({k: items[k] for k in missing[:cap]}, language, user_id=request.user.id))
+		except Exception as e:
+			return JsonResponse({'ok': False, 'error': f'Translation failed: {e}'}, status=502)
+	return JsonResponse({
+		'ok': True,
+		'language': language,
+		'remaining': max(0, len(missing) - cap),
+		'posts': {oid: text for (kind, oid), text in done.items() if kind == ContentTranslation.POST},
+		'comments': {oid: text for (kind, oid), text in done.items() if kind == ContentTranslation.COMMENT},
+	})
+
+
+def _rate_limited(reason, retry_after):
+	resp = JsonResponse({"ok": False, "error": reason, "code": "rate_limited", "retry_after": round(retry_after, 1)}, status=429)
+	resp['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+	return resp
+
+
+def _written_in(user, language):
+	"""Authors are assumed to write in their own preferred language."""
+	profile = getattr(user, 'farmer_profile', None)
+	return bool(profile and profile.preferred_language == language)
+
+
 @login_required
 def chatbot(request):
 	profile = getattr(request.user, 'farmer_profile', None)
@@ -389,29 +468,101 @@ def chatbot(request):
 	]
 	# Default selected from profile preference if available, else English
 	selected_lang = (profile.preferred_language if profile and profile.preferred_language else 'en')
-	# Load conversations for sidebar
-	conversations = list(Conversation.objects.filter(user=request.user).only('id', 'title', 'updated_at')[:50])
-	# If a conversation is selected via query param, load its messages
+	# Sidebar shows the first page of conversations; older ones are paged in over JSON
+	conversations, conversations_cursor = _conversation_page(request.user)
+	# If a conversation is selected via query param, load its latest window of messages
 	conv_id = request.GET.get('c')
 	chat_history = []
+	history_before = None
 	active_conversation = None
 	if conv_id:
 		try:
 			active_conversation = Conversation.objects.get(id=conv_id, user=request.user)
-			for m in active_conversation.messages.all():
-				chat_history.append({'role': m.role, 'text': m.text})
-		except Conversation.DoesNotExist:
+			ensure_hydrated(active_conversation)
+			chat_history, history_before = _message_window(active_conversation)
+		except (Conversation.DoesNotExist, ValueError):
 			active_conversation = None
 	return render(request, 'chatbot.html', {
 		'profile': profile,
 		'languages': languages,
 		'selected_lang': selected_lang,
 		'chat_history': chat_history,
+		'history_before': history_before,
 		'conversations': conversations,
+		'conversations_cursor': conversations_cursor,
 		'active_conversation': active_conversation,
 	})
 
 
+def _message_window(conversation, before=None, limit=None):
+	"""Newest `limit` messages older than message id `before`, oldest first, plus the cursor for the next page."""
+	limit = limit or getattr(settings, 'CHAT_MESSAGE_WINDOW', 30)
+	qs = conversation.messages.order_by('-id')
+	if before:
+		qs = qs.filter(id__lt=before)
+	rows = list(qs.values('id', 'role', 'text', 'created_at')[:limit + 1])
+	has_more = len(rows) > limit
+	rows = rows[:limit]
+	rows.reverse()
+	return rows, (rows[0]['id'] if has_more and rows else None)
+
+
+def _conversation_page(user, cursor=None, limit=None):
+	"""One page of a user's conversations, most recently updated first, keyed by an (updated_at, id) cursor."""
+	limit = limit or getattr(settings, 'CHAT_SIDEBAR_PAGE', 20)
+	qs = Conversation.objects.filter(user=user).order_by('-updated_at', '-id').only('id', 'title', 'updated_at')
+	if cursor:
+		stamp, _, last_id = cursor.rpartition('|')
+		ts = parse_datetime(stamp)
+		if ts is None or not last_id.isdigit():
+			raise ValueError('Invalid cursor')
+		qs = qs.filter(Q(updated_at__lt=ts) | Q(updated_at=ts, id__lt=int(last_id)))
+	rows = list(qs[:limit + 1])
+	has_more = len(rows) > limit
+	rows = rows[:limit]
+	next_cursor = f"{rows[-1].updated_at.isoformat()}|{rows[-1].id}" if has_more and rows else None
+	return rows, next_cursor
+
+
+@login_required
+def chatbot_messages_api(request):
+	"""Older messages of a conversation: ?c=<conversation id>&before=<message id>."""
+	try:
+		conversation = Conversation.objects.get(id=request.GET.get('c'), user=request.user)
+		ensure_hydrated(conversation)
+		before = int(request.GET.get('before') or 0) or None
+		limit = min(int(request.GET.get('limit') or 0) or getattr(settings, 'CHAT_MESSAGE_WINDOW', 30), 100)
+	except (Conversation.DoesNotExist, ValueError, TypeError):
+		return JsonResponse({'ok': False, 'error': 'Conversation not found'}, status=404)
+	rows, next_before = _message_window(conversation, before=before, limit=limit)
+	return JsonResponse({
+		'ok': True,
+		'messages': [
+			{'id': m['id'], 'role': m['role'], 'text': m['text'], 'created_at': m['created_at'].isoformat()}
+			for m in rows
+		],
+		'next_before': next_before,
+	})
+
+
+@login_required
+def chatbot_conversations_api(request):
+	"""Next page of the conversation sidebar: ?cursor=<next_cursor from the previous page>."""
+	try:
+		limit = min(int(request.GET.get('limit') or 0) or getattr(settings, 'CHAT_SIDEBAR_PAGE', 20), 100)
+		rows, next_cursor = _conversation_page(request.user, cursor=request.GET.get('cursor'), limit=limit)
+	except ValueError:
+		return JsonResponse({'ok': False, 'error': 'Invalid cursor'}, status=400)
+	return JsonResponse({
+		'ok': True,
+		'conversations': [
+			{'id': c.id, 'title': c.title or 'Untitled', 'updated_at': c.updated_at.isoformat()}
+			for c in rows
+		],
+		'next_cursor': next_cursor,
+	})
+
+
 @login_required
 @require_POST
 def chatbot_api(request):
@@ -424,6 +575,11 @@ def chatbot_api(request):
 	if not message and not image:
 		return JsonResponse({"ok": False, "error": "Please provide a message or an image."}, status=400)
 
+	# Rate limits and quota are checked against the cache before any DB write or upstream call
+	denied = check_chat_quota(request.user)
+	if denied:
+		return _rate_limited(*denied)
+
 	try:
 		# Prepare a readable language name from code
 		lang_map = {
@@ -437,6 +593,7 @@ def chatbot_api(request):
 		if conv_id:
 			try:
 				conversation = Conversation.objects.get(id=conv_id, user=request.user)
+				ensure_hydrated(conversation)
 			except Conversation.DoesNotExist:
 				conversation = None
 		if conversation is None:
@@ -445,72 +602,173 @@ def chatbot_api(request):
 			conversation = Conversation.objects.create(user=request.user, title=title)
 
 		# Persist user message
+		user_msg = None
 		if message:
-			ConversationMessage.objects.create(conversation=conversation, role='user', text=message)
-
-		# Build history for model (last 12)
-		msgs = list(conversation.messages.order_by('-created_at').values('role', 'text')[:12])
-		msgs.reverse()
-		text, raw = ask_gemini(message, image, language=language, history=msgs)
-
-		# Persist assistant reply
-		ConversationMessage.objects.create(conversation=conversation, role='assistant', text=text)
+			user_msg = ConversationMessage.objects.create(conversation=conversation, role='user', text=message)
+
+		# Generic seasonal crop questions are answered from the pre-generated bulletins
+		bulletin = None if image else instant_answer(getattr(request.user, 'farmer_profile', None), message, lang_code)
+		if bulletin:
+			ConversationMessage.objects.create(conversation=conversation, role='assistant', text=bulletin.text)
+			return JsonResponse({"ok": True, "reply": bulletin.text, "source": "bulletin", "conversation_id": conversation.id, "title": conversation.title})
+
+		# Queue mode: answer from a worker and let the client poll for the result.
+		# Only when the queue is enabled: without a worker running, queued jobs would never finish
+		if getattr(settings, 'CHAT_USE_JOB_QUEUE', False):
+			job = chat_jobs.submit(request.user, conversation, message, image, language=language, user_message=user_msg)
+			return JsonResponse(chat_jobs.job_payload(job), status=202)
+
+		text, raw, _reply = chat_jobs.reply_to(
+			conversation, message, image, language=language,
+			before_id=(user_msg.id if user_msg else None),
+		)
 
 		return JsonResponse({"ok": True, "reply": text, "conversation_id": conversation.id, "title": conversation.title})
+	except GeminiTimeoutError as e:
+		return JsonResponse({"ok": False, "error": str(e)} | e.as_dict(), status=504)
 	except Exception as e:
 		return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
 @login_required
+def chatbot_job_status(request, job_id):
+	"""
+	Current state of a queued chat job. Answers at once (a waiting request
+	would hold a worker); the client polls again with backoff.
+	"""
+	try:
+		job = ChatJob.objects.select_related('conversation', 'reply').get(id=job_id, user=request.user)
+	except ChatJob.DoesNotExist:
+		return JsonResponse({'ok': False, 'error': 'Job not found'}, status=404)
+	return JsonResponse(chat_jobs.job_payload(job))
+
+
+@login_required
+@conditional_page('learning')
 def learning(request):
+	"""Learning catalog in the farmer's language; unchanged pages revalidate with a 304."""
 	profile = getattr(request.user, 'farmer_profile', None)
-	items = [
-		{'title': 'Basics of Organic Farming', 'thumb': 'https://images.unsplash.com/photo-1500937386664-56ed8efc5f3f?auto=format&fit=crop&w=400&q=60'},
-		{'title': 'How to Test Soil Fertility at Home', 'thumb': 'https://images.unsplash.com/photo-1599058945522-58f12ec2a975?auto=format&fit=crop&w=400&q=60'},
-		{'title': 'Modern Irrigation Techniques', 'thumb': 'https://images.unsplash.com/photo-1501004318641-b39e6451bec6?auto=format&fit=crop&w=400&q=60'},
-		{'title': 'Integrated Pest Management', 'thumb': 'https://images.unsplash.com/photo-1543336668-cc2564b906b5?auto=format&fit=crop&w=400&q=60'},
-	]
-	return render(request, 'learning.html', {'profile': profile, 'items': items})
+	language = request.GET.get('lang') or (profile.preferred_language if profile else '') or 'en'
+	if language not in dict(FarmerProfile.LANGUAGE_CHOICES):
+		language = 'en'
+	filters = {k: (request.GET.get(k) or '').strip()[:100] for k in ('q', 'kind', 'crop', 'tag')}
+	items = browse(
+		language, text=filters['q'], kind=filters['kind'], crop=filters['crop'], tag=filters['tag'],
+		crops=crops_in(profile.main_crops or '') if profile else [],
+	)
+	ctx = {
+		'profile': profile,
+		'items': items,
+		'filters': filters,
+		'kinds': LearningItem.KIND_CHOICES,
+		'language': language,
+	}
+	return render(request, 'learning.html', ctx)
 
 
 @login_required
+@conditional_page('schemes')
 def schemes(request):
 	profile = getattr(request.user, 'farmer_profile', None)
-	data = [
-		{'title': 'PM-Kisan Samman Nidhi Yojana', 'desc': 'Income support to all farmer families across the country.'},
-		{'title': 'Soil Health Card Scheme', 'desc': 'Promotes soil test-based nutrient management.'},
-		{'title': 'Pradhan Mantri Fasal Bima Yojana (PMFBY)', 'desc': 'Crop insurance scheme for farmers.'},
-	]
-	return render(request, 'schemes.html', {'profile': profile, 'schemes': data})
+	category = request.GET.get('category', '')
+	recommended = recommended_schemes(profile)
+	recommended_ids = {s.id for s in recommended}
+	others = [s for s in get_index().schemes if s.id not in recommended_ids]
+	if category:
+		recommended = [s for s in recommended if s.category == category]
+		others = [s for s in others if s.category == category]
+	ctx = {
+		'profile': profile,
+		'recommended': recommended,
+		'schemes': others,
+		'category': category,
+		'categories': Scheme.CATEGORY_CHOICES,
+	}
+	return render(request, 'schemes.html', ctx)
+
+
+def _forecast_epoch(request):
+	# Forecasts age without any write; a new upstream model run starts a new ETag
+	return int(time.time() // getattr(settings, 'FORECAST_UPDATE_INTERVAL', 3600))
 
 
 @login_required
-def weather_updates(request):
-	profile = getattr(request.user, 'farmer_profile', None)
+@conditional_page('weather', vary=_forecast_epoch, max_age=300)
+async def weather_updates(request):
+	user = await request.auser()
+	profile = await sync_to_async(lambda: getattr(user, 'farmer_profile', None))()
 	q = request.GET.get('q', '').strip()
 	lat = request.GET.get('lat')
 	lon = request.GET.get('lon')
+	home_query = None
+	if profile and profile.district_village:
+		home_query = profile.district_village
+	elif profile and profile.get_state_display():
+		home_query = profile.get_state_display()
+
 	result = None
+	home_result = None
 	error = None
-	try:
-		if lat and lon:
-			result = get_weather_for_query(lat=float(lat), lon=float(lon))
-		elif q:
-			result = get_weather_for_query(query=q)
-		elif profile and profile.district_village:
-			result = get_weather_for_query(query=profile.district_village)
-		elif profile and profile.get_state_display():
-			result = get_weather_for_query(query=profile.get_state_display())
-	except Exception as e:
-		error = str(e)
+	async with AsyncOpenMeteoClient() as client:
+		try:
+			if lat and lon:
+				searched = aget_weather_for_query(client, lat=float(lat), lon=float(lon))
+			elif q:
+				searched = aget_weather_for_query(client, query=q)
+			else:
+				searched = None
+		except ValueError as e:
+			searched = None
+			error = str(e)
+		if searched is None and not error:
+			# Nothing searched: the farm location is the main result
+			if home_query:
+				try:
+					result = await aget_weather_for_query(client, query=home_query, state=profile.state)
+				except Exception as e:
+					error = str(e)
+		elif searched is not None:
+			# The searched place and the farm are independent, so fetch them together
+			jobs = [searched]
+			if home_query:
+				jobs.append(aget_weather_for_query(client, query=home_query, state=profile.state))
+			outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+			if isinstance(outcomes[0], Exception):
+				error = str(outcomes[0])
+			else:
+				result = outcomes[0]
+			if len(outcomes) > 1 and not isinstance(outcomes[1], Exception):
+				home_result = outcomes[1]
 
 	ctx = {
 		'profile': profile,
 		'q': q,
 		'result': result,
+		'home_result': home_result,
+		'home_query': home_query,
 		'error': error,
 	}
-	return render(request, 'weather.html', ctx)
+	response = await sync_to_async(render)(request, 'weather.html', ctx)
+	home_failed = bool(home_query) and (home_result if searched is not None else result) is None
+	if error or home_failed:
+		# Never let browsers hold on to a failed lookup
+		patch_cache_control(response, no_store=True)
+	return response
+
+
+def places_autocomplete(request):
+	"""Place-name suggestions from the bundled gazetteer (public: used on the signup form too)."""
+	q = (request.GET.get('q') or '').strip()
+	state = (request.GET.get('state') or '').strip().upper() or None
+	try:
+		limit = max(1, min(int(request.GET.get('limit', 10)), 25))
+	except ValueError:
+		limit = 10
+	places = get_gazetteer().autocomplete(q, limit=limit, state=state) if len(q) >= 2 else []
+	return JsonResponse({'ok': True, 'results': [
+		{'name': p.name, 'kind': p.kind, 'state': p.state, 'state_name': p.as_dict()['admin1'], 'latitude': p.latitude, 'longitude': p.longitude}
+		for p in places
+	]})
 
 
 @login_required
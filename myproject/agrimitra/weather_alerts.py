@@ -0,0 +1,141 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import agro_indices, forecast_cache
+from .models import FarmerProfile, ForecastCell, WeatherAlert
+
+logger = logging.getLogger(__name__)
+
+
+class Rule(NamedTuple):
+	kind: str
+	field: str  # key of a normalized daily forecast row
+	warning: float
+	severe: float
+	below: bool  # True when low values are the hazard (frost)
+	message: str
+
+
+# Thresholds follow IMD conventions where there is one (heavy rain ≥ 64.5 mm/day, very heavy ≥ 115.6)
+RULES = [
+	Rule(WeatherAlert.HEAVY_RAIN, 'precip', 64.5, 115.6, False, "Heavy rain: {value:.0f} mm expected"),
+	Rule(WeatherAlert.HEATWAVE, 't_max', 40.0, 45.0, False, "Heatwave: up to {value:.0f}°C"),
+	Rule(WeatherAlert.FROST, 't_min', 2.0, 0.0, True, "Frost risk: down to {value:.0f}°C"),
+	Rule(WeatherAlert.HIGH_WIND, 'gust_max', 50.0, 75.0, False, "High wind: gusts up to {value:.0f} km/h"),
+]
+
+
+class Hit(NamedTuple):
+	cell: str
+	date: date
+	rule: Rule
+	severity: str
+	value: float
+
+
+def evaluate(cells: List[ForecastCell], rules: Iterable[Rule] = RULES, today: Optional[date] = None) -> List[Hit]:
+	"""
+	Run every rule over the daily forecasts of all cells at once.
+
+	Each forecast field becomes one (cells x dates) NumPy matrix, NaN where a
+	cell has no value, and each rule is a single comparison over it.
+	"""
+	np = agro_indices.load_numpy()
+	if np is None:
+		raise RuntimeError("numpy is required to evaluate weather alerts")
+	today = today or timezone.localdate()
+	dates = sorted({d['date'][:10] for c in cells for d in c.data.get('daily') or [] if d.get('date')})
+	dates = [d for d in dates if d >= today.isoformat()]
+	if not cells or not dates:
+		return []
+	col = {d: i for i, d in enumerate(dates)}
+	rules = list(rules)
+	matrices = {r.field: np.full((len(cells), len(dates)), np.nan) for r in rules}
+	for row, cell in enumerate(cells):
+		for day in cell.data.get('daily') or []:
+			j = col.get((day.get('date') or '')[:10])
+			if j is None:
+				continue
+			for field, matrix in matrices.items():
+				value = day.get(field)
+				if isinstance(value, (int, float)):
+					matrix[row, j] = value
+
+	hits = []
+	for rule in rules:
+		values = matrices[rule.field]
+		with np.errstate(invalid='ignore'):
+			fired = values <= rule.warning if rule.below else values >= rule.warning
+			severe = values <= rule.severe if rule.below else values >= rule.severe
+		for i, j in zip(*np.nonzero(fired)):
+			hits.append(Hit(
+				cells[i].key, date.fromisoformat(dates[j]), rule,
+				'severe' if severe[i, j] else 'warning', float(values[i, j]),
+			))
+	return hits
+
+
+def active_cells(since_days: int, geocode) -> Tuple[Dict[str, Dict[str, Any]], int]:
+	"""
+	Grid cells of users who logged in within since_days, as
+	forecast_cache.profile_cells returns them, plus unresolved profile count.
+	"""
+	since = timezone.now() - timedelta(days=since_days)
+	rows = FarmerProfile.objects.filter(user__is_active=True, user__last_login__gte=since).values_list(
+		'user_id', 'district_village', 'state',
+	)
+	return forecast_cache.profile_cells(rows, geocode)
+
+
+def active_cell_index(since_days: int, geocode) -> Tuple[Dict[str, List[int]], int]:
+	"""{cell key: [user ids]} for users who logged in within since_days, plus unresolved profile count."""
+	cells, unresolved = active_cells(since_days, geocode)
+	return {key: cell['users'] for key, cell in cells.items()}, unresolved
+
+
+def refresh_alerts(index: Dict[str, List[int]]) -> Tuple[int, int]:
+	"""
+	Evaluate the cached forecasts of the indexed cells and sync each user's alert rows.
+
+	Returns (alerts written, stale alerts removed). Cells whose cached
+	forecast is older than FORECAST_STALE_TTL are skipped.
+	"""
+	stale_ttl = getattr(settings, 'FORECAST_STALE_TTL', 6 * 3600)
+	cells = list(ForecastCell.objects.filter(
+		key__in=index, fetched_at__gte=timezone.now() - timedelta(seconds=stale_ttl),
+	))
+	today = timezone.localdate()
+	hits = evaluate(cells, today=today)
+
+	alerts = [
+		WeatherAlert(
+			user_id=user_id, kind=hit.rule.kind, date=hit.date, severity=hit.severity,
+			value=round(hit.value, 1), message=hit.rule.message.format(value=hit.value), cell=hit.cell,
+		)
+		for hit in hits
+		for user_id in index.get(hit.cell, [])
+	]
+	users = {user_id for cell in cells for user_id in index.get(cell.key, [])}
+	keep = {(a.user_id, a.kind, a.date) for a in alerts}
+	with transaction.atomic():
+		WeatherAlert.objects.bulk_create(
+			alerts, batch_size=500,
+			update_conflicts=True, unique_fields=['user', 'kind', 'date'],
+			update_fields=['severity', 'value', 'message', 'cell', 'updated_at'],
+		)
+		# Alerts the latest forecasts no longer support (plus past days) are dropped
+		existing = WeatherAlert.objects.filter(user_id__in=users).values_list('id', 'user_id', 'kind', 'date')
+		stale = [pk for pk, user_id, kind, day in existing if day < today or (user_id, kind, day) not in keep]
+		for i in range(0, len(stale), 500):
+			WeatherAlert.objects.filter(id__in=stale[i:i + 500]).delete()
+	return len(alerts), len(stale)
+
+
+def upcoming_alerts(user, limit: Optional[int] = None):
+	qs = WeatherAlert.objects.filter(user=user, date__gte=timezone.localdate())
+	return qs[:limit] if limit else qs
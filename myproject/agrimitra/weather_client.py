@@ -1,7 +1,50 @@
+import asyncio
 import datetime
-from typing import Optional, Dict, Any
+import logging
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import agro_indices, forecast_cache, geocode_cache
+from .gazetteer import get_gazetteer
+from .geocode_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Called after every upstream request as hook(endpoint, elapsed_seconds, status_code_or_None, attempts)
+CALL_HOOKS: List[Callable[[str, float, Optional[int], int], None]] = []
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+	"""Process-wide keep-alive session with a bounded connection pool (settings.WEATHER_POOL_SIZE)."""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				size = getattr(settings, 'WEATHER_POOL_SIZE', 10)
+				session = requests.Session()
+				adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size, pool_block=True)
+				session.mount("https://", adapter)
+				session.mount("http://", adapter)
+				_session = session
+	return _session
+
+
+def _report(endpoint: str, elapsed: float, status: Optional[int], attempts: int):
+	for hook in CALL_HOOKS:
+		try:
+			hook(endpoint, elapsed, status, attempts)
+		except Exception:
+			logger.exception("Weather call hook failed")
 
 
 class OpenMeteoClient:
@@ -9,19 +52,81 @@ class OpenMeteoClient:
 
 	- No API key required.
 	- Supports city name via geocoding or direct lat/lon.
+	- Shares one pooled session per process; retries 5xx answers, timeouts
+	  and connection errors with jittered exponential backoff.
 	Docs: https://open-meteo.com/
 	"""
 
 	GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
 	METEO_URL = "https://api.open-meteo.com/v1/forecast"
 
-	def geocode(self, query: str, country_code: Optional[str] = "IN") -> Optional[Dict[str, Any]]:
+	def __init__(self, session: Optional[requests.Session] = None, timeout=None, retries: Optional[int] = None):
+		self.session = session or shared_session()
+		# (connect, read) seconds
+		self.timeout = timeout or tuple(getattr(settings, 'WEATHER_TIMEOUT', (3.05, 15)))
+		self.retries = getattr(settings, 'WEATHER_RETRIES', 2) if retries is None else retries
+		self.backoff = getattr(settings, 'WEATHER_RETRY_BACKOFF', 0.5)
+
+	def _backoff_delay(self, attempt: int) -> float:
+		# Full jitter: anywhere up to the exponential step, so retrying workers spread out
+		return random.uniform(0, self.backoff * (2 ** (attempt - 1)))
+
+	def _get(self, endpoint: str, url: str, params: Dict[str, Any]) -> Any:
+		"""GET with retries on 5xx/timeouts; reports each call's timing to CALL_HOOKS."""
+		start = time.monotonic()
+		status = None
+		attempt = 0
+		try:
+			while True:
+				attempt += 1
+				try:
+					r = self.session.get(url, params=params, timeout=self.timeout)
+					status = r.status_code
+					if status < 500 or attempt > self.retries:
+						r.raise_for_status()
+						return r.json() or {}
+				except (requests.Timeout, requests.ConnectionError) as e:
+					status = None
+					if attempt > self.retries:
+						raise
+					logger.info("Open-Meteo %s attempt %s failed: %s", endpoint, attempt, e)
+				time.sleep(self._backoff_delay(attempt))
+		finally:
+			_report(endpoint, time.monotonic() - start, status, attempt)
+
+	def geocode(self, query: str, country_code: Optional[str] = "IN", refresh: bool = False,
+				state: Optional[str] = None) -> Optional[Dict[str, Any]]:
 		"""Return first geocoding match for a place query.
 
+		Indian places are answered from the bundled gazetteer when it knows
+		the exact name, or a close spelling within `state` (a FarmerProfile
+		state code); otherwise from the geocode cache (in-process LRU, then
+		database) when possible; misses are cached as well. refresh=True
+		skips the cache.
+
 		Example return: { name, latitude, longitude, country_code, admin1 }
 		"""
-		if not query:
+		if not query or not query.strip():
 			return None
+		place = self._local_place(query, country_code, state)
+		if place:
+			return place
+		key = normalize_query(query, country_code)
+		return geocode_cache.get_or_fetch(key, lambda: self._geocode_remote(query, country_code), refresh=refresh)
+
+	@staticmethod
+	def _local_place(query: str, country_code: Optional[str], state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+		if country_code in (None, "IN") and getattr(settings, 'GAZETTEER_LOCAL_GEOCODE', True):
+			place = get_gazetteer().lookup(query, state=state)
+			if place:
+				return place.as_dict()
+		return None
+
+	def _geocode_remote(self, query: str, country_code: Optional[str]) -> Optional[Dict[str, Any]]:
+		return self._geocode_result(self._get("geocode", self.GEO_URL, self._geocode_params(query, country_code)))
+
+	@staticmethod
+	def _geocode_params(query: str, country_code: Optional[str]) -> Dict[str, Any]:
 		params = {
 			"name": query,
 			"count": 1,
@@ -29,9 +134,10 @@ class OpenMeteoClient:
 		}
 		if country_code:
 			params["country_code"] = country_code
-		r = requests.get(self.GEO_URL, params=params, timeout=10)
-		r.raise_for_status()
-		data = r.json() or {}
+		return params
+
+	@staticmethod
+	def _geocode_result(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 		results = data.get("results") or []
 		if not results:
 			return None
@@ -44,58 +150,82 @@ class OpenMeteoClient:
 			"admin1": top.get("admin1"),
 		}
 
+	CURRENT_VARS = [
+		"temperature_2m",
+		"apparent_temperature",
+		"is_day",
+		"precipitation",
+		"wind_speed_10m",
+		"wind_direction_10m",
+		"relative_humidity_2m",
+		"weather_code",
+	]
+	DAILY_VARS = [
+		"temperature_2m_max",
+		"temperature_2m_min",
+		"precipitation_sum",
+		"precipitation_probability_max",
+		"precipitation_hours",
+		"sunrise",
+		"sunset",
+		"weather_code",
+		"wind_speed_10m_max",
+		"wind_gusts_10m_max",
+	]
+
 	def forecast(self, lat: float, lon: float, tz: str = "auto") -> Dict[str, Any]:
 		"""Fetch current and 7-day forecast summary."""
-		params = {
+		data = self._get("forecast", self.METEO_URL, self._forecast_params(lat, lon, tz))
+		return self._normalize(data)
+
+	@classmethod
+	def _forecast_params(cls, lat, lon, tz: str) -> Dict[str, Any]:
+		return {
 			"latitude": lat,
 			"longitude": lon,
-			"current": [
-				"temperature_2m",
-				"apparent_temperature",
-				"is_day",
-				"precipitation",
-				"wind_speed_10m",
-				"wind_direction_10m",
-				"relative_humidity_2m",
-				"weather_code",
-			],
-			"daily": [
-				"temperature_2m_max",
-				"temperature_2m_min",
-				"precipitation_sum",
-				"precipitation_probability_max",
-				"precipitation_hours",
-				"sunrise",
-				"sunset",
-				"weather_code",
-			],
+			"current": cls.CURRENT_VARS,
+			"hourly": agro_indices.HOURLY_VARS,
+			"daily": cls.DAILY_VARS,
 			"timezone": tz,
 		}
-		r = requests.get(self.METEO_URL, params=params, timeout=15)
-		r.raise_for_status()
-		data = r.json() or {}
-		return self._normalize(data)
+
+	def forecast_many(self, points: List[Tuple[float, float]], tz: str = "auto") -> List[Dict[str, Any]]:
+		"""Forecasts for several (lat, lon) points in one request, normalized, in the same order."""
+		if not points:
+			return []
+		params = self._forecast_params(
+			",".join(f"{lat:g}" for lat, _lon in points),
+			",".join(f"{lon:g}" for _lat, lon in points),
+			tz,
+		)
+		data = self._get("forecast_many", self.METEO_URL, params)
+		# A single location comes back as an object, several as a list
+		payloads = data if isinstance(data, list) else [data]
+		if len(payloads) != len(points):
+			raise ValueError(f"Expected {len(points)} forecasts, got {len(payloads)}")
+		return [self._normalize(p) for p in payloads]
 
 	@staticmethod
 	def _normalize(payload: Dict[str, Any]) -> Dict[str, Any]:
 		current = payload.get("current", {})
 		daily = payload.get("daily", {})
 
-		# Build day-wise list
-		days = []
-		times = (daily.get("time") or [])
-		for i, day in enumerate(times):
-			days.append({
-				"date": day,
-				"t_max": (daily.get("temperature_2m_max") or [None])[i],
-				"t_min": (daily.get("temperature_2m_min") or [None])[i],
-				"precip": (daily.get("precipitation_sum") or [None])[i],
-				"prob": (daily.get("precipitation_probability_max") or [None])[i],
-				"precip_hours": (daily.get("precipitation_hours") or [None])[i],
-				"sunrise": (daily.get("sunrise") or [None])[i],
-				"sunset": (daily.get("sunset") or [None])[i],
-				"code": (daily.get("weather_code") or [None])[i],
-			})
+		# Build day-wise list from the columns in one pass
+		times = daily.get("time") or []
+		fields = {
+			"t_max": "temperature_2m_max",
+			"t_min": "temperature_2m_min",
+			"precip": "precipitation_sum",
+			"prob": "precipitation_probability_max",
+			"precip_hours": "precipitation_hours",
+			"sunrise": "sunrise",
+			"sunset": "sunset",
+			"code": "weather_code",
+			"wind_max": "wind_speed_10m_max",
+			"gust_max": "wind_gusts_10m_max",
+		}
+		columns = [daily.get(var) or [None] * len(times) for var in fields.values()]
+		days = [dict(zip(("date", *fields), row)) for row in zip(times, *columns)]
 
 		# Rain summary
 		today_prob = None
@@ -130,21 +260,141 @@ class OpenMeteoClient:
 				"today_prob": today_prob,
 				"next_rain": next_rain,
 			},
+			"agro": agro_indices.compute(payload),
 		}
 
 
-def get_weather_for_query(query: Optional[str] = None, lat: Optional[float] = None, lon: Optional[float] = None) -> Dict[str, Any]:
+# Lazy import holder; httpx is optional and without it AsyncOpenMeteoClient runs requests in threads
+httpx = None
+
+
+def _load_httpx():
+	global httpx
+	if httpx is None:
+		try:
+			import httpx as _httpx
+			httpx = _httpx
+		except Exception:
+			httpx = False
+	return httpx or None
+
+
+class AsyncOpenMeteoClient:
+	"""Async counterpart of OpenMeteoClient with the same (normalized) results.
+
+	Use it as `async with AsyncOpenMeteoClient() as client:` so the HTTP
+	connection pool lives on the running event loop. With httpx installed
+	requests are native async; otherwise each one runs the pooled sync
+	client in a worker thread, which still lets independent calls overlap.
+	Geocoding goes through the same gazetteer and geocode cache.
+	"""
+
+	def __init__(self, timeout=None, retries: Optional[int] = None):
+		self.sync = OpenMeteoClient(timeout=timeout, retries=retries)
+		self._http = None
+
+	async def __aenter__(self) -> 'AsyncOpenMeteoClient':
+		lib = _load_httpx()
+		if lib is not None:
+			connect, read = self.sync.timeout
+			size = getattr(settings, 'WEATHER_POOL_SIZE', 10)
+			self._http = lib.AsyncClient(
+				timeout=lib.Timeout(read, connect=connect),
+				limits=lib.Limits(max_connections=size, max_keepalive_connections=size),
+			)
+		return self
+
+	async def __aexit__(self, *exc_info):
+		if self._http is not None:
+			await self._http.aclose()
+			self._http = None
+
+	async def _get(self, endpoint: str, url: str, params: Dict[str, Any]) -> Any:
+		"""Async OpenMeteoClient._get: same retry policy and CALL_HOOKS reporting."""
+		if self._http is None:
+			return await asyncio.to_thread(self.sync._get, endpoint, url, params)
+		start = time.monotonic()
+		status = None
+		attempt = 0
+		try:
+			while True:
+				attempt += 1
+				try:
+					r = await self._http.get(url, params=params)
+					status = r.status_code
+					if status < 500 or attempt > self.sync.retries:
+						r.raise_for_status()
+						return r.json() or {}
+				except httpx.TransportError as e:
+					status = None
+					if attempt > self.sync.retries:
+						raise
+					logger.info("Open-Meteo %s attempt %s failed: %s", endpoint, attempt, e)
+				await asyncio.sleep(self.sync._backoff_delay(attempt))
+		finally:
+			_report(endpoint, time.monotonic() - start, status, attempt)
+
+	async def geocode(self, query: str, country_code: Optional[str] = "IN", refresh: bool = False,
+					  state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+		if not query or not query.strip():
+			return None
+		place = OpenMeteoClient._local_place(query, country_code, state)
+		if place:
+			return place
+		key = normalize_query(query, country_code)
+		if not refresh:
+			cached = await sync_to_async(geocode_cache.lookup)(key)
+			if cached is not geocode_cache.MISS:
+				return cached
+		data = await self._get("geocode", OpenMeteoClient.GEO_URL, OpenMeteoClient._geocode_params(query, country_code))
+		result = OpenMeteoClient._geocode_result(data)
+		await sync_to_async(geocode_cache.store)(key, result)
+		return result
+
+	async def forecast(self, lat: float, lon: float, tz: str = "auto") -> Dict[str, Any]:
+		data = await self._get("forecast", OpenMeteoClient.METEO_URL, OpenMeteoClient._forecast_params(lat, lon, tz))
+		return OpenMeteoClient._normalize(data)
+
+
+_default_client = None
+
+
+def default_client() -> OpenMeteoClient:
+	"""Client reused across requests (it holds no per-call state)."""
+	global _default_client
+	if _default_client is None:
+		_default_client = OpenMeteoClient()
+	return _default_client
+
+
+def get_weather_for_query(query: Optional[str] = None, lat: Optional[float] = None, lon: Optional[float] = None,
+						  state: Optional[str] = None) -> Dict[str, Any]:
 	"""Convenience function to get weather using a city query or lat/lon.
 
-	Prefers explicit lat/lon if provided; otherwise uses geocoding for query.
+	Prefers explicit lat/lon if provided; otherwise uses geocoding for query
+	(`state` narrows close-spelling matches, see OpenMeteoClient.geocode).
+	Forecasts come from the shared grid-cell cache (see forecast_cache).
 	"""
-	client = OpenMeteoClient()
+	client = default_client()
 	if lat is not None and lon is not None:
-		return client.forecast(lat, lon)
+		return forecast_cache.get_forecast(lat, lon, client.forecast)
 	if query:
-		geo = client.geocode(query)
+		geo = client.geocode(query, state=state)
 		if not geo:
 			raise ValueError("Location not found")
-		return client.forecast(geo["latitude"], geo["longitude"]) | {"place": geo}
+		return forecast_cache.get_forecast(geo["latitude"], geo["longitude"], client.forecast) | {"place": geo}
 	raise ValueError("Provide a city name or coordinates")
 
+
+async def aget_weather_for_query(client: AsyncOpenMeteoClient, query: Optional[str] = None, lat: Optional[float] = None,
+								 lon: Optional[float] = None, state: Optional[str] = None) -> Dict[str, Any]:
+	"""Async get_weather_for_query; stale cells are still refreshed by the sync client in the background."""
+	if lat is not None and lon is not None:
+		return await forecast_cache.aget_forecast(lat, lon, client.forecast, default_client().forecast)
+	if query:
+		geo = await client.geocode(query, state=state)
+		if not geo:
+			raise ValueError("Location not found")
+		data = await forecast_cache.aget_forecast(geo["latitude"], geo["longitude"], client.forecast, default_client().forecast)
+		return data | {"place": geo}
+	raise ValueError("Provide a city name or coordinates")
@@ -117,6 +117,14 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed names (plus .gz/.br twins); see build_static below
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'agrimitra.assets.PrecompressedManifestStaticFilesStorage'},
+}
 
 # Media (user uploads)
 MEDIA_URL = '/media/'
@@ -131,3 +139,126 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 import os
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 
+# Coalesce identical in-flight Gemini prompts into one upstream call.
+# Cross-worker coalescing needs CACHES to be shared by all workers (e.g. Redis).
+GEMINI_COALESCE = True
+GEMINI_COALESCE_WAIT = 90  # seconds a follower waits for the leader's answer
+GEMINI_REQUEST_BUDGET = 45  # seconds per chat request, across all model fallbacks
+
+# Chatbot photo uploads are downscaled/recompressed before being sent upstream,
+# and analyses are cached by the exact prepared image bytes + language, conversation
+# summary, recent history and question.
+GEMINI_IMAGE_MAX_SIDE = 1024
+GEMINI_IMAGE_QUALITY = 80
+GEMINI_IMAGE_CACHE_TTL = 7 * 24 * 3600
+
+# Chat prompt assembly: rolling per-conversation summary + recent turns within a budget
+CHAT_PROMPT_TOKEN_BUDGET = 1500  # approx. tokens for summary + verbatim history
+CHAT_HISTORY_MAX_TURNS = 12
+CHAT_SUMMARY_EVERY = 6  # refresh the summary after this many new turns
+CHAT_SUMMARY_KEEP_RECENT = 4  # newest turns always kept verbatim
+CHAT_SUMMARY_ASYNC = True
+
+# Model routing: rolling latency/error stats per model with circuit breakers.
+# With GEMINI_HEDGE, a backup model is called if the first has not answered by its p95.
+GEMINI_BREAKER_FAILURES = 3
+GEMINI_BREAKER_COOLDOWN = 60
+GEMINI_HEDGE = False
+GEMINI_HEDGE_MAX_WORKERS = 8
+
+# LLM backend used by the chatbot: 'gemini', 'fake' (offline, deterministic) or a dotted class path.
+# e.g. LLM_BACKEND=fake with LLM_BACKEND_OPTIONS = {'latency_ms': 600, 'error_rate': 0.02}
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+LLM_BACKEND_OPTIONS = {}
+
+# Chat job queue: when enabled, chatbot_api returns a job id (HTTP 202) and
+# `python manage.py run_chat_worker` answers it; clients poll /api/chatbot/jobs/<id>/.
+CHAT_USE_JOB_QUEUE = False
+CHAT_JOB_MAX_ATTEMPTS = 3
+CHAT_JOB_RETRY_BACKOFF = 5  # seconds, doubled on each retry
+CHAT_JOB_LEASE = 300  # seconds before a running job from a dead worker is requeued
+
+# Chat rate limits (token buckets in the shared cache) and per-user daily token quota (0 = unlimited)
+CHAT_RATE_USER_PER_MINUTE = 10
+CHAT_RATE_USER_BURST = 5
+CHAT_RATE_GLOBAL_PER_MINUTE = 120
+CHAT_RATE_GLOBAL_BURST = 30
+CHAT_DAILY_TOKEN_QUOTA = 0
+
+# Chatbot page windowing: messages rendered per page / conversations per sidebar page
+CHAT_MESSAGE_WINDOW = 30
+CHAT_SIDEBAR_PAGE = 20
+
+# Archival of idle conversations (python manage.py archive_conversations)
+CHAT_ARCHIVE_IDLE_DAYS = 90
+CHAT_ARCHIVE_CODEC = 'zstd'  # falls back to zlib when the zstandard package is missing
+
+# Forum translation: items and characters sent per upstream translation call
+FORUM_TRANSLATE_BATCH = 8
+FORUM_TRANSLATE_BATCH_CHARS = 4000
+# New translations made per request (each request also takes a chat rate-limit token)
+FORUM_TRANSLATE_MAX_ITEMS = 20
+
+# Geocode cache for the weather page (seconds); "not found" answers expire sooner
+GEOCODE_CACHE_TTL = 90 * 24 * 3600
+GEOCODE_NEGATIVE_TTL = 24 * 3600
+GEOCODE_LRU_SIZE = 1024
+
+# Shared forecast cache: coordinates snap to a grid of this many degrees (0.1° ≈ 11 km).
+# Cells stay fresh until the next upstream model update (every FORECAST_UPDATE_INTERVAL
+# seconds, published FORECAST_UPDATE_DELAY seconds later) and are then served stale
+# for up to FORECAST_STALE_TTL seconds while a background refresh runs.
+FORECAST_GRID_DEG = 0.1
+FORECAST_UPDATE_INTERVAL = 3600
+FORECAST_UPDATE_DELAY = 600
+FORECAST_STALE_TTL = 6 * 3600
+
+# Open-Meteo HTTP client: (connect, read) timeouts in seconds, retries on 5xx/timeouts
+# with jittered exponential backoff, and the size of the shared keep-alive pool.
+# Register timing callbacks in agrimitra.weather_client.CALL_HOOKS.
+WEATHER_TIMEOUT = (3.05, 15)
+WEATHER_RETRIES = 2
+WEATHER_RETRY_BACKOFF = 0.5
+WEATHER_POOL_SIZE = 10
+
+# Gazetteer of Indian places used for autocomplete and local geocoding. The bundled file
+# has states and district headquarters; `manage.py import_gazetteer` writes villages from
+# a GeoNames dump to the second file.
+GAZETTEER_FILES = [
+    BASE_DIR / 'agrimitra' / 'data' / 'gazetteer_in.tsv',
+    BASE_DIR / 'data' / 'gazetteer_local.tsv',
+]
+GAZETTEER_LOCAL_GEOCODE = True
+GAZETTEER_FUZZY_RATIO = 0.9
+
+# Agro-weather indices on the weather page (needs numpy): GDD base/cap temperature (°C),
+# rain-free hours required after spraying, and the shortest spray window worth showing.
+AGRO_GDD_BASE = 10.0
+AGRO_GDD_CAP = 30.0
+AGRO_SPRAY_RAINFAST_HOURS = 2
+AGRO_SPRAY_MIN_HOURS = 2
+AGRO_SPRAY_MAX_WINDOWS = 6
+
+# Scheme eligibility match sets are rebuilt in each worker when the Scheme table
+# changes; other workers check for changes at most this often (seconds).
+SCHEME_INDEX_TTL = 60
+
+# Local thumbnail cache for remote content images (media/imgcache/): widths
+# generated per image, encoder quality, total disk budget before least recently
+# used images are evicted, and how long to wait before retrying a failed download.
+# IMAGE_CACHE_FETCH off: page views never start downloads (tests, offline deployments).
+IMAGE_CACHE_SIZES = (160, 400, 800, 1280)
+IMAGE_CACHE_QUALITY = 70
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+IMAGE_CACHE_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+IMAGE_CACHE_RETRY = 24 * 3600
+IMAGE_CACHE_FETCH = True
+
+# Static bundles: `python manage.py build_static` fails if a template carries more than
+# INLINE_ASSET_BUDGET bytes of inline <style>/<script>, then runs collectstatic, which writes
+# hashed files with .gz and .br twins (.br needs the brotli package) to STATIC_ROOT.
+# With DEBUG off, STATIC_SERVE has Django serve them (hashed names cached for STATIC_MAX_AGE
+# seconds); turn it off when a web server in front serves STATIC_ROOT.
+INLINE_ASSET_BUDGET = 1024
+STATIC_SERVE = True
+STATIC_MAX_AGE = 365 * 24 * 3600
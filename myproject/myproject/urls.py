@@ -14,11 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from agrimitra import views as app_views
+from agrimitra import assets, views as app_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -32,10 +34,15 @@ urlpatterns = [
     path('api/forum/vote/', app_views.forum_vote, name='forum_vote'),
     path('api/forum/comment/', app_views.forum_comment, name='forum_comment'),
     path('api/forum/comment/like/', app_views.forum_comment_like, name='forum_comment_like'),
+    path('api/forum/translate/', app_views.forum_translate, name='forum_translate'),
     path('chatbot/', app_views.chatbot, name='chatbot'),
     path('api/chatbot/ask/', app_views.chatbot_api, name='chatbot_api'),
+    path('api/chatbot/jobs/<int:job_id>/', app_views.chatbot_job_status, name='chatbot_job_status'),
+    path('api/chatbot/messages/', app_views.chatbot_messages_api, name='chatbot_messages_api'),
+    path('api/chatbot/conversations/', app_views.chatbot_conversations_api, name='chatbot_conversations_api'),
     path('learning/', app_views.learning, name='learning'),
         path('weather/', app_views.weather_updates, name='weather_updates'),
+    path('api/places/autocomplete/', app_views.places_autocomplete, name='places_autocomplete'),
     path('schemes/', app_views.schemes, name='schemes'),
     path('profile/', app_views.profile_page, name='profile_page'),
     path('settings/', app_views.settings_page, name='settings_page'),
@@ -43,3 +50,6 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+elif getattr(settings, 'STATIC_SERVE', True):
+    # Under DEBUG, runserver serves static files from the source directories instead
+    urlpatterns += [re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), assets.serve)]
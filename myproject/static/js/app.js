@@ -0,0 +1,15 @@
+// Shared page behaviour; load at the end of <body>, before any page script
+(function () {
+  if (window.feather) feather.replace();
+
+  // Mobile menu toggle
+  const mobileMenuButton = document.getElementById('mobile-menu-button');
+  const mobileMenu = document.getElementById('mobile-menu');
+  mobileMenuButton?.addEventListener('click', () => mobileMenu.classList.toggle('hidden'));
+
+  // Page fade-in
+  window.addEventListener('load', () => {
+    document.body.classList.add('page-loaded');
+    if (window.feather) feather.replace();
+  });
+})();
@@ -0,0 +1,264 @@
+// Chatbot page: sending questions, queued answers, windowed history and the sidebar
+(function () {
+  // Endpoint URLs come from the page's <script data-*-url> attributes
+  const urls = document.currentScript.dataset;
+
+  const chatWindow = document.getElementById('chatWindow');
+  const chatForm = document.getElementById('chatForm');
+  const chatInput = document.getElementById('chatInput');
+  const imageInput = document.getElementById('imageInput');
+  const languageSelect = document.getElementById('languageSelect');
+  const conversationIdEl = document.getElementById('conversationId');
+  const attachmentPreview = document.getElementById('attachmentPreview');
+  const attachmentThumb = document.getElementById('attachmentThumb');
+  const attachmentName = document.getElementById('attachmentName');
+  const attachmentRemove = document.getElementById('attachmentRemove');
+  let attachmentObjectUrl = null;
+
+  function getCookie(name) {
+    const value = `; ${document.cookie}`;
+    const parts = value.split(`; ${name}=`);
+    if (parts.length === 2) return parts.pop().split(';').shift();
+  }
+
+  async function pollJob(jobId) {
+    const url = urls.jobStatusUrl.replace('/0/', `/${jobId}/`);
+    const giveUpAt = Date.now() + 5 * 60 * 1000;
+    // The status endpoint answers at once; back off from 1s to 8s between polls
+    let delay = 1000;
+    while (Date.now() < giveUpAt) {
+      await new Promise(resolve => setTimeout(resolve, delay));
+      delay = Math.min(delay * 2, 8000);
+      const r = await fetch(url, { headers: { 'Accept': 'application/json' } });
+      const d = await r.json();
+      if (!r.ok || d.status === 'done' || d.status === 'failed') return d;
+    }
+    return { ok: false, error: 'Still working on it. Reopen this chat in a little while to see the answer.' };
+  }
+
+  imageInput.addEventListener('change', () => {
+    const file = imageInput.files[0];
+    if (file) {
+      if (attachmentObjectUrl) URL.revokeObjectURL(attachmentObjectUrl);
+      attachmentObjectUrl = URL.createObjectURL(file);
+      attachmentThumb.src = attachmentObjectUrl;
+      attachmentName.textContent = file.name;
+      attachmentPreview.classList.remove('hidden');
+    }
+  });
+
+  attachmentRemove.addEventListener('click', () => {
+    imageInput.value = '';
+    if (attachmentObjectUrl) URL.revokeObjectURL(attachmentObjectUrl);
+    attachmentObjectUrl = null;
+    attachmentThumb.src = '';
+    attachmentName.textContent = '';
+    attachmentPreview.classList.add('hidden');
+  });
+
+  chatForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const text = chatInput.value.trim();
+    const file = imageInput.files[0];
+    const lang = languageSelect.value;
+    if (!text && !file) return;
+
+    // Render user message
+    const mineWrap = document.createElement('div');
+    mineWrap.className = 'flex flex-col items-end space-y-2';
+    if (text) {
+      const myText = document.createElement('div');
+      myText.className = 'message-bubble user-message bg-gray-100 border border-gray-200 text-gray-800';
+      myText.textContent = text;
+      mineWrap.appendChild(myText);
+    }
+    if (file && attachmentObjectUrl) {
+      const myImgCard = document.createElement('div');
+      myImgCard.className = 'max-w-[80%] border rounded-lg overflow-hidden shadow';
+      const imgEl = document.createElement('img');
+      imgEl.src = attachmentObjectUrl;
+      imgEl.alt = 'uploaded image';
+      imgEl.className = 'w-full max-h-64 object-contain';
+      myImgCard.appendChild(imgEl);
+      mineWrap.appendChild(myImgCard);
+    }
+    chatWindow.appendChild(mineWrap);
+    chatWindow.scrollTop = chatWindow.scrollHeight;
+    chatInput.value = '';
+    imageInput.value = '';
+    if (attachmentObjectUrl) URL.revokeObjectURL(attachmentObjectUrl);
+    attachmentObjectUrl = null;
+    attachmentThumb.src = '';
+    attachmentName.textContent = '';
+    attachmentPreview.classList.add('hidden');
+
+    // Build form data
+    const fd = new FormData();
+  if (text) fd.append('message', text);
+    if (file) fd.append('image', file, file.name);
+    if (lang) fd.append('language', lang);
+  const convId = (conversationIdEl.value || '').trim();
+  if (convId) fd.append('conversation_id', convId);
+
+    // Typing indicator
+    const typingWrap = document.createElement('div');
+    typingWrap.className = 'flex items-start space-x-3';
+    typingWrap.innerHTML = `
+      <div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div>
+      <div class="message-bubble typing-indicator">Thinking…</div>`;
+    chatWindow.appendChild(typingWrap);
+    chatWindow.scrollTop = chatWindow.scrollHeight;
+
+    // Timeout controller (90s)
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 90000);
+
+    try {
+      const resp = await fetch(urls.askUrl, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': getCookie('csrftoken'), 'Accept': 'application/json' },
+        body: fd,
+        signal: controller.signal
+      });
+      clearTimeout(timeoutId);
+
+      let data = null;
+      try { data = await resp.json(); }
+      catch (e) {
+        const txt = await resp.text();
+        typingWrap.innerHTML = `<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div><div class="message-bubble bot-message bg-red-50 border border-red-200 text-red-700">Unexpected response: ${txt.slice(0,300)}</div>`;
+        chatWindow.scrollTop = chatWindow.scrollHeight;
+        return;
+      }
+
+      if (!resp.ok) {
+        typingWrap.innerHTML = `<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div><div class="message-bubble bot-message bg-red-50 border border-red-200 text-red-700">Error: ${(data && (data.error||data.detail)) || ('HTTP '+resp.status)}</div>`;
+        chatWindow.scrollTop = chatWindow.scrollHeight;
+        return;
+      }
+
+      // Queued request (HTTP 202): wait for a worker to answer it
+      if (data && data.ok && data.job_id && !data.reply) {
+        data = await pollJob(data.job_id);
+      }
+
+      if (data && data.ok) {
+        typingWrap.innerHTML = `<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div><div class="message-bubble bot-message whitespace-pre-line">${(data.reply || '').replaceAll('<','&lt;')}</div>`;
+        // If this was a new chat, set and add to sidebar
+        if (!convId && data.conversation_id) {
+          conversationIdEl.value = data.conversation_id;
+          const ul = document.querySelector('#historySidebar ul');
+          if (ul) {
+            const li = document.createElement('li');
+            li.innerHTML = `<a href="${urls.chatbotUrl}?c=${data.conversation_id}" class="block px-3 py-2 rounded hover:bg-gray-50 bg-gray-100">${data.title || 'Untitled'}<span class="block text-xs text-gray-500">just now</span></a>`;
+            ul.prepend(li);
+          }
+        }
+      } else {
+        typingWrap.innerHTML = `<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div><div class="message-bubble bot-message bg-red-50 border border-red-200 text-red-700">${(data && data.error) ? ('Error: '+data.error) : 'Failed to get response'}</div>`;
+      }
+      chatWindow.scrollTop = chatWindow.scrollHeight;
+    } catch (err) {
+      clearTimeout(timeoutId);
+      const reason = (err && err.name === 'AbortError') ? 'Request timed out. Please try again.' : 'Network error. Please try again.';
+      typingWrap.innerHTML = `<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div><div class="message-bubble bot-message bg-red-50 border border-red-200 text-red-700">${reason}</div>`;
+      chatWindow.scrollTop = chatWindow.scrollHeight;
+    }
+  });
+
+  // Windowed history: page older messages and conversations in over JSON
+  function renderTurn(turn) {
+    const wrap = document.createElement('div');
+    const bubble = document.createElement('div');
+    bubble.textContent = turn.text;
+    if (turn.role === 'assistant') {
+      wrap.className = 'flex items-start space-x-3';
+      wrap.innerHTML = '<div class="w-8 h-8 rounded-full bg-green-100 text-primary flex items-center justify-center">🤖</div>';
+      bubble.className = 'message-bubble bot-message bg-white border rounded-xl p-3 text-sm text-gray-800 whitespace-pre-line';
+    } else {
+      wrap.className = 'flex flex-col items-end space-y-2';
+      bubble.className = 'message-bubble user-message bg-gray-100 border border-gray-200 text-gray-800';
+    }
+    wrap.appendChild(bubble);
+    return wrap;
+  }
+
+  let loadingOlder = false;
+  async function loadOlderMessages() {
+    const holder = document.getElementById('olderMessages');
+    const btn = holder && holder.querySelector('button');
+    if (!btn || loadingOlder) return;
+    loadingOlder = true;
+    try {
+      const params = new URLSearchParams({ c: conversationIdEl.value, before: btn.dataset.before });
+      const resp = await fetch(`${urls.messagesUrl}?${params}`, { headers: { 'Accept': 'application/json' } });
+      const data = await resp.json();
+      if (!resp.ok || !data.ok) return;
+      const prevHeight = chatWindow.scrollHeight;
+      const frag = document.createDocumentFragment();
+      data.messages.forEach(m => frag.appendChild(renderTurn(m)));
+      holder.after(frag);
+      if (data.next_before) btn.dataset.before = data.next_before; else holder.remove();
+      // Keep the reader's place while content is inserted above
+      chatWindow.scrollTop += chatWindow.scrollHeight - prevHeight;
+    } finally {
+      loadingOlder = false;
+    }
+  }
+  document.getElementById('olderMessages')?.querySelector('button').addEventListener('click', loadOlderMessages);
+  chatWindow.addEventListener('scroll', () => { if (chatWindow.scrollTop < 40) loadOlderMessages(); });
+
+  const moreConversations = document.getElementById('moreConversations');
+  moreConversations?.addEventListener('click', async () => {
+    const params = new URLSearchParams({ cursor: moreConversations.dataset.cursor });
+    const resp = await fetch(`${urls.conversationsUrl}?${params}`, { headers: { 'Accept': 'application/json' } });
+    const data = await resp.json();
+    if (!resp.ok || !data.ok) return;
+    const ul = document.querySelector('#historySidebar ul');
+    data.conversations.forEach(conv => {
+      const li = document.createElement('li');
+      const a = document.createElement('a');
+      a.href = `${urls.chatbotUrl}?c=${conv.id}`;
+      a.className = 'block px-3 py-2 rounded hover:bg-gray-50';
+      a.textContent = conv.title;
+      const when = document.createElement('span');
+      when.className = 'block text-xs text-gray-500';
+      when.textContent = new Date(conv.updated_at).toLocaleString(undefined, { month: 'short', day: '2-digit', hour: '2-digit', minute: '2-digit' });
+      a.appendChild(when);
+      li.appendChild(a);
+      ul.appendChild(li);
+    });
+    if (data.next_cursor) moreConversations.dataset.cursor = data.next_cursor; else moreConversations.remove();
+  });
+
+  // Suggestion buttons
+  document.querySelectorAll('[data-suggest]').forEach(btn => {
+    btn.addEventListener('click', () => {
+      chatInput.value = btn.dataset.suggest;
+      chatInput.focus();
+    });
+  });
+
+  // Start at the newest message; older ones load when scrolling up
+  chatWindow.scrollTop = chatWindow.scrollHeight;
+
+  // Autofocus
+  chatInput.focus();
+
+  // Sidebar toggle logic
+  const toggleBtn = document.getElementById('toggleHistory');
+  const sidebar = document.getElementById('historySidebar');
+  const backdrop = document.getElementById('historyBackdrop');
+  function openHistory() {
+    sidebar.classList.remove('-translate-x-full');
+    backdrop.classList.remove('hidden');
+  }
+  function closeHistory() {
+    sidebar.classList.add('-translate-x-full');
+    backdrop.classList.add('hidden');
+  }
+  toggleBtn?.addEventListener('click', () => {
+    if (sidebar.classList.contains('-translate-x-full')) openHistory(); else closeHistory();
+  });
+  backdrop?.addEventListener('click', closeHistory);
+})();
@@ -0,0 +1,296 @@
+// Forum page: translation, voting, comments, replies and likes
+(function () {
+  // Endpoint URLs come from the page's <script data-*-url> attributes
+  const urls = document.currentScript.dataset;
+
+  // CSRF helper copied pattern
+  function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+      const cookies = document.cookie.split(';');
+      for (let i = 0; i < cookies.length; i++) {
+        const cookie = cookies[i].trim();
+        if (cookie.substring(0, name.length + 1) === (name + '=')) {
+          cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+          break;
+        }
+      }
+    }
+    return cookieValue;
+  }
+  const csrftoken = getCookie('csrftoken');
+
+  // Translate a post and its comments into the reader's language (cached server-side)
+  document.querySelectorAll('.translate-btn').forEach(btn => {
+    btn.addEventListener('click', async () => {
+      const article = btn.closest('article');
+      const nodes = Array.from(article.querySelectorAll('.translatable'));
+      const label = btn.querySelector('span');
+      if (btn.dataset.translated === '1') {
+        nodes.forEach(n => { if (n.dataset.original !== undefined) n.textContent = n.dataset.original; });
+        btn.dataset.translated = '0';
+        label.textContent = 'Translate';
+        return;
+      }
+      const ids = kind => nodes.filter(n => n.dataset.kind === kind).map(n => n.dataset.id).join(',');
+      label.textContent = 'Translating...';
+      btn.disabled = true;
+      try {
+        const res = await fetch(urls.translateUrl, {
+          method: 'POST',
+          headers: { 'X-CSRFToken': csrftoken, 'Content-Type': 'application/x-www-form-urlencoded' },
+          body: new URLSearchParams({ posts: ids('post'), comments: ids('comment') })
+        });
+        const data = await res.json();
+        if (!data.ok) throw new Error(data.error || 'Translation failed');
+        nodes.forEach(n => {
+          const text = (n.dataset.kind === 'post' ? data.posts : data.comments)[n.dataset.id];
+          if (text === undefined) return;
+          if (n.dataset.original === undefined) n.dataset.original = n.textContent;
+          n.textContent = text;
+        });
+        // Only a capped number of new translations are made per request; the rest come on the next click
+        btn.dataset.translated = data.remaining ? '0' : '1';
+        label.textContent = data.remaining ? 'Translate more' : 'Show original';
+      } catch (err) {
+        label.textContent = 'Translate';
+        alert(err.message);
+      } finally {
+        btn.disabled = false;
+      }
+    });
+  });
+
+  // Handle voting
+  document.querySelectorAll('.vote-btn').forEach(btn => {
+    btn.addEventListener('click', async (e) => {
+      e.preventDefault();
+      const postId = btn.getAttribute('data-post-id');
+      const action = btn.getAttribute('data-action');
+      try {
+        const res = await fetch(urls.voteUrl, {
+          method: 'POST',
+          headers: { 'X-CSRFToken': csrftoken },
+          body: new URLSearchParams({ post_id: postId, action })
+        });
+        const data = await res.json();
+        if (data.ok) {
+          document.querySelector(`.vote-up-${postId}`).textContent = data.upvotes;
+          document.querySelector(`.vote-down-${postId}`).textContent = data.downvotes;
+          document.querySelector(`.vote-score-${postId}`).textContent = data.score;
+        }
+      } catch (err) { console.error(err); }
+    });
+  });
+
+  // Handle comments
+  document.querySelectorAll('.comment-form').forEach(form => {
+    form.addEventListener('submit', async (e) => {
+      e.preventDefault();
+      const postId = form.getAttribute('data-post-id');
+      const input = form.querySelector('input[name="text"]');
+      const submitBtn = form.querySelector('.comment-submit');
+      const cancelBtn = form.querySelector('.comment-cancel');
+      const text = (input.value || '').trim();
+      if (!text) return;
+      submitBtn.disabled = true;
+      try {
+        const res = await fetch(urls.commentUrl, {
+          method: 'POST',
+          headers: { 'X-CSRFToken': csrftoken },
+          body: new URLSearchParams({ post_id: postId, text })
+        });
+        const data = await res.json();
+        if (data.ok) {
+          const ul = document.querySelector(`.comments-list[data-post-id='${postId}']`);
+          const li = document.createElement('li');
+          li.className = 'flex items-start gap-3';
+          li.setAttribute('data-comment-id', String(data.comment.id));
+          li.innerHTML = `
+            <div class="w-8 h-8 rounded-full bg-gray-200 flex items-center justify-center text-xs font-semibold text-gray-600">${data.comment.user[0]?.toUpperCase() || 'U'}</div>
+            <div class="flex-1">
+              <div class="text-sm"><span class="font-semibold">${data.comment.user}</span> <span class="text-xs text-gray-500">• ${data.comment.created_at}</span></div>
+              <div class="text-sm text-gray-800 mt-0.5">${data.comment.text}</div>
+              <div class="flex items-center gap-4 mt-1 text-xs text-gray-500">
+                <button class="flex items-center gap-1 comment-like-btn" data-comment-id="${data.comment.id}" type="button">
+                  <i data-feather="thumbs-up" class="w-3 h-3"></i>
+                  <span class="comment-like-count-${data.comment.id}">0</span>
+                </button>
+                <button class="comment-reply-toggle" data-comment-id="${data.comment.id}" type="button">Reply</button>
+              </div>
+              <form class="mt-2 hidden reply-form" data-post-id="${postId}" data-parent-id="${data.comment.id}">
+                <div class="border-b pb-2">
+                  <input type="text" name="text" placeholder="Write a reply..." class="w-full outline-none text-sm py-1" />
+                </div>
+                <div class="mt-2 flex items-center gap-2 justify-end">
+                  <button type="button" class="px-3 py-1 rounded-full text-sm text-gray-600 hover:bg-gray-100 reply-cancel">Cancel</button>
+                  <button class="px-3 py-1.5 rounded-full text-sm bg-gray-200 text-gray-500 reply-submit" disabled>Reply</button>
+                </div>
+              </form>
+              <ul class="mt-3 space-y-3 ml-8 replies-list" data-parent-id="${data.comment.id}"></ul>
+            </div>`;
+          ul.prepend(li);
+          // increment count
+          const countEl = document.querySelector(`.comment-count-${postId}`);
+          if (countEl) countEl.textContent = (parseInt(countEl.textContent || '0', 10) + 1).toString();
+          input.value = '';
+          cancelBtn?.classList.add('hidden');
+          feather && feather.replace();
+          // bind new buttons & forms
+          bindCommentLikeButtons(li.querySelectorAll('.comment-like-btn'));
+          bindReplyToggles(li.querySelectorAll('.comment-reply-toggle'));
+          bindReplyForms(li.querySelectorAll('.reply-form'));
+        }
+      } catch (err) { console.error(err); }
+      finally { submitBtn.disabled = false; }
+    });
+    // Enable/disable submit like YouTube
+    const input = form.querySelector('input[name="text"]');
+    const submitBtn = form.querySelector('.comment-submit');
+    const cancelBtn = form.querySelector('.comment-cancel');
+    input?.addEventListener('input', () => {
+      const hasText = (input.value || '').trim().length > 0;
+      submitBtn.disabled = !hasText;
+      if (hasText) {
+        cancelBtn?.classList.remove('hidden');
+        submitBtn.classList.remove('bg-gray-200','text-gray-500');
+        submitBtn.classList.add('bg-primary','text-white');
+      } else {
+        cancelBtn?.classList.add('hidden');
+        submitBtn.classList.add('bg-gray-200','text-gray-500');
+        submitBtn.classList.remove('bg-primary','text-white');
+      }
+    });
+    cancelBtn?.addEventListener('click', () => {
+      input.value = '';
+      input.dispatchEvent(new Event('input'));
+    });
+  });
+
+  // Show more comments toggle
+  document.querySelectorAll('.show-more-comments').forEach(btn => {
+    btn.addEventListener('click', () => {
+      const postId = btn.getAttribute('data-post-id');
+      const list = document.querySelector(`.comments-list[data-post-id='${postId}']`);
+      list?.querySelectorAll('.extra').forEach(el => el.classList.toggle('hidden'));
+      btn.textContent = btn.textContent.includes('more') ? 'Show fewer comments' : 'Show more comments';
+    });
+  });
+
+  // Toggle comments container show/hide
+  document.querySelectorAll('.toggle-comments').forEach(btn => {
+    btn.addEventListener('click', () => {
+      const postId = btn.getAttribute('data-post-id');
+      const container = document.querySelector(`.comments-container[data-post-id='${postId}']`);
+      if (!container) return;
+      const hidden = container.classList.toggle('hidden');
+      btn.textContent = hidden ? 'Show comments' : 'Hide comments';
+    });
+  });
+
+  // Bind comment like buttons
+  function bindCommentLikeButtons(btns) {
+    btns.forEach(btn => {
+      btn.addEventListener('click', async () => {
+        const commentId = btn.getAttribute('data-comment-id');
+        try {
+          const res = await fetch(urls.commentLikeUrl, {
+            method: 'POST',
+            headers: { 'X-CSRFToken': csrftoken },
+            body: new URLSearchParams({ comment_id: commentId })
+          });
+          const data = await res.json();
+          if (data.ok) {
+            const countEl = document.querySelector(`.comment-like-count-${commentId}`);
+            if (countEl) countEl.textContent = String(data.likes);
+            btn.classList.toggle('text-primary', !!data.liked);
+            feather && feather.replace();
+          }
+        } catch (e) { console.error(e); }
+      });
+    });
+  }
+  bindCommentLikeButtons(document.querySelectorAll('.comment-like-btn'));
+
+  // Bind reply toggles
+  function bindReplyToggles(toggles) {
+    toggles.forEach(t => {
+      t.addEventListener('click', () => {
+        const commentId = t.getAttribute('data-comment-id');
+        const form = document.querySelector(`.reply-form[data-parent-id='${commentId}']`);
+        if (!form) return;
+        form.classList.toggle('hidden');
+      });
+    });
+  }
+  bindReplyToggles(document.querySelectorAll('.comment-reply-toggle'));
+
+  // Bind reply forms
+  function bindReplyForms(forms) {
+    forms.forEach(form => {
+      const input = form.querySelector('input[name="text"]');
+      const submitBtn = form.querySelector('.reply-submit');
+      const cancelBtn = form.querySelector('.reply-cancel');
+      input?.addEventListener('input', () => {
+        const has = (input.value || '').trim().length > 0;
+        submitBtn.disabled = !has;
+        if (has) {
+          submitBtn.classList.remove('bg-gray-200','text-gray-500');
+          submitBtn.classList.add('bg-primary','text-white');
+        } else {
+          submitBtn.classList.add('bg-gray-200','text-gray-500');
+          submitBtn.classList.remove('bg-primary','text-white');
+        }
+      });
+      cancelBtn?.addEventListener('click', () => {
+        input.value = '';
+        form.classList.add('hidden');
+        input.dispatchEvent(new Event('input'));
+      });
+      form.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        const postId = form.getAttribute('data-post-id');
+        const parentId = form.getAttribute('data-parent-id');
+        const text = (input.value || '').trim();
+        if (!text) return;
+        submitBtn.disabled = true;
+        try {
+          const res = await fetch(urls.commentUrl, {
+            method: 'POST',
+            headers: { 'X-CSRFToken': csrftoken },
+            body: new URLSearchParams({ post_id: postId, parent_id: parentId, text })
+          });
+          const data = await res.json();
+          if (data.ok) {
+            const repliesUl = document.querySelector(`.replies-list[data-parent-id='${parentId}']`);
+            const li = document.createElement('li');
+            li.className = 'flex items-start gap-3';
+            li.setAttribute('data-comment-id', String(data.comment.id));
+            li.innerHTML = `
+              <div class="w-7 h-7 rounded-full bg-gray-100 flex items-center justify-center text-[10px] font-semibold text-gray-600">${data.comment.user[0]?.toUpperCase() || 'U'}</div>
+              <div class="flex-1">
+                <div class="text-xs"><span class="font-semibold">${data.comment.user}</span> <span class="text-[10px] text-gray-500">• ${data.comment.created_at}</span></div>
+                <div class="text-sm text-gray-800 mt-0.5">${data.comment.text}</div>
+                <div class="flex items-center gap-3 mt-1 text-[11px] text-gray-500">
+                  <button class="flex items-center gap-1 comment-like-btn" data-comment-id="${data.comment.id}" type="button">
+                    <i data-feather='thumbs-up' class="w-3 h-3"></i>
+                    <span class="comment-like-count-${data.comment.id}">0</span>
+                  </button>
+                </div>
+              </div>`;
+            repliesUl?.appendChild(li);
+            // increment the post's total comment count as replies are counted
+            const countEl = document.querySelector(`.comment-count-${postId}`);
+            if (countEl) countEl.textContent = (parseInt(countEl.textContent || '0', 10) + 1).toString();
+            input.value = '';
+            form.classList.add('hidden');
+            feather && feather.replace();
+            bindCommentLikeButtons(li.querySelectorAll('.comment-like-btn'));
+          }
+        } catch (err) { console.error(err); }
+        finally { submitBtn.disabled = false; }
+      });
+    });
+  }
+  bindReplyForms(document.querySelectorAll('.reply-form'));
+})();
@@ -0,0 +1,141 @@
+// Home page: smooth in-page scrolling, the "Mitra" rotator and the hero background
+
+// Controlled smooth scrolling for in-page navigation
+(function () {
+  const prefersReduced = window.matchMedia && window.matchMedia('(prefers-reduced-motion: reduce)').matches;
+
+  function easeInOutCubic(t) {
+    return t < 0.5 ? 4 * t * t * t : 1 - Math.pow(-2 * t + 2, 3) / 2;
+  }
+
+  function smoothScrollTo(to, duration = 800) {
+    if (prefersReduced || duration <= 0) {
+      window.scrollTo(0, to);
+      return;
+    }
+    const start = window.pageYOffset;
+    const distance = to - start;
+    const startTime = performance.now();
+
+    function step(now) {
+      const elapsed = now - startTime;
+      const t = Math.min(1, elapsed / duration);
+      const eased = easeInOutCubic(t);
+      window.scrollTo(0, start + distance * eased);
+      if (elapsed < duration) requestAnimationFrame(step);
+    }
+    requestAnimationFrame(step);
+  }
+
+  const mobileMenu = document.getElementById('mobile-menu');
+
+  function getOffsetTop(target) {
+    const rect = target.getBoundingClientRect();
+    const nav = document.querySelector('nav');
+    const offset = nav ? nav.offsetHeight : 0;
+    return Math.max(0, rect.top + window.pageYOffset - offset);
+  }
+
+  document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', (e) => {
+      const href = anchor.getAttribute('href');
+      // Ignore just '#' which refers to top
+      if (!href) return;
+      const id = href.slice(1);
+      const target = id ? document.getElementById(id) : document.body;
+      if (!target) return;
+      e.preventDefault();
+
+      // Close mobile menu after click
+      if (mobileMenu && !mobileMenu.classList.contains('hidden')) {
+        mobileMenu.classList.add('hidden');
+      }
+
+      const targetY = getOffsetTop(target);
+      smoothScrollTo(targetY, 800);
+
+      // Update URL without instant jump
+      if (history.pushState) {
+        history.pushState(null, '', href);
+      } else {
+        window.location.hash = href;
+      }
+    });
+  });
+})();
+
+// Krishi "Mitra" language rotator
+(function () {
+  const translations = [
+    { lang: 'Hindi', text: 'मित्र' },
+    { lang: 'Marathi', text: 'मित्र' },
+    { lang: 'Tamil', text: 'நண்பர்' },
+    { lang: 'Telugu', text: 'మిత్రుడు' },
+    { lang: 'Bengali', text: 'বন্ধু' },
+    { lang: 'Gujarati', text: 'મિત્ર' },
+    { lang: 'Punjabi', text: 'ਮਿੱਤਰ' },
+    { lang: 'Malayalam', text: 'സുഹൃത്ത്' },
+    { lang: 'Kannada', text: 'ಮಿತ್ರ' }
+  ];
+
+  const rotators = Array.from(document.querySelectorAll('.mitra-rotator'));
+  if (!rotators.length) return;
+
+  // Start from the first translation after the default "Mitra"
+  let index = 0;
+  const ANIM_MS = 300; // keep subtle
+  const INTERVAL_MS = 4000;
+
+  // Helper to set text on all rotators
+  function setAll(text, lang) {
+    rotators.forEach(el => {
+      el.textContent = text;
+      el.setAttribute('data-lang', lang);
+      el.setAttribute('title', `${lang}`);
+    });
+  }
+
+  function cycle() {
+    // fade out
+    rotators.forEach(el => el.classList.add('is-exiting'));
+    setTimeout(() => {
+      index = (index + 1) % translations.length;
+      const next = translations[index];
+      // set next text and fade in
+      setAll(next.text, next.lang);
+      rotators.forEach(el => {
+        el.classList.remove('is-exiting');
+        el.classList.add('is-entering');
+      });
+      setTimeout(() => {
+        rotators.forEach(el => el.classList.remove('is-entering'));
+      }, ANIM_MS);
+    }, ANIM_MS);
+  }
+
+  // Kick off after a brief delay for initial paint
+  setTimeout(() => {
+    cycle();
+    setInterval(cycle, INTERVAL_MS);
+  }, 500);
+})();
+
+// Initialize vanta.js background
+(function () {
+  try {
+    const heroEl = document.getElementById('hero');
+    if (heroEl && window.VANTA && VANTA.NET) {
+      VANTA.NET({
+        el: heroEl,
+        color: 0x16a34a,
+        backgroundColor: 0xf0fdf4,
+        points: 10,
+        maxDistance: 20,
+        spacing: 15
+      });
+    }
+  } catch (e) {
+    // Silently ignore if VANTA cannot initialize
+    console && console.debug && console.debug('VANTA init skipped:', e);
+  }
+})();
@@ -0,0 +1,13 @@
+// Learning page: zoom the card image on hover
+(function () {
+  document.querySelectorAll('.resource-card').forEach(card => {
+    card.addEventListener('mouseenter', function () {
+      const img = this.querySelector('img');
+      if (img) img.style.transform = 'scale(1.05)';
+    });
+    card.addEventListener('mouseleave', function () {
+      const img = this.querySelector('img');
+      if (img) img.style.transform = 'scale(1)';
+    });
+  });
+})();
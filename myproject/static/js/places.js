@@ -0,0 +1,28 @@
+// Place suggestions from the local gazetteer for every <input data-places-url list="...">.
+// data-places-state names a <select> whose value narrows the suggestions to one state.
+(function () {
+  document.querySelectorAll('input[data-places-url]').forEach(input => {
+    const list = input.list;
+    let timer = null;
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (q.length < 2 || !list) return;
+      timer = setTimeout(async () => {
+        const params = new URLSearchParams({ q });
+        const state = input.dataset.placesState && document.querySelector(input.dataset.placesState)?.value;
+        if (state) params.set('state', state);
+        try {
+          const res = await fetch(`${input.dataset.placesUrl}?${params}`);
+          const data = await res.json();
+          list.innerHTML = '';
+          (data.results || []).forEach(p => {
+            const opt = document.createElement('option');
+            opt.value = p.kind === 'state' ? p.name : `${p.name}, ${p.state_name}`;
+            list.appendChild(opt);
+          });
+        } catch (e) { /* suggestions are optional */ }
+      }, 200);
+    });
+  });
+})();
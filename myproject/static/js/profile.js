@@ -0,0 +1,64 @@
+// Profile page: post form check and avatar upload
+(function () {
+  // Endpoint URLs come from the page's <script data-*-url> attributes
+  const urls = document.currentScript.dataset;
+
+  // Post form handling (prevent empty posts)
+  const postForm = document.getElementById('postForm');
+  const postImage = document.getElementById('postImage');
+  if (postForm) {
+    postForm.addEventListener('submit', function(e) {
+      const textarea = this.querySelector('textarea');
+      if (textarea.value.trim() === '' && postImage && postImage.files.length === 0) {
+        e.preventDefault();
+        alert('Please enter some text or select an image to post.');
+      }
+    });
+  }
+
+  // Avatar upload handling via API
+  function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+      const cookies = document.cookie.split(';');
+      for (let i = 0; i < cookies.length; i++) {
+        const cookie = cookies[i].trim();
+        if (cookie.substring(0, name.length + 1) === (name + '=')) {
+          cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+          break;
+        }
+      }
+    }
+    return cookieValue;
+  }
+  const csrftoken = getCookie('csrftoken');
+
+  const avatarBtn = document.getElementById('avatarBtn');
+  const avatarInput = document.getElementById('avatarInput');
+  const avatarForm = document.getElementById('avatarForm');
+  avatarBtn?.addEventListener('click', () => avatarInput?.click());
+  avatarInput?.addEventListener('change', async () => {
+    if (!avatarInput.files || avatarInput.files.length === 0) return;
+    const formData = new FormData();
+    formData.append('avatar', avatarInput.files[0]);
+    try {
+      const res = await fetch(urls.updateUrl, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': csrftoken },
+        body: formData
+      });
+      const data = await res.json();
+      if (data.ok) {
+        // Refresh to show new avatar in all places
+        window.location.reload();
+      } else {
+        alert(data.error || 'Failed to upload profile photo');
+      }
+    } catch (e) {
+      console.error(e);
+      alert('Failed to upload profile photo');
+    } finally {
+      avatarInput.value = '';
+    }
+  });
+})();
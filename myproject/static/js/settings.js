@@ -0,0 +1,11 @@
+// Settings page: confirm saves with a toast
+(function () {
+  document.getElementById('settingsForm').addEventListener('submit', (e) => {
+    e.preventDefault();
+    const toast = document.createElement('div');
+    toast.className = 'fixed bottom-5 left-1/2 -translate-x-1/2 bg-green-600 text-white px-4 py-2 rounded shadow';
+    toast.textContent = 'Settings saved';
+    document.body.appendChild(toast);
+    setTimeout(() => toast.remove(), 1500);
+  });
+})();
@@ -0,0 +1,19 @@
+// Signup page: show the tick on custom checkboxes (visual only)
+(function () {
+  document.querySelectorAll('.checkbox-label').forEach(label => {
+    const input = label.querySelector('.checkbox-input');
+    const customCheckbox = label.querySelector('.checkbox-custom');
+    const checkIcon = customCheckbox.querySelector('i');
+
+    input.addEventListener('change', () => {
+      if (input.checked) {
+        checkIcon.classList.remove('hidden');
+      } else {
+        checkIcon.classList.add('hidden');
+      }
+    });
+    if (input.checked) {
+      checkIcon.classList.remove('hidden');
+    }
+  });
+})();
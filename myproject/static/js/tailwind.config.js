@@ -0,0 +1,11 @@
+// Theme shared by every page; load right after the Tailwind CDN script
+if (window.tailwind) {
+  tailwind.config = {
+    theme: {
+      extend: {
+        fontFamily: { poppins: ['Poppins', 'sans-serif'] },
+        colors: { primary: '#16A34A', secondary: '#FACC15', accent: '#15803D' }
+      }
+    }
+  };
+}
@@ -0,0 +1,32 @@
+// Weather page: "Use my location" reloads the page with the browser's coordinates
+(function () {
+  const btn = document.getElementById('useLoc');
+  if (!btn) return;
+  btn.addEventListener('click', () => {
+    if (!navigator.geolocation) {
+      alert('Geolocation is not supported by your browser.');
+      return;
+    }
+    btn.disabled = true;
+    btn.innerHTML = '<i data-feather="loader" class="w-5 h-5 mr-2 animate-spin"></i>Locating...';
+    feather.replace();
+
+    navigator.geolocation.getCurrentPosition(
+      pos => {
+        const { latitude, longitude } = pos.coords;
+        const url = new URL(window.location.href);
+        url.searchParams.set('lat', latitude);
+        url.searchParams.set('lon', longitude);
+        url.searchParams.delete('q');
+        window.location.href = url.toString();
+      },
+      err => {
+        alert('Unable to retrieve your location.');
+        btn.disabled = false;
+        btn.innerHTML = '<i data-feather="navigation" class="w-5 h-5 mr-2"></i>Use my location';
+        feather.replace();
+      },
+      { enableHighAccuracy: true, timeout: 10000 }
+    );
+  });
+})();